@@ -0,0 +1,356 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from collections import deque
+from typing import Dict, List, Optional
+
+TELEMETRY_DB = os.getenv("TELEMETRY_DB", "missing_persons.db")
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "60"))
+# api_requests 에 개별 호출을 남길 최대 대기 건수 (초과분은 롤업에만 반영)
+TELEMETRY_CALL_BUFFER = int(os.getenv("TELEMETRY_CALL_BUFFER", "2000"))
+# 롤업 보관 기간 (일) - /api/telemetry/apis?hours= 최대 범위
+TELEMETRY_RETENTION_DAYS = int(os.getenv("TELEMETRY_RETENTION_DAYS", "30"))
+
+INTEGRATIONS = ["SAFE182", "KAKAO", "UTIC_CCTV", "WEATHER", "DEEPL", "FCM"]
+
+# 고정 지연 버킷 상한 (ms). 마지막 버킷은 그 이상 전부
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 히스토그램 (버킷 안에서는 선형 보간으로 백분위 추정)"""
+
+    def __init__(self, bounds: List[float] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: "LatencyHistogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.total:
+            return None
+        rank = q / 100 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max_ms
+                # 버킷 상한까지 보간하면 실제 최댓값을 넘을 수 있으므로 max_ms 로 자른다
+                return round(float(min(lower + (upper - lower) * (rank - seen) / count, self.max_ms)), 1)
+            seen += count
+        return round(self.max_ms, 1)
+
+    def summary(self) -> dict:
+        return {
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "mean_ms": round(self.sum_ms / self.total, 1) if self.total else None,
+            "max_ms": round(self.max_ms, 1) if self.total else None,
+        }
+
+
+class IntegrationCounters:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.results = 0
+        self.histogram = LatencyHistogram()
+        self.last_error = None
+        self.last_error_at = None
+
+    def record(self, success: bool, ms: float, count: int, error: Optional[str]):
+        self.calls += 1
+        self.results += count
+        self.histogram.observe(ms)
+        if not success:
+            self.errors += 1
+            self.last_error = (error or "")[:200]
+            self.last_error_at = datetime.now().isoformat()
+
+    def summary(self) -> dict:
+        return dict(
+            calls=self.calls,
+            errors=self.errors,
+            error_rate=round(self.errors / self.calls * 100, 2) if self.calls else 0.0,
+            results=self.results,
+            last_error=self.last_error,
+            last_error_at=self.last_error_at,
+            **self.histogram.summary(),
+        )
+
+
+class CallTimer:
+    """api_telemetry.track() 로 받는 호출 단위 기록기"""
+
+    def __init__(self, telemetry: "APITelemetry", integration: str, method: str):
+        self.telemetry = telemetry
+        self.integration = integration
+        self.method = method
+        self.count = 0
+        self.error = None
+        self.start_time = None
+
+    def fail(self, error: str):
+        self.error = error
+
+    async def __aenter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc is not None and self.error is None:
+            self.error = str(exc) or exc_type.__name__
+        self.telemetry.record(self.integration, self.error is None, time.perf_counter() - self.start_time,
+                              count=self.count, method=self.method, error=self.error)
+        return False
+
+
+class APITelemetry:
+    """
+    외부 연동 호출 텔레메트리 (SAFE182 / KAKAO / UTIC_CCTV / WEATHER / DEEPL / FCM)
+    연동별 누적 카운터와 고정 버킷 지연 히스토그램은 메모리에 두고,
+    플러셔가 주기마다 구간 롤업(api_telemetry_rollups)과 개별 호출(api_requests)을 한 트랜잭션으로 저장한다.
+    """
+
+    def __init__(self, db_path: str = TELEMETRY_DB, flush_interval: float = TELEMETRY_FLUSH_INTERVAL,
+                 call_buffer: int = TELEMETRY_CALL_BUFFER):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.started_at = datetime.now()
+        self.totals: Dict[str, IntegrationCounters] = {name: IntegrationCounters() for name in INTEGRATIONS}
+        self.window: Dict[str, IntegrationCounters] = {}
+        self.window_start = datetime.now()
+        self.calls = deque(maxlen=call_buffer)
+        self.stats = {"flushes": 0, "flush_errors": 0, "rollups_written": 0, "calls_written": 0, "calls_dropped": 0}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._db_ready = False
+        self._task = None
+
+    # ---------- 기록 ----------
+
+    def record(self, integration: str, success: bool, seconds: float, count: int = 0,
+               method: str = "GET", error: Optional[str] = None, endpoint: Optional[str] = None):
+        """호출 1건 기록 (스레드 안전, 블로킹 없음)"""
+        ms = max(seconds, 0.0) * 1000
+        with self._lock:
+            for counters in (self.totals, self.window):
+                if integration not in counters:
+                    counters[integration] = IntegrationCounters()
+                counters[integration].record(success, ms, count, error)
+            if len(self.calls) == self.calls.maxlen:
+                self.stats["calls_dropped"] += 1
+            self.calls.append((
+                datetime.now().isoformat(), endpoint or integration, method, count,
+                1 if success else 0, round(seconds, 4), error,
+            ))
+
+    def track(self, integration: str, method: str = "GET") -> CallTimer:
+        """
+        async with api_telemetry.track("KAKAO") as call:
+            response = await client.get(...)
+            if response.status_code != 200:
+                call.fail(f"HTTP {response.status_code}")
+            call.count = len(docs)
+        예외가 나가면 자동으로 실패 처리된다.
+        """
+        return CallTimer(self, integration, method)
+
+    # ---------- 저장 ----------
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_telemetry_rollups (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    integration TEXT,
+                    window_start TEXT,
+                    window_end TEXT,
+                    calls INTEGER,
+                    errors INTEGER,
+                    results INTEGER,
+                    sum_ms REAL,
+                    max_ms REAL,
+                    p50_ms REAL,
+                    p95_ms REAL,
+                    p99_ms REAL,
+                    buckets TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_telemetry_rollups ON api_telemetry_rollups (integration, window_start)')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def flush(self) -> int:
+        """현재 구간 롤업 + 대기 중인 개별 호출 저장 (블로킹, to_thread 로 호출)"""
+        with self._flush_lock:
+            with self._lock:
+                window, self.window = self.window, {}
+                window_start, self.window_start = self.window_start, datetime.now()
+                calls = list(self.calls)
+                self.calls.clear()
+            if not window and not calls:
+                return 0
+
+            window_end = self.window_start.isoformat()
+            rollups = [
+                (
+                    name, window_start.isoformat(), window_end, counters.calls, counters.errors, counters.results,
+                    round(counters.histogram.sum_ms, 2), round(counters.histogram.max_ms, 2),
+                    counters.histogram.percentile(50), counters.histogram.percentile(95), counters.histogram.percentile(99),
+                    json.dumps(counters.histogram.counts),
+                )
+                for name, counters in window.items()
+            ]
+            try:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.executemany('''
+                            INSERT INTO api_telemetry_rollups
+                            (integration, window_start, window_end, calls, errors, results, sum_ms, max_ms,
+                             p50_ms, p95_ms, p99_ms, buckets)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', rollups)
+                        conn.executemany('''
+                            INSERT INTO api_requests
+                            (request_time, endpoint, method, result_count, success, response_time, error_message)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ''', calls)
+                finally:
+                    conn.close()
+            except Exception as e:
+                # 롤업은 다음 구간에 합쳐서 다시 시도, 개별 호출은 버퍼 한도 안에서 되돌린다
+                self.stats["flush_errors"] += 1
+                with self._lock:
+                    for name, counters in window.items():
+                        merged = self.window.setdefault(name, IntegrationCounters())
+                        merged.calls += counters.calls
+                        merged.errors += counters.errors
+                        merged.results += counters.results
+                        merged.histogram.merge(counters.histogram)
+                    self.window_start = window_start
+                    room = self.calls.maxlen - len(self.calls)
+                    self.calls.extendleft(reversed(calls[-room:] if room else []))
+                print(f"API 텔레메트리 저장 실패: {e}")
+                return 0
+
+            self.stats["flushes"] += 1
+            self.stats["rollups_written"] += len(rollups)
+            self.stats["calls_written"] += len(calls)
+            return len(rollups)
+
+    def prune(self, days: int = TELEMETRY_RETENTION_DAYS) -> int:
+        """보관 기간이 지난 롤업 삭제 (블로킹). 반환: 삭제 건수"""
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        conn = self._connect()
+        try:
+            with conn:
+                deleted = conn.execute('DELETE FROM api_telemetry_rollups WHERE window_start < ?', (cutoff,)).rowcount
+        finally:
+            conn.close()
+        return deleted
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+            print(f"API 텔레메트리 플러셔 시작 ({self.flush_interval:.0f}초 주기)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    # ---------- 조회 ----------
+
+    def get_summary(self) -> dict:
+        """프로세스 시작 이후 연동별 호출 수 / 오류율 / p50·p95·p99"""
+        with self._lock:
+            integrations = {name: counters.summary() for name, counters in self.totals.items()}
+        return {
+            "since": self.started_at.isoformat(),
+            "bucket_bounds_ms": LATENCY_BUCKETS_MS,
+            "integrations": integrations,
+        }
+
+    def load_history(self, hours: int = 24, integration: Optional[str] = None) -> dict:
+        """저장된 롤업을 합쳐 기간 전체 백분위를 다시 계산 (블로킹, to_thread 로 호출)"""
+        since = (datetime.now() - timedelta(hours=hours)).isoformat()
+        query = 'SELECT integration, window_start, calls, errors, results, sum_ms, max_ms, buckets FROM api_telemetry_rollups WHERE window_start >= ?'
+        params = [since]
+        if integration:
+            query += ' AND integration = ?'
+            params.append(integration)
+        query += ' ORDER BY window_start'
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        merged: Dict[str, IntegrationCounters] = {}
+        series: Dict[str, list] = {}
+        for name, window_start, calls, errors, results, sum_ms, max_ms, buckets in rows:
+            counters = merged.setdefault(name, IntegrationCounters())
+            histogram = LatencyHistogram()
+            histogram.counts = json.loads(buckets)
+            histogram.total, histogram.sum_ms, histogram.max_ms = calls, sum_ms, max_ms
+            counters.calls += calls
+            counters.errors += errors
+            counters.results += results
+            counters.histogram.merge(histogram)
+            series.setdefault(name, []).append({
+                "window_start": window_start,
+                "calls": calls,
+                "error_rate": round(errors / calls * 100, 2) if calls else 0.0,
+                "p95_ms": histogram.percentile(95),
+            })
+
+        return {
+            "since": since,
+            "integrations": {name: counters.summary() for name, counters in merged.items()},
+            "series": series,
+        }
+
+    def get_stats(self):
+        return dict(
+            self.stats,
+            pending_calls=len(self.calls),
+            flush_interval=self.flush_interval,
+            running=self._task is not None,
+        )
+
+
+api_telemetry = APITelemetry()
@@ -0,0 +1,6 @@
+"""
+서버 성능 측정 스크립트 모음
+
+server 디렉터리에서 모듈로 실행한다:
+    python -m benchmarks.bench_startup
+"""
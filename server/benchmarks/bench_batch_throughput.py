@@ -0,0 +1,89 @@
+"""
+배치 이미지 생성 처리량 벤치마크 (이미지/분)
+
+배치 크기별로 SDXL 템플릿 생성 처리량을 비교한다. --photo 를 주면 얼굴 교체까지 포함한
+전체 파이프라인(generate_batch)을 측정한다.
+    python -m benchmarks.bench_batch_throughput
+    python -m benchmarks.bench_batch_throughput --batch-sizes 1 2 4 --profile cpu_fast --photo face.jpg
+"""
+import os
+import json
+import time
+import base64
+import argparse
+
+SAMPLE_PEOPLE = [
+    {"description": "검정 후드티, 청바지, 흰색 운동화", "age": 12, "gender": "남성"},
+    {"description": "분홍색 원피스, 노란 우산", "age": 7, "gender": "여성"},
+    {"description": "회색 점퍼, 갈색 바지, 등산화", "age": 78, "gender": "남성"},
+    {"description": "흰 셔츠, 남색 교복 치마", "age": 16, "gender": "여성"},
+]
+
+
+def make_jobs(count: int, photo_base64: str = None):
+    jobs = []
+    for i in range(count):
+        person = SAMPLE_PEOPLE[i % len(SAMPLE_PEOPLE)]
+        jobs.append(dict(person, photo_base64=photo_base64, seed=42 + i))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="배치 이미지 생성 처리량 벤치마크")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--profile", default="cpu", help="이미지 생성 프로필 (gpu/cpu/cpu_fast)")
+    parser.add_argument("--photo", help="얼굴 사진 경로 (지정 시 얼굴 교체 포함)")
+    parser.add_argument("--gpu", action="store_true", help="CUDA 사용 (기본은 CPU 측정)")
+    args = parser.parse_args()
+
+    if not args.gpu:
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    import image_generator
+    image_generator.IMAGE_GEN_MAX_BATCH = max(args.batch_sizes)
+
+    generator = image_generator.MissingPersonImageGenerator(args.profile)
+    if not generator.initialize_models():
+        print("모델 초기화 실패")
+        return
+
+    photo_base64 = None
+    if args.photo:
+        with open(args.photo, "rb") as f:
+            photo_base64 = base64.b64encode(f.read()).decode("utf-8")
+
+    print(f"=== 배치 처리량 측정 (프로필: {generator.profile_name}) ===")
+
+    # 첫 호출의 지연(커널 준비 등)이 결과에 섞이지 않도록 1장 미리 생성
+    warmup_prompt = generator.build_prompts(**SAMPLE_PEOPLE[0])[0]
+    generator.render_templates([warmup_prompt], image_generator.NEGATIVE_PROMPT, [0])
+
+    results = []
+    for batch_size in args.batch_sizes:
+        jobs = make_jobs(batch_size, photo_base64)
+
+        start_time = time.time()
+        if photo_base64:
+            # 실패한 항목(None)은 처리량에 넣지 않음
+            generated = sum(image is not None for image in generator.generate_batch(jobs))
+        else:
+            prompts = [generator.build_prompts(job["description"], job["age"], job["gender"])[0] for job in jobs]
+            generated = len(generator.render_templates(prompts, image_generator.NEGATIVE_PROMPT, [job["seed"] for job in jobs]))
+        elapsed = time.time() - start_time
+
+        result = {
+            "batch_size": batch_size,
+            "generated": generated,
+            "seconds": elapsed,
+            "seconds_per_image": elapsed / generated if generated else None,
+            "images_per_minute": generated * 60 / elapsed,
+        }
+        results.append(result)
+        print(f"배치 {batch_size}: {elapsed:.1f}초, 생성 {generated}장, {result['images_per_minute']:.2f} 이미지/분")
+
+    print(json.dumps({"profile": generator.profile_name, "face_swap": bool(photo_base64), "results": results},
+                     ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
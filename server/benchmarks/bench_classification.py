@@ -0,0 +1,136 @@
+"""
+환경 특징 분류 마이크로 벤치마크 (방향당 분류 시간)
+
+server/cache 의 Overpass 응답 하나가 기존 get_environment 의 한 방향 조회 결과이므로,
+파일마다 특징 표를 만들어 기존 분류(첫 행 기준 + 문자열 검사)와 현재 분류(조회표 + 길이/면적 가중)를 비교한다.
+현재 분류는 DataFrame 입력(osmnx 경로)과 저장소 어휘 코드 입력(오프라인 저장소 경로)을 따로 잰다.
+    python -m benchmarks.bench_classification
+    python -m benchmarks.bench_classification --repeats 500
+"""
+import os
+import glob
+import json
+import time
+import argparse
+
+import numpy as np
+
+from osm_feature_store import OSMFeatureStore, iter_overpass_files, OSM_CACHE_DIR
+from environment_analysis import classify_features, classify_encoded, encode_store
+
+
+def classify_features_legacy(gdf):
+    """변경 전 get_environment 의 분류 (비교용)"""
+    road_type = "골목길"
+    if not gdf.empty and 'highway' in gdf.columns:
+        highways = gdf['highway'].dropna()
+        if len(highways) > 0:
+            hw = str(highways.iloc[0])
+            if 'primary' in hw or 'trunk' in hw:
+                road_type = "대로"
+            elif 'secondary' in hw or 'tertiary' in hw:
+                road_type = "이차로"
+
+    land_use = "주거지역"
+    if not gdf.empty and 'landuse' in gdf.columns:
+        landuses = gdf['landuse'].dropna()
+        if len(landuses) > 0:
+            lu = str(landuses.iloc[0])
+            if 'commercial' in lu or 'retail' in lu:
+                land_use = "상업지역"
+            elif 'industrial' in lu:
+                land_use = "공업지역"
+            elif 'park' in lu or 'recreation' in lu:
+                land_use = "공원"
+
+    poi = []
+    if not gdf.empty and 'amenity' in gdf.columns:
+        amenities = gdf['amenity'].dropna().unique()
+        for a in amenities[:3]:
+            if 'school' in str(a):
+                poi.append("학교")
+            elif 'hospital' in str(a):
+                poi.append("병원")
+            elif 'bus' in str(a):
+                poi.append("버스정류장")
+            elif 'park' in str(a):
+                poi.append("공원")
+            elif 'convenience' in str(a) or 'shop' in str(a):
+                poi.append("편의점")
+    if not poi:
+        poi = ["없음"]
+
+    hazard = []
+    if not gdf.empty and 'natural' in gdf.columns:
+        naturals = gdf['natural'].dropna()
+        if any('water' in str(n) or 'river' in str(n) for n in naturals):
+            hazard.append("하천")
+    if not gdf.empty and 'highway' in gdf.columns:
+        highways = gdf['highway'].dropna()
+        if any('motorway' in str(h) or 'trunk' in str(h) for h in highways):
+            hazard.append("대형교차로")
+    if not hazard:
+        hazard = ["없음"]
+
+    return {"road_type": road_type, "land_use": land_use, "poi": poi, "hazard": hazard, "slope": "평지"}
+
+
+def time_per_call(fn, frame, repeats: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        fn(frame)
+    return (time.perf_counter() - start_time) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="환경 특징 분류 마이크로 벤치마크")
+    parser.add_argument("--cache-dir", default=OSM_CACHE_DIR)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.cache_dir, "*.json")))
+    if not files:
+        print(f"Overpass 캐시 없음: {args.cache_dir}")
+        return
+
+    print(f"=== 방향별 분류 시간 ({len(files)}개 응답, {args.repeats}회 반복) ===")
+    rows = []
+    for path, nodes, ways, relations in iter_overpass_files(files):
+        store = OSMFeatureStore.build([(nodes, ways, relations)])
+        frame = store.features_in_bbox(-180, -90, 180, 90)
+        indices = np.arange(len(store))
+
+        legacy = classify_features_legacy(frame)
+        current = classify_features(frame)
+        row = {
+            "file": os.path.basename(path),
+            "features": len(frame),
+            "legacy_us": time_per_call(classify_features_legacy, frame, args.repeats),
+            "current_us": time_per_call(classify_features, frame, args.repeats),
+            "store_codes_us": time_per_call(lambda _: classify_encoded(encode_store(store, indices)), None, args.repeats),
+            "legacy": legacy,
+            "current": current,
+            "changed": [key for key in ("road_type", "land_use", "poi", "hazard") if legacy[key] != current[key]],
+        }
+        rows.append(row)
+        print(f"{row['file'][:12]} 특징 {row['features']:>5}개: 기존 {row['legacy_us']:7.1f}µs, 현재 {row['current_us']:7.1f}µs, "
+              f"저장소 코드 {row['store_codes_us']:6.1f}µs  "
+              f"도로 {legacy['road_type']}→{current['road_type']}, 토지 {legacy['land_use']}→{current['land_use']}")
+
+    summary = {
+        "responses": len(rows),
+        "legacy_mean_us": sum(r["legacy_us"] for r in rows) / len(rows),
+        "current_mean_us": sum(r["current_us"] for r in rows) / len(rows),
+        "store_codes_mean_us": sum(r["store_codes_us"] for r in rows) / len(rows),
+        "changed_road_type": sum("road_type" in r["changed"] for r in rows),
+        "changed_land_use": sum("land_use" in r["changed"] for r in rows),
+        "changed_poi": sum("poi" in r["changed"] for r in rows),
+        "changed_hazard": sum("hazard" in r["changed"] for r in rows),
+    }
+    print(f"\n평균 (방향당): 기존 {summary['legacy_mean_us']:.1f}µs, 현재 {summary['current_mean_us']:.1f}µs, "
+          f"저장소 코드 {summary['store_codes_mean_us']:.1f}µs")
+    print(json.dumps({"summary": summary, "responses": rows}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
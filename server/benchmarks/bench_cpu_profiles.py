@@ -0,0 +1,103 @@
+"""
+이미지 생성 프로필별 CPU 벤치마크 (초/이미지, 피크 RSS)
+
+프로필마다 별도 프로세스에서 CUDA를 끈 상태로 SDXL 템플릿 생성을 측정한다.
+    python -m benchmarks.bench_cpu_profiles
+    python -m benchmarks.bench_cpu_profiles --profiles cpu cpu_fast --images 2
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+SAMPLE_PERSON = {
+    "description": "검정 후드티, 청바지, 흰색 운동화",
+    "age": 12,
+    "gender": "남성",
+}
+
+
+def peak_rss_mb() -> float:
+    # 리눅스 ru_maxrss 단위는 KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(profile_name: str, images: int):
+    from image_generator import MissingPersonImageGenerator
+
+    generator = MissingPersonImageGenerator(profile_name)
+
+    start_time = time.time()
+    if not generator.initialize_models():
+        print(json.dumps({"profile": profile_name, "error": "모델 초기화 실패"}))
+        return
+    load_seconds = time.time() - start_time
+
+    prompt, negative_prompt = generator.build_prompts(
+        SAMPLE_PERSON["description"], SAMPLE_PERSON["age"], SAMPLE_PERSON["gender"]
+    )
+
+    timings = []
+    for i in range(images):
+        start_time = time.time()
+        generator.render_template(prompt, negative_prompt, seed=42 + i)
+        timings.append(time.time() - start_time)
+
+    print(json.dumps({
+        "profile": profile_name,
+        "settings": generator.profile,
+        "load_seconds": load_seconds,
+        "seconds_per_image": sum(timings) / len(timings),
+        "image_seconds": timings,
+        "peak_rss_mb": peak_rss_mb(),
+    }))
+
+
+def run_profile(profile_name: str, images: int) -> dict:
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_cpu_profiles", "--worker", profile_name, "--images", str(images)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    for line in reversed(completed.stdout.strip().splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+
+    error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "결과 없음"
+    return {"profile": profile_name, "error": error}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 생성 CPU 프로필 벤치마크")
+    parser.add_argument("--profiles", nargs="+", default=["gpu", "cpu", "cpu_fast"])
+    parser.add_argument("--images", type=int, default=1, help="프로필당 생성할 이미지 수")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.images)
+        return
+
+    print("=== 이미지 생성 프로필 CPU 벤치마크 ===")
+    results = []
+    for profile_name in args.profiles:
+        print(f"▶ {profile_name} 측정 중...")
+        result = run_profile(profile_name, args.images)
+        results.append(result)
+
+        if "error" in result:
+            print(f"   실패: {result['error']}")
+        else:
+            print(f"   {result['seconds_per_image']:.1f}초/이미지, 피크 RSS {result['peak_rss_mb']:.0f}MB "
+                  f"(로딩 {result['load_seconds']:.1f}초)")
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+오프라인 OSM 저장소 질의 벤치마크 (queries/sec)
+
+저장소 범위 안의 임의 좌표로 범위 질의 / 4방향 환경 분석 / 극좌표 격자 분석 처리량을 측정한다.
+저장소 파일이 없으면 server/cache 의 Overpass 응답으로 메모리에서 바로 만든다.
+    python -m benchmarks.bench_osm_store
+    python -m benchmarks.bench_osm_store --queries 5000 --store osm_store.npz
+"""
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+from osm_feature_store import OSMFeatureStore, build_from_paths, OSM_STORE_PATH, OSM_CACHE_DIR
+from environment_analysis import EnvironmentAnalyzer, point_bbox, FEATURE_RADIUS
+
+
+def sample_points(store: OSMFeatureStore, count: int, seed: int = 0) -> np.ndarray:
+    """원본 범위 안에서 균등 추출한 (lat, lon)"""
+    rng = np.random.default_rng(seed)
+    regions = store.regions[rng.integers(0, len(store.regions), count)]
+    lons = rng.uniform(regions[:, 0], regions[:, 2])
+    lats = rng.uniform(regions[:, 1], regions[:, 3])
+    return np.column_stack([lats, lons])
+
+
+def measure(label: str, fn, points: np.ndarray) -> dict:
+    start_time = time.perf_counter()
+    for lat, lon in points:
+        fn(lat, lon)
+    seconds = time.perf_counter() - start_time
+    result = {
+        "queries": len(points),
+        "seconds": seconds,
+        "queries_per_second": len(points) / seconds if seconds else 0.0,
+        "mean_us": seconds / len(points) * 1e6,
+    }
+    print(f"{label}: {result['queries_per_second']:,.0f} q/s (평균 {result['mean_us']:.1f}µs)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 OSM 저장소 질의 벤치마크")
+    parser.add_argument("--store", default=OSM_STORE_PATH)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    if os.path.exists(args.store):
+        store = OSMFeatureStore.load(args.store)
+        source = args.store
+    else:
+        store = build_from_paths([OSM_CACHE_DIR])
+        source = f"{OSM_CACHE_DIR} (메모리 생성)"
+    load_seconds = time.perf_counter() - start_time
+
+    print("=== 오프라인 OSM 저장소 벤치마크 ===")
+    print(f"저장소: {source}, 특징 {len(store)}개, 준비 {load_seconds * 1000:.0f}ms")
+
+    points = sample_points(store, args.queries)
+    analyzer = EnvironmentAnalyzer(source="store", feature_store=store)
+
+    results = {
+        "store": store.get_stats(),
+        "load_seconds": load_seconds,
+        "bbox_index_query": measure(
+            "범위 질의 (인덱스만)", lambda lat, lon: store.query_indices(*point_bbox(lat, lon, FEATURE_RADIUS)), points
+        ),
+        "bbox_feature_query": measure(
+            "범위 질의 (DataFrame)", lambda lat, lon: store.features_in_bbox(*point_bbox(lat, lon, FEATURE_RADIUS)), points
+        ),
+        "environment_4dir": measure(
+            "4방향 환경 분석", lambda lat, lon: analyzer.analyze_from_store(store, lat, lon), points
+        ),
+    }
+
+    # 극좌표 격자: 셀 수가 늘어도 조회는 1번
+    for bearings, rings in [(8, [250, 500, 1000]), (16, [200, 400, 600, 800, 1000])]:
+        label = f"격자 {bearings}방위 × {len(rings)}링"
+        results[f"grid_{bearings}x{len(rings)}"] = measure(
+            label, lambda lat, lon: analyzer.analyze_grid(lat, lon, bearings, rings), points
+        )
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
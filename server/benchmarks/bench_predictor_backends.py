@@ -0,0 +1,117 @@
+"""
+이동 경로 예측 모델 추론 백엔드 벤치마크 (tokens/sec, TTFT, RSS)
+
+백엔드마다 별도 프로세스에서 모델을 로딩하고, 실제 예측 프롬프트로 측정한다.
+    python -m benchmarks.bench_predictor_backends
+    python -m benchmarks.bench_predictor_backends --backends cpu_int8 cpu_bf16 --new-tokens 128
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+SAMPLE_PERSON = {"category": "치매환자", "age": 78, "sex": "M"}
+SAMPLE_ENVIRONMENT = {
+    "north": {"road_type": "대로", "land_use": "상업지역", "poi": ["버스정류장"], "hazard": ["대형교차로"]},
+    "east": {"road_type": "골목길", "land_use": "주거지역", "poi": ["없음"], "hazard": ["없음"]},
+    "south": {"road_type": "이차로", "land_use": "공원", "poi": ["공원"], "hazard": ["하천"]},
+    "west": {"road_type": "골목길", "land_use": "주거지역", "poi": ["학교"], "hazard": ["없음"]},
+}
+
+
+def run_worker(backend: str, new_tokens: int, repeats: int):
+    from movement_prediction_server import MovementPredictor, SYSTEM_MESSAGE
+
+    start_time = time.time()
+    predictor = MovementPredictor(backend=backend)
+    load_seconds = time.time() - start_time
+
+    prompt = predictor.create_prompt(SAMPLE_PERSON, SAMPLE_ENVIRONMENT)
+    messages = [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt},
+    ]
+    text = predictor.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+    enc = predictor.tokenizer(text, return_tensors="pt", return_token_type_ids=False)
+    input_ids = enc["input_ids"].to(predictor.device)
+    attention_mask = enc["attention_mask"].to(predictor.device)
+
+    def timed_generate(max_new_tokens: int):
+        start = time.time()
+        outputs = predictor.generate(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            max_new_tokens=max_new_tokens,
+            min_new_tokens=max_new_tokens,
+            do_sample=False,
+            pad_token_id=predictor.tokenizer.pad_token_id,
+        )
+        return time.time() - start, outputs.shape[1] - input_ids.shape[1]
+
+    # 첫 호출은 워밍업
+    timed_generate(1)
+
+    ttft = min(timed_generate(1)[0] for _ in range(repeats))
+    decode_runs = [timed_generate(new_tokens) for _ in range(repeats)]
+    seconds, generated = min(decode_runs)
+
+    print(json.dumps({
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "prompt_tokens": input_ids.shape[1],
+        "prefix_cache": predictor.prefix_cache is not None,
+        "time_to_first_token": ttft,
+        "generated_tokens": generated,
+        "generate_seconds": seconds,
+        "tokens_per_second": generated / seconds if seconds else 0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def run_backend(backend: str, new_tokens: int, repeats: int) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_predictor_backends", "--worker", backend,
+         "--new-tokens", str(new_tokens), "--repeats", str(repeats)],
+        capture_output=True,
+        text=True,
+    )
+    for line in reversed(completed.stdout.strip().splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+
+    error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "결과 없음"
+    return {"backend": backend, "error": error}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이동 경로 예측 추론 백엔드 벤치마크")
+    parser.add_argument("--backends", nargs="+", default=["cpu_int8", "cpu_bf16", "onnx"])
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.new_tokens, args.repeats)
+        return
+
+    print("=== 추론 백엔드 벤치마크 ===")
+    results = []
+    for backend in args.backends:
+        print(f"▶ {backend} 측정 중...")
+        result = run_backend(backend, args.new_tokens, args.repeats)
+        results.append(result)
+
+        if "error" in result:
+            print(f"   실패: {result['error']}")
+        else:
+            print(f"   {result['tokens_per_second']:.1f} tokens/s, TTFT {result['time_to_first_token'] * 1000:.0f}ms, "
+                  f"피크 RSS {result['peak_rss_mb']:.0f}MB (로딩 {result['load_seconds']:.1f}초)")
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
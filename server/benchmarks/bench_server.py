@@ -0,0 +1,336 @@
+"""
+메인 서버 핫패스 벤치마크 (오프라인: 합성 SQLite + 로컬 외부 API 대역)
+
+데이터 크기별로 목록/상세, 통계, 폴링 수집, WebSocket 브로드캐스트, CCTV 반경 검색, 기사 위치 수집,
+FCM 전송을 측정해 JSON 으로 남기고, --compare 로 두 결과(커밋 간)를 비교한다.
+HTTP 엔드포인트는 httpx ASGITransport 로 앱을 직접 호출한다 (lifespan/폴링은 돌지 않음).
+    python -m benchmarks.bench_server
+    python -m benchmarks.bench_server --sizes 1000 10000 100000 --output before.json
+    python -m benchmarks.bench_server --scenarios statistics list_persons_page --iterations 100
+    python -m benchmarks.bench_server --compare before.json after.json --threshold 10
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HTTP_SCENARIOS = ["list_persons_page", "list_persons_all", "person_detail", "statistics", "sighting_reports", "cctv_search"]
+DIRECT_SCENARIOS = ["polling_ingest", "driver_location_ingest", "ws_broadcast", "fcm_send"]
+SCENARIOS = HTTP_SCENARIOS + DIRECT_SCENARIOS
+# 전체 목록처럼 데이터 크기에 비례하는 시나리오는 반복 수를 줄인다
+HEAVY_SCENARIOS = {"list_persons_all", "sighting_reports", "polling_ingest", "fcm_send"}
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, errors: int, wall_seconds: float, units: int = None, **extra) -> dict:
+    """latencies: 초 단위. units 는 처리량 계산 단위 수 (기본: 성공 호출 수)"""
+    units = len(latencies) if units is None else units
+    return {
+        "iterations": len(latencies) + errors,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "throughput_per_s": round(units / wall_seconds, 2) if wall_seconds else 0.0,
+        **extra,
+    }
+
+
+async def run_concurrent(call, iterations: int, concurrency: int) -> dict:
+    """call(i) 를 concurrency 개 작업자로 iterations 번 실행"""
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < iterations:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                ok = await call(index)
+            except Exception:
+                ok = False
+            if ok is False:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return summarize(latencies, errors, time.perf_counter() - start_time)
+
+
+class FakeWebSocket:
+    """send_text 만 있는 WebSocket 대역 (전송마다 이벤트 루프에 한 번 양보)"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_text(self, text: str):
+        self.sent += 1
+        await asyncio.sleep(0)
+
+
+async def bench_http(main, scenario: str, counts: dict, iterations: int, concurrency: int) -> dict:
+    import httpx
+
+    rng = random.Random(1)
+    requests = {
+        "list_persons_page": lambda i: ("GET", "/api/missing_persons", {"params": {"limit": 50, "offset": (i * 50) % max(counts["persons"] - 50, 1)}}),
+        "list_persons_all": lambda i: ("GET", "/api/missing_persons", {}),
+        "person_detail": lambda i: ("GET", f"/api/person/BENCH_{rng.randrange(counts['persons']):07d}", {}),
+        "statistics": lambda i: ("GET", "/api/statistics", {}),
+        "sighting_reports": lambda i: ("GET", "/api/sighting_reports", {}),
+        "cctv_search": lambda i: ("POST", "/api/search_cctv", {"json": {"lat": 36.35, "lng": 127.38, "radius": 2000}}),
+    }
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120.0) as client:
+        async def call(i):
+            method, url, kwargs = requests[scenario](i)
+            response = await client.request(method, url, **kwargs)
+            return response.status_code == 200
+
+        return await run_concurrent(call, iterations, concurrency)
+
+
+async def bench_polling_ingest(main, upstreams, iterations: int) -> dict:
+    """fetch_safe182_data (로컬 Safe182) → ingest_records (매핑/변경 확인/분류/지오코딩/저장). 첫 회는 신규, 이후는 변경 없음"""
+    latencies, errors, records = [], 0, 0
+    new_total = updated_total = unchanged_total = 0
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            raw = await main.fetch_safe182_data()
+            report = await main.ingest_records(raw)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+        records += len(raw)
+        new_total += report["new"]
+        updated_total += report["updated"]
+        unchanged_total += report["unchanged"]
+    return summarize(latencies, errors, time.perf_counter() - start_time, units=records,
+                     records_per_iteration=len(upstreams.safe182_records), new=new_total, updated=updated_total,
+                     unchanged=unchanged_total, unit="records")
+
+
+async def bench_driver_locations(main, counts: dict, iterations: int) -> dict:
+    rng = random.Random(2)
+    latencies = []
+    start_time = time.perf_counter()
+    for i in range(iterations):
+        location = {"lat": 36.35 + rng.uniform(-0.05, 0.05), "lng": 127.38 + rng.uniform(-0.05, 0.05),
+                    "accuracy": 5, "speed": 30, "heading": 90}
+        start = time.perf_counter()
+        await main.update_driver_location(f"driver_{i % counts['drivers']}", location)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, 0, time.perf_counter() - start_time, unit="updates")
+
+
+async def bench_broadcast(main, clients: int, iterations: int) -> dict:
+    manager = main.ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(clients)]
+    for index, socket in enumerate(sockets):
+        manager.active_connections.append(socket)
+        manager.connection_info[socket] = {"type": "driver" if index % 5 else "admin"}
+    message = {"type": "update", "new": 3, "updated": 12, "timestamp": datetime.now().isoformat()}
+
+    latencies = []
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await manager.broadcast(message)
+        latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - start_time
+    return summarize(latencies, 0, wall, units=clients * iterations, clients=clients, unit="messages")
+
+
+async def bench_fcm(main, iterations: int) -> dict:
+    person = main.MissingPerson(id="BENCH_0000000", name="실종자0000000", age=10, priority="HIGH")
+
+    async def call(i):
+        return await main.send_fcm_notification(person)
+
+    return await run_concurrent(call, iterations, 1)
+
+
+async def run_size(main, upstreams, size: int, args) -> dict:
+    from benchmarks.server_fixture import build_fixture
+
+    workdir = os.path.join(args.fixture_dir, f"size_{size}")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    start = time.perf_counter()
+    counts = await build_fixture(main, size, seed=args.seed)
+    print(f"\n=== 실종자 {size:,}명 (fixture {'재사용' if counts.pop('reused') else '생성'} {time.perf_counter() - start:.1f}초) ===")
+
+    results = {"counts": counts, "scenarios": {}}
+    heavy_iterations = max(3, args.iterations // 10)
+    for scenario in args.scenarios:
+        iterations = heavy_iterations if scenario in HEAVY_SCENARIOS else args.iterations
+        output = io.StringIO()
+        with redirect_stdout(sys.stdout if args.verbose else output):
+            if scenario in HTTP_SCENARIOS:
+                entries = {scenario: await bench_http(main, scenario, counts, iterations, args.concurrency)}
+            elif scenario == "polling_ingest":
+                entries = {scenario: await bench_polling_ingest(main, upstreams, iterations)}
+            elif scenario == "driver_location_ingest":
+                entries = {scenario: await bench_driver_locations(main, counts, args.iterations * 10)}
+            elif scenario == "ws_broadcast":
+                entries = {f"ws_broadcast_{clients}": await bench_broadcast(main, clients, args.iterations)
+                           for clients in args.ws_clients}
+            else:
+                entries = {scenario: await bench_fcm(main, iterations)}
+        for name, result in entries.items():
+            results["scenarios"][name] = result
+            print(f"{name:<26} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                  f"{result['throughput_per_s']:>10,.1f} {result.get('unit', 'req')}/s  오류 {result['errors']}")
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+                              capture_output=True, text=True).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+async def run(args) -> dict:
+    from benchmarks.server_fixture import enter_workdir
+    from benchmarks.mock_upstreams import MockUpstreams
+
+    enter_workdir(args.fixture_dir)
+    with redirect_stdout(io.StringIO()):
+        import main
+
+    upstreams = MockUpstreams(safe182_count=args.poll_records, latency_ms=args.mock_latency_ms, seed=args.seed).start()
+    upstreams.patch(main, fcm_latency_ms=args.fcm_latency_ms)
+    try:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "iterations": args.iterations,
+                "concurrency": args.concurrency,
+                "poll_records": args.poll_records,
+                "mock_latency_ms": args.mock_latency_ms,
+                "fcm_latency_ms": args.fcm_latency_ms,
+            },
+            "sizes": {},
+        }
+        for size in args.sizes:
+            report["sizes"][str(size)] = await run_size(main, upstreams, size, args)
+        report["meta"]["upstream_requests"] = upstreams.requests
+        return report
+    finally:
+        upstreams.stop()
+
+
+# ---------- 비교 ----------
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(base: dict, new: dict, threshold: float) -> dict:
+    """p95 가 threshold% 이상 늘거나 처리량이 threshold% 이상 줄면 회귀"""
+    print(f"=== 비교: {base['meta']['commit']} → {new['meta']['commit']} (임계값 {threshold:.0f}%) ===")
+    rows, regressions = [], []
+    for size, base_size in base["sizes"].items():
+        new_size = new["sizes"].get(size)
+        if not new_size:
+            continue
+        print(f"\n--- 실종자 {int(size):,}명 ---")
+        for name, before in base_size["scenarios"].items():
+            after = new_size["scenarios"].get(name)
+            if not after:
+                continue
+            row = {
+                "size": int(size),
+                "scenario": name,
+                "p50_change": round(change(before["p50_ms"], after["p50_ms"]), 1),
+                "p95_change": round(change(before["p95_ms"], after["p95_ms"]), 1),
+                "throughput_change": round(change(before["throughput_per_s"], after["throughput_per_s"]), 1),
+            }
+            row["regression"] = row["p95_change"] > threshold or row["throughput_change"] < -threshold
+            rows.append(row)
+            if row["regression"]:
+                regressions.append(row)
+            print(f"{'❌' if row['regression'] else '  '} {name:<26} p50 {before['p50_ms']:>9.2f}→{after['p50_ms']:<9.2f}ms "
+                  f"({row['p50_change']:+6.1f}%)  p95 ({row['p95_change']:+6.1f}%)  처리량 ({row['throughput_change']:+6.1f}%)")
+    print(f"\n회귀 {len(regressions)}건 / 비교 {len(rows)}건")
+    return {"base": base["meta"], "new": new["meta"], "threshold": threshold, "rows": rows, "regressions": regressions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메인 서버 핫패스 벤치마크")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000], help="실종자 수 (1000 10000 100000)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8, help="HTTP 시나리오 동시 요청 수")
+    parser.add_argument("--ws-clients", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--poll-records", type=int, default=100, help="Safe182 응답 1회당 레코드 수")
+    parser.add_argument("--mock-latency-ms", type=float, default=0.0, help="로컬 외부 API 응답 지연")
+    parser.add_argument("--fcm-latency-ms", type=float, default=0.0, help="가짜 FCM send_multicast 지연 (동기)")
+    parser.add_argument("--fixture-dir", help="합성 DB 보관 디렉터리 (같은 크기면 재사용, 기본: 임시 디렉터리)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 JSON 비교 (회귀가 있으면 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="회귀 판정 기준 (%%)")
+    parser.add_argument("--verbose", action="store_true", help="서버 print 출력 표시")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            new = json.load(f)
+        result = compare(base, new, args.threshold)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        sys.exit(1 if result["regressions"] else 0)
+
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    args.fixture_dir = os.path.abspath(args.fixture_dir or tempfile.mkdtemp(prefix="bench_server_"))
+    print(f"작업 디렉터리: {args.fixture_dir}")
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
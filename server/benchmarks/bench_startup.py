@@ -0,0 +1,85 @@
+"""
+서버 기동 시간 벤치마크 (import vs 모델 로딩)
+
+각 단계를 새 파이썬 프로세스에서 측정해서 import 캐시 영향을 배제한다.
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --skip-models   # 모델 로딩 제외
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+MAIN_IMPORT_SNIPPET = """
+import json, time
+start = time.time()
+import main
+print(json.dumps({"main_import": time.time() - start}))
+"""
+
+GENERATOR_SNIPPET = """
+import json, time
+result = {}
+start = time.time()
+import image_generator
+result["generator_import"] = time.time() - start
+if LOAD_MODELS:
+    generator = image_generator.get_generator()
+    start = time.time()
+    result["models_ok"] = generator.initialize_models()
+    result["model_load"] = time.time() - start
+    result["model_load_breakdown"] = generator.load_timings
+print(json.dumps(result))
+"""
+
+
+def run_snippet(snippet: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "unknown"}
+
+    # 모듈 내부 print 출력은 건너뛰고 마지막 JSON 줄만 사용
+    for line in reversed(completed.stdout.strip().splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    return {"error": "결과 없음"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 기동 시간 벤치마크")
+    parser.add_argument("--skip-models", action="store_true", help="SDXL/InsightFace 모델 로딩 측정 생략")
+    args = parser.parse_args()
+
+    print("=== 서버 기동 시간 측정 ===")
+
+    main_result = run_snippet(MAIN_IMPORT_SNIPPET)
+    generator_result = run_snippet(
+        GENERATOR_SNIPPET.replace("LOAD_MODELS", "False" if args.skip_models else "True")
+    )
+
+    report = {"api_server": main_result, "image_generator": generator_result}
+
+    if "main_import" in main_result:
+        print(f"main.py import (API 서버 기동):  {main_result['main_import']:.2f}초")
+    else:
+        print(f"main.py import 실패: {main_result.get('error')}")
+
+    if "generator_import" in generator_result:
+        print(f"image_generator import (torch/diffusers/insightface): {generator_result['generator_import']:.2f}초")
+    else:
+        print(f"image_generator import 실패: {generator_result.get('error')}")
+
+    if "model_load" in generator_result:
+        print(f"모델 로딩 합계: {generator_result['model_load']:.2f}초")
+        for name, seconds in generator_result.get("model_load_breakdown", {}).items():
+            print(f"   - {name}: {seconds:.2f}초")
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
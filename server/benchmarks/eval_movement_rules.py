@@ -0,0 +1,119 @@
+"""
+규칙 기반 예측 vs LLM 예측 비교 (fixtures/movement_cases.json)
+
+최고 방향 일치율, 방향별 확률 평균 절대 오차, Jensen-Shannon 거리, 케이스당 소요 시간을 출력한다.
+    python -m benchmarks.eval_movement_rules                 # 규칙 + LLM (모델 로딩)
+    python -m benchmarks.eval_movement_rules --rules-only    # 규칙 결과/속도만
+    python -m benchmarks.eval_movement_rules --backend cpu_int8 --cases my_cases.json
+"""
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+from movement_rules import rule_scorer, DIRECTIONS
+
+DEFAULT_CASES = os.path.join(os.path.dirname(__file__), "fixtures", "movement_cases.json")
+
+
+def to_vector(prediction: dict) -> np.ndarray:
+    vector = np.array([float(prediction[d]["prob"]) for d in DIRECTIONS])
+    return vector / vector.sum() if vector.sum() else np.full(len(DIRECTIONS), 1 / len(DIRECTIONS))
+
+
+def js_distance(p: np.ndarray, q: np.ndarray) -> float:
+    m = (p + q) / 2
+
+    def kl(a, b):
+        mask = a > 0
+        return float(np.sum(a[mask] * np.log2(a[mask] / b[mask])))
+
+    return float(np.sqrt((kl(p, m) + kl(q, m)) / 2))
+
+
+def format_prediction(prediction: dict) -> str:
+    return " ".join(f"{d[0].upper()}:{prediction[d]['prob']:>5.1f}" for d in DIRECTIONS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="규칙 기반 vs LLM 이동 예측 비교")
+    parser.add_argument("--cases", default=DEFAULT_CASES)
+    parser.add_argument("--rules-only", action="store_true", help="LLM 없이 규칙 결과와 속도만 측정")
+    parser.add_argument("--backend", help="LLM 추론 백엔드 (기본: PREDICTOR_BACKEND)")
+    parser.add_argument("--repeats", type=int, default=1000, help="규칙 속도 측정 반복 수")
+    args = parser.parse_args()
+
+    with open(args.cases, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+
+    persons = [case["person"] for case in cases]
+    environments = [case["environment"] for case in cases]
+
+    start_time = time.perf_counter()
+    for _ in range(args.repeats):
+        rule_scorer.predict(persons[0], environments[0])
+    single_us = (time.perf_counter() - start_time) / args.repeats * 1e6
+
+    start_time = time.perf_counter()
+    rules_results = rule_scorer.predict_many(persons, environments)
+    batch_us = (time.perf_counter() - start_time) * 1e6
+
+    print(f"=== 규칙 기반 예측 ({len(cases)}건) ===")
+    print(f"1건 {single_us:.1f}µs, 전체 배치 {batch_us:.1f}µs")
+
+    predictor = None
+    if not args.rules_only:
+        from movement_prediction_server import MovementPredictor
+        predictor = MovementPredictor(backend=args.backend)
+
+    report = []
+    for case, rules_prediction in zip(cases, rules_results):
+        print(f"\n▶ {case['name']}")
+        print(f"   규칙: {format_prediction(rules_prediction)}")
+        entry = {"name": case["name"], "rules": rules_prediction}
+
+        if predictor:
+            start_time = time.perf_counter()
+            try:
+                llm_prediction = predictor.predict(case["person"], case["environment"])
+            except Exception as e:
+                print(f"   LLM 실패: {e}")
+                entry["llm_error"] = str(e)
+                report.append(entry)
+                continue
+            llm_seconds = time.perf_counter() - start_time
+
+            p, q = to_vector(rules_prediction), to_vector(llm_prediction)
+            entry.update({
+                "llm": llm_prediction,
+                "llm_seconds": llm_seconds,
+                "top_match": int(np.argmax(p)) == int(np.argmax(q)),
+                "mean_abs_error": float(np.mean(np.abs(p - q)) * 100),
+                "js_distance": js_distance(p, q),
+            })
+            print(f"   LLM : {format_prediction(llm_prediction)} ({llm_seconds:.2f}초)")
+            print(f"   최고 방향 일치: {'O' if entry['top_match'] else 'X'}, "
+                  f"평균 절대 오차 {entry['mean_abs_error']:.1f}%p, JS {entry['js_distance']:.3f}")
+
+        report.append(entry)
+
+    compared = [entry for entry in report if "llm" in entry]
+    summary = {"cases": len(cases), "rules_single_us": single_us, "rules_batch_us": batch_us}
+    if compared:
+        summary.update({
+            "compared": len(compared),
+            "top_match_rate": sum(entry["top_match"] for entry in compared) / len(compared) * 100,
+            "mean_abs_error": float(np.mean([entry["mean_abs_error"] for entry in compared])),
+            "mean_js_distance": float(np.mean([entry["js_distance"] for entry in compared])),
+            "llm_mean_seconds": float(np.mean([entry["llm_seconds"] for entry in compared])),
+        })
+        print(f"\n최고 방향 일치율 {summary['top_match_rate']:.0f}%, 평균 절대 오차 {summary['mean_abs_error']:.1f}%p, "
+              f"LLM 평균 {summary['llm_mean_seconds']:.2f}초 vs 규칙 {single_us:.1f}µs")
+
+    print(json.dumps({"summary": summary, "cases": report}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
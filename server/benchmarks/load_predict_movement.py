@@ -0,0 +1,153 @@
+"""
+이동 경로 예측 서버 부하 테스트 (처리량, p50/p95 지연, 503 거절 수)
+
+동시 클라이언트 수별로 /api/predict_movement 에 요청을 보낸다. 서버(포트 8002)가 떠 있어야 한다.
+요청마다 실종자 분류/나이/환경을 바꿔 예측 캐시를 비껴가게 하고(배치/LLM 지연 측정), 응답 출처(cache / llm / rules)를 센다.
+--same-payload 는 모든 요청에 같은 샘플을 보내 캐시 경로를 잰다.
+    python -m benchmarks.load_predict_movement
+    python -m benchmarks.load_predict_movement --concurrency 1 4 8 16 --requests 32
+    python -m benchmarks.load_predict_movement --same-payload
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+
+import httpx
+
+from benchmarks.bench_predictor_backends import SAMPLE_PERSON, SAMPLE_ENVIRONMENT
+from movement_rules import DIRECTIONS, FEATURES, CATEGORY_GROUPS
+
+DEFAULT_URL = "http://localhost:8002/api/predict_movement"
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def make_payload(index: int, seed: int) -> dict:
+    """요청 번호별 실종자/환경 (규칙 점수기가 아는 값으로 생성, seed 가 다르면 이전 실행의 캐시와도 겹치지 않음)"""
+    rng = random.Random(f"{seed}:{index}")
+    values = {}
+    for field, value in FEATURES:
+        values.setdefault(field, []).append(value)
+    environment = {
+        direction: {
+            "road_type": rng.choice(values["road_type"]),
+            "land_use": rng.choice(values["land_use"]),
+            "poi": sorted(rng.sample(values["poi"], rng.randint(1, 2))) if rng.random() < 0.8 else ["없음"],
+            "hazard": [rng.choice(values["hazard"])] if rng.random() < 0.5 else ["없음"],
+        }
+        for direction in DIRECTIONS
+    }
+    return {
+        "person": {
+            "category": rng.choice(sorted(CATEGORY_GROUPS)),
+            "age": rng.randint(5, 90),
+            "sex": rng.choice(["M", "F"]),
+        },
+        "environment": environment,
+        "lat": 36.3504,
+        "lon": 127.3845,
+    }
+
+
+async def run_level(url: str, concurrency: int, total_requests: int, timeout: float, seed: int = None) -> dict:
+    """seed 가 None 이면 모든 요청에 같은 샘플 (두 번째 요청부터 캐시 적중)"""
+    sample = {
+        "person": SAMPLE_PERSON,
+        "environment": SAMPLE_ENVIRONMENT,
+        "lat": 36.3504,
+        "lon": 127.3845,
+    }
+    latencies = []
+    counts = {"ok": 0, "rejected": 0, "errors": 0}
+    sources = {}
+    next_index = 0
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal next_index
+        while next_index < total_requests:
+            index = next_index
+            next_index += 1
+            payload = sample if seed is None else make_payload(index, seed)
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json=payload)
+                elapsed = time.perf_counter() - start
+                if response.status_code == 200:
+                    counts["ok"] += 1
+                    latencies.append(elapsed)
+                    source = response.json().get("source", "unknown")
+                    sources[source] = sources.get(source, 0) + 1
+                elif response.status_code == 503:
+                    counts["rejected"] += 1
+                else:
+                    counts["errors"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    start_time = time.perf_counter()
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    wall_seconds = time.perf_counter() - start_time
+
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        **counts,
+        "sources": sources,
+        "wall_seconds": wall_seconds,
+        "throughput_rps": counts["ok"] / wall_seconds if wall_seconds else 0.0,
+        "p50_seconds": percentile(latencies, 50),
+        "p95_seconds": percentile(latencies, 95),
+    }
+
+
+async def run(args):
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        try:
+            health = (await client.get(args.url.replace("/api/predict_movement", "/api/health"))).json()
+            print(f"서버 상태: 백엔드 {health.get('backend')}, 대기열 {health.get('queue')}")
+        except Exception as e:
+            print(f"서버 연결 실패: {e}")
+            return
+
+    seed = None if args.same_payload else (args.seed if args.seed is not None else int(time.time()))
+    if seed is not None:
+        print(f"요청별 입력 seed: {seed}")
+
+    results = []
+    for level, concurrency in enumerate(args.concurrency):
+        print(f"▶ 동시 {concurrency} 클라이언트, {args.requests}건...")
+        # 단계마다 다른 입력 (앞 단계에서 채운 캐시를 다시 맞히지 않도록)
+        level_seed = None if seed is None else seed * 1000 + level
+        result = await run_level(args.url, concurrency, args.requests, args.timeout, level_seed)
+        results.append(result)
+        sources = ", ".join(f"{name} {count}" for name, count in sorted(result["sources"].items())) or "-"
+        print(f"   {result['throughput_rps']:.2f} req/s, p50 {result['p50_seconds']:.2f}초, "
+              f"p95 {result['p95_seconds']:.2f}초, 503 {result['rejected']}건, 오류 {result['errors']}건, 출처: {sources}")
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이동 경로 예측 서버 부하 테스트")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=16, help="동시성 단계별 총 요청 수")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=None, help="요청별 입력 생성 seed (기본: 현재 시각)")
+    parser.add_argument("--same-payload", action="store_true", help="모든 요청에 같은 샘플 (캐시 적중 경로 측정)")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+벤치마크용 로컬 외부 API (Safe182 / Kakao / UTIC / OpenWeather) 와 가짜 FCM
+
+표준 라이브러리 HTTP 서버를 스레드로 띄우고, main 모듈의 URL 상수와 firebase_messaging 을 바꿔 끼운다.
+실제 네트워크 없이 main.py 의 호출 경로(httpx 요청, 응답 파싱, 저장)를 그대로 탄다.
+    upstreams = MockUpstreams(latency_ms=20).start()
+    upstreams.patch(main)
+"""
+import json
+import time
+import random
+import hashlib
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+# 대전 대략 범위 (lat, lng)
+DAEJEON_BOUNDS = (36.25, 127.28, 36.45, 127.50)
+DISTRICTS = ["동구", "중구", "서구", "유성구", "대덕구"]
+DONGS = ["둔산동", "탄방동", "궁동", "은행동", "정동", "관평동", "가양동", "월평동", "봉명동", "판암동"]
+CLOTHING = ["검정 후드티, 청바지", "회색 점퍼, 갈색 바지", "흰 셔츠, 남색 교복 치마", "분홍색 원피스", "파란 패딩, 운동화"]
+
+
+def make_safe182_records(count: int, seed: int = 0, id_offset: int = 0):
+    """Safe182 findChildList 의 list 항목 형태 (nm / age / occrAdres / occrde ...)"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        records.append({
+            "nm": f"실종자{id_offset + i:06d}",
+            "age": rng.choice([rng.randint(5, 17), rng.randint(20, 60), rng.randint(65, 90)]),
+            "sexdstnDscd": rng.choice(["남자", "여자"]),
+            "occrAdres": f"대전광역시 {rng.choice(DISTRICTS)} {rng.choice(DONGS)} {rng.randint(1, 300)}",
+            "occrde": f"2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+            "etc": "",
+            "tknphotoFile": "",
+            "dressingDscd": rng.choice(CLOTHING),
+        })
+    return records
+
+
+def geocode_point(query: str):
+    """주소 문자열 → 대전 범위 안의 고정 좌표 (같은 주소는 항상 같은 좌표)"""
+    digest = hashlib.md5(query.encode()).digest()
+    south, west, north, east = DAEJEON_BOUNDS
+    lat = south + (north - south) * digest[0] / 255
+    lng = west + (east - west) * digest[1] / 255
+    return lat, lng
+
+
+def make_cctvs(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    south, west, north, east = DAEJEON_BOUNDS
+    return [
+        {
+            "CCTVID": f"E{i:05d}",
+            "CCTVNAME": f"대전 CCTV {i}",
+            "CENTERNAME": "대전교통정보센터" if i % 10 else "세종교통정보센터",
+            "KIND": "E",
+            "CCTVIP": "",
+            "CH": "",
+            "ID": "",
+            "PASSWD": "",
+            "LOCATION": f"대전광역시 {rng.choice(DISTRICTS)}",
+            "XCOORD": str(rng.uniform(west, east)),
+            "YCOORD": str(rng.uniform(south, north)),
+        }
+        for i in range(count)
+    ]
+
+
+WEATHER_PAYLOAD = {
+    "weather": [{"main": "Clear", "description": "맑음"}],
+    "main": {"temp": 18.5, "humidity": 40},
+    "wind": {"speed": 1.2},
+    "name": "Daejeon",
+}
+
+
+class MockUpstreams:
+    """
+    /safe182 (POST), /kakao (GET ?query=), /utic (POST), /weather (GET)
+    latency_ms 만큼 응답을 늦추고, kakao_miss_rate 비율로 빈 결과를 돌려준다.
+    safe182_records / kakao_responses 를 바꾸면 녹화된 응답도 그대로 재생할 수 있다.
+    kakao_proxy 에 실제 Kakao 주소를 넣으면 녹화되지 않은 질의를 그대로 넘겨 받아 kakao_responses 에 기록한다.
+    """
+
+    def __init__(self, safe182_count: int = 100, cctv_count: int = 1500, latency_ms: float = 0.0,
+                 kakao_miss_rate: float = 0.0, seed: int = 0):
+        self.safe182_records = make_safe182_records(safe182_count, seed)
+        self.cctvs = make_cctvs(cctv_count, seed)
+        self.kakao_responses = {}
+        self.latency = latency_ms / 1000
+        self.kakao_miss_rate = kakao_miss_rate
+        self.kakao_proxy = None
+        # kakao_unrecorded: kakao_responses 에 없어서 합성/빈 결과로 답한 질의 수
+        self.requests = {"safe182": 0, "kakao": 0, "kakao_unrecorded": 0, "utic": 0, "weather": 0, "other": 0}
+        self.server = None
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def safe182_page(self, form: dict) -> dict:
+        """findChildList 처럼 page / rowSize 로 잘라 totalCount 와 함께 돌려준다 (ETag / If-None-Match 지원)"""
+        records = self.safe182_records
+        page = int(form.get("page", ["1"])[0])
+        row_size = int(form.get("rowSize", [str(len(records) or 1)])[0])
+        start = (page - 1) * row_size
+        return {"totalCount": len(records), "list": records[start:start + row_size]}
+
+    def kakao_payload(self, query: str, authorization: str = None) -> dict:
+        if query in self.kakao_responses:
+            return self.kakao_responses[query]
+        if self.kakao_proxy:
+            request = urllib.request.Request(f"{self.kakao_proxy}?{urlencode({'query': query})}",
+                                             headers={"Authorization": authorization or ""})
+            with urllib.request.urlopen(request, timeout=10) as response:
+                payload = json.loads(response.read().decode())
+            self.kakao_responses[query] = payload
+            return payload
+        self.requests["kakao_unrecorded"] += 1
+        digest = hashlib.md5(query.encode()).digest()
+        if digest[2] / 255 < self.kakao_miss_rate:
+            return {"documents": []}
+        lat, lng = geocode_point(query)
+        return {"documents": [{"address_name": query if "대전" in query else f"대전광역시 {query}",
+                               "x": str(lng), "y": str(lat)}]}
+
+    def _handler(self):
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, payload, status: int = 200, etag: str = None):
+                body = json.dumps(payload, ensure_ascii=False).encode() if payload is not None else b""
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _route(self):
+                if upstreams.latency:
+                    time.sleep(upstreams.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode() if length else ""
+                url = urlparse(self.path)
+                if url.path == "/safe182":
+                    upstreams.requests["safe182"] += 1
+                    payload = upstreams.safe182_page(parse_qs(body))
+                    etag = '"' + hashlib.md5(json.dumps(payload, ensure_ascii=False).encode()).hexdigest() + '"'
+                    if self.headers.get("If-None-Match") == etag:
+                        return self._reply(None, 304, etag)
+                    return self._reply(payload, etag=etag)
+                if url.path == "/kakao":
+                    upstreams.requests["kakao"] += 1
+                    query = parse_qs(url.query).get("query", [""])[0]
+                    return self._reply(upstreams.kakao_payload(query, self.headers.get("Authorization")))
+                if url.path == "/utic":
+                    upstreams.requests["utic"] += 1
+                    return self._reply(upstreams.cctvs)
+                if url.path == "/weather":
+                    upstreams.requests["weather"] += 1
+                    return self._reply(WEATHER_PAYLOAD)
+                upstreams.requests["other"] += 1
+                return self._reply({"error": "not found"}, 404)
+
+            do_GET = _route
+            do_POST = _route
+
+        return Handler
+
+    def start(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-upstreams", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def patch(self, main_module, fcm_latency_ms: float = 0.0):
+        """main 모듈의 외부 API 주소와 키, FCM 을 로컬 것으로 교체"""
+        main_module.SAFE_URL = f"{self.base_url}/safe182"
+        main_module.KAKAO_GEO = f"{self.base_url}/kakao"
+        main_module.UTIC_CCTV_URL = f"{self.base_url}/utic"
+        main_module.WEATHER_URL = f"{self.base_url}/weather"
+        main_module.KAKAO_API_KEY = "mock"
+        main_module.OPENWEATHER_API_KEY = "mock"
+        main_module.firebase_messaging = FakeMessaging(fcm_latency_ms)
+
+
+class _Message:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+class _BatchResponse:
+    def __init__(self, success_count: int, failure_count: int):
+        self.success_count = success_count
+        self.failure_count = failure_count
+
+
+class FakeMessaging:
+    """firebase_admin.messaging 대역. send_multicast 는 실제처럼 동기로 latency 만큼 막는다"""
+
+    MulticastMessage = _Message
+    AndroidConfig = _Message
+    AndroidNotification = _Message
+    APNSConfig = _Message
+    APNSPayload = _Message
+    Aps = _Message
+    ApsAlert = _Message
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.sent = 0
+
+    def send_multicast(self, message):
+        if self.latency:
+            time.sleep(self.latency)
+        tokens = message.kwargs.get("tokens") or []
+        self.sent += len(tokens)
+        return _BatchResponse(len(tokens), 0)
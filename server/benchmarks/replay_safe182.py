@@ -0,0 +1,339 @@
+"""
+Safe182 폴링 오프라인 재생 (녹화된 Safe182 list 응답 + Kakao 지오코딩 응답)
+
+정기 폴링과 같은 경로(fetch_safe182_data → ingest_records [매핑 → id 생성 → 변경 확인 → 분류 → 지오코딩 → 저장]
+→ announce_ingest [브로드캐스트])를 로컬 대역 서버로 돌린다. 폴링 사이 300초 대기는 --speedup 배로 줄이거나(0 = 대기 없음)
+없애고, 레코드/초, 단계별 시간, 레코드당 DB 쓰기 행 수(와 쓰기 문장 수)를 JSON 으로 남긴다.
+
+녹화 디렉터리 구성:
+    manifest.json        {"source", "created_at", "polls": [{"file", "recorded_at", "records"}]}
+    safe182/0000.json    폴링 1회의 Safe182 응답 ({"list": [...]})
+    kakao.json           {질의 문자열: Kakao 응답}
+
+    python -m benchmarks.replay_safe182 recordings/daejeon --record --polls 3 --interval 300   # 실제 API 녹화 (.env 키 필요)
+    python -m benchmarks.replay_safe182 recordings/synthetic --synthesize --polls 12 --records 100 --churn 0.1
+    python -m benchmarks.replay_safe182 recordings/synthetic
+    python -m benchmarks.replay_safe182 recordings/synthetic --repeat 3 --ws-clients 1000 --fixture-persons 10000 --output replay.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+from metrics import DB_QUERY_SECONDS, DB_ROWS_WRITTEN
+from benchmarks.bench_server import FakeWebSocket, git_commit
+from benchmarks.mock_upstreams import MockUpstreams, make_safe182_records
+from benchmarks.server_fixture import enter_workdir, build_fixture
+
+STAGES = ["fetch", "mapping", "id", "diff", "categorize", "geocode", "save", "broadcast"]
+WRITE_OPERATIONS = {"INSERT", "UPDATE", "DELETE", "REPLACE"}
+POLL_INTERVAL_SECONDS = 300  # start_optimized_polling 의 기본 주기 (manifest 에 시각이 없을 때)
+
+
+def import_main(verbose: bool):
+    with redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        import main
+    return main
+
+
+# ---------- 녹화 ----------
+
+def load_recording(path: str):
+    with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    polls = []
+    for poll in manifest["polls"]:
+        with open(os.path.join(path, poll["file"]), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        polls.append({
+            "recorded_at": poll.get("recorded_at"),
+            "records": payload["list"] if isinstance(payload, dict) else payload,
+        })
+    kakao_path = os.path.join(path, "kakao.json")
+    kakao = {}
+    if os.path.exists(kakao_path):
+        with open(kakao_path, "r", encoding="utf-8") as f:
+            kakao = json.load(f)
+    return manifest, polls, kakao
+
+
+async def record(main, path: str, polls: int, interval: float, kakao_url: str, source: str,
+                 before_poll=None, clock=None):
+    """
+    fetch_safe182_data 결과를 폴링마다 저장하고, 같은 목록을 ingest 해서 geocode_address 가 실제로 보내는
+    Kakao 질의를 녹화 프록시로 받아 둔다 (재생 때 똑같은 질의 순서가 나오도록)
+    """
+    os.makedirs(os.path.join(path, "safe182"), exist_ok=True)
+    proxy = MockUpstreams(safe182_count=0, cctv_count=0).start()
+    proxy.kakao_proxy = kakao_url
+    main.KAKAO_GEO = f"{proxy.base_url}/kakao"
+    manifest = {"source": source, "created_at": datetime.now().isoformat(), "polls": []}
+    try:
+        for index in range(polls):
+            if before_poll:
+                before_poll(index)
+            recorded_at = clock(index) if clock else datetime.now()
+            raw = await main.fetch_safe182_data()
+            name = f"safe182/{index:04d}.json"
+            with open(os.path.join(path, name), "w", encoding="utf-8") as f:
+                json.dump({"list": raw}, f, ensure_ascii=False)
+            manifest["polls"].append({"file": name, "recorded_at": recorded_at.isoformat(), "records": len(raw)})
+            await main.ingest_records(raw, main.SAFE182_SOURCE)
+            print(f"[녹화] 폴링 {index + 1}/{polls}: {len(raw)}건, Kakao 질의 누적 {len(proxy.kakao_responses)}개",
+                  file=sys.stderr)
+            if interval and index < polls - 1 and clock is None:
+                await asyncio.sleep(interval)
+    finally:
+        proxy.stop()
+    with open(os.path.join(path, "kakao.json"), "w", encoding="utf-8") as f:
+        json.dump(proxy.kakao_responses, f, ensure_ascii=False)
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+async def synthesize(main, path: str, polls: int, records: int, churn: float, seed: int):
+    """
+    합성 녹화: 폴링마다 records*churn 건이 새로 들어오고 가장 오래된 것이 빠지는 슬라이딩 창
+    (Safe182 는 최근 목록 rowSize 건을 주므로 대부분은 이전 폴링과 겹친다). Kakao 는 합성 지오코더를 녹화한다
+    """
+    shift = max(0, round(records * churn))
+    pool = make_safe182_records(records + shift * (polls - 1), seed)
+    source = MockUpstreams(safe182_count=0, cctv_count=0, seed=seed).start()
+    main.SAFE_URL = f"{source.base_url}/safe182"
+    main.KAKAO_API_KEY = main.KAKAO_API_KEY or "synthetic"
+    start = datetime.now() - timedelta(seconds=POLL_INTERVAL_SECONDS * polls)
+
+    def before_poll(index):
+        # 새 레코드가 목록 앞쪽에 온다
+        window = pool[index * shift:index * shift + records]
+        source.safe182_records = list(reversed(window))
+
+    try:
+        return await record(main, path, polls, 0, f"{source.base_url}/kakao", "synthetic", before_poll,
+                            clock=lambda index: start + timedelta(seconds=POLL_INTERVAL_SECONDS * index))
+    finally:
+        source.stop()
+
+
+# ---------- 재생 ----------
+
+def db_statement_counts() -> dict:
+    """DB_QUERY_SECONDS 히스토그램의 (연산, 테이블)별 누적 실행 수"""
+    return {key: sum(child.counts) for key, child in list(DB_QUERY_SECONDS.children.items())}
+
+
+def db_rows_written() -> dict:
+    """DB_ROWS_WRITTEN 카운터의 (연산, 테이블)별 누적 행 수"""
+    return {key: child.value for key, child in list(DB_ROWS_WRITTEN.children.items())}
+
+
+def poll_gaps(polls, speedup: float):
+    """녹화 시각 간격 / speedup (초). speedup 0 이면 대기 없음"""
+    if not speedup:
+        return [0.0] * len(polls)
+    gaps = [0.0]
+    for previous, current in zip(polls, polls[1:]):
+        try:
+            gap = (datetime.fromisoformat(current["recorded_at"]) - datetime.fromisoformat(previous["recorded_at"])).total_seconds()
+        except (TypeError, ValueError):
+            gap = POLL_INTERVAL_SECONDS
+        gaps.append(max(gap, 0.0) / speedup)
+    return gaps
+
+
+async def replay(main, polls, kakao, args) -> dict:
+    upstreams = MockUpstreams(safe182_count=0, cctv_count=0, latency_ms=args.mock_latency_ms,
+                              kakao_miss_rate=1.0).start()
+    upstreams.kakao_responses = kakao
+    upstreams.patch(main)
+    sockets = [FakeWebSocket() for _ in range(args.ws_clients)]
+    for socket in sockets:
+        main.manager.active_connections.append(socket)
+        main.manager.connection_info[socket] = {"type": "driver"}
+
+    stages = dict.fromkeys(STAGES, 0.0)
+    poll_results = []
+    gaps = poll_gaps(polls, args.speedup) * args.repeat
+    counts_before = db_statement_counts()
+    rows_before = db_rows_written()
+    total_records = new_total = updated_total = 0
+    busy = slept = 0.0
+    try:
+        for index, poll in enumerate(polls * args.repeat):
+            if gaps[index]:
+                await asyncio.sleep(gaps[index])
+                slept += gaps[index]
+            upstreams.safe182_records = poll["records"]
+            with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+                poll_start = time.perf_counter()
+                raw = await main.fetch_safe182_data()
+                started = time.perf_counter()
+                stages["fetch"] += started - poll_start
+                report = await main.ingest_records(raw, main.SAFE182_SOURCE)
+                for stage, ms in report["stages_ms"].items():
+                    stages[stage] = stages.get(stage, 0.0) + ms / 1000
+                started = time.perf_counter()
+                await main.announce_ingest(report)
+                stages["broadcast"] += time.perf_counter() - started
+                seconds = time.perf_counter() - poll_start
+            busy += seconds
+            total_records += len(raw)
+            new_total += report["new"]
+            updated_total += report["updated"]
+            poll_results.append({
+                "poll": index,
+                "records": len(raw),
+                "new": report["new"],
+                "updated": report["updated"],
+                "unchanged": report["unchanged"],
+                "seconds": round(seconds, 4),
+            })
+            print(f"폴링 {index + 1:>3}: {len(raw):>4}건 (신규 {report['new']}, 갱신 {report['updated']}) "
+                  f"{seconds * 1000:>9.1f}ms")
+    finally:
+        upstreams.stop()
+        for socket in sockets:
+            main.manager.active_connections.remove(socket)
+            main.manager.connection_info.pop(socket, None)
+
+    counts_after = db_statement_counts()
+    statements = {
+        " ".join(key): count - counts_before.get(key, 0)
+        for key, count in counts_after.items() if count != counts_before.get(key, 0)
+    }
+    # executemany 는 문장 1회로 잡히므로 쓰기 부하는 바뀐 행 수로 본다
+    write_statements = sum(count for name, count in statements.items() if name.split(" ", 1)[0] in WRITE_OPERATIONS)
+    rows = {
+        " ".join(key): int(count - rows_before.get(key, 0))
+        for key, count in db_rows_written().items() if count != rows_before.get(key, 0)
+    }
+    rows_written = sum(rows.values())
+    per_record = max(total_records, 1)
+    return {
+        "polls": len(poll_results),
+        "records": total_records,
+        "new": new_total,
+        "updated": updated_total,
+        "busy_seconds": round(busy, 3),
+        "slept_seconds": round(slept, 3),
+        "records_per_sec": round(total_records / busy, 2) if busy else 0.0,
+        "stages": {
+            stage: {
+                "seconds": round(seconds, 4),
+                "ms_per_record": round(seconds / per_record * 1000, 3),
+                "share": round(seconds / busy * 100, 1) if busy else 0.0,
+            }
+            for stage, seconds in stages.items()
+        },
+        "db": {
+            "rows_written": rows_written,
+            "rows_written_per_record": round(rows_written / per_record, 2),
+            "write_statements": write_statements,
+            "write_statements_per_record": round(write_statements / per_record, 2),
+            "rows": dict(sorted(rows.items(), key=lambda item: -item[1])),
+            "statements": dict(sorted(statements.items(), key=lambda item: -item[1])),
+        },
+        "kakao": {
+            "recorded_queries": len(kakao),
+            "requests": upstreams.requests["kakao"],
+            "unrecorded": upstreams.requests["kakao_unrecorded"],
+        },
+        "broadcast": {"clients": len(sockets), "messages": sum(socket.sent for socket in sockets)},
+        "per_poll": poll_results,
+    }
+
+
+async def run(args) -> dict:
+    recording = os.path.abspath(args.recording)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="replay_safe182_"))
+    enter_workdir(workdir)
+    main = import_main(args.verbose)
+
+    if args.record or args.synthesize:
+        with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            await main.init_database()
+            if args.record:
+                manifest = await record(main, recording, args.polls, args.interval, main.KAKAO_GEO, "live")
+            else:
+                manifest = await synthesize(main, recording, args.polls, args.records, args.churn, args.seed)
+        print(f"녹화 저장: {recording} (폴링 {len(manifest['polls'])}회)")
+        return {"recording": recording, "manifest": manifest}
+
+    manifest, polls, kakao = load_recording(recording)
+    with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        counts = await build_fixture(main, args.fixture_persons) if args.fixture_persons else None
+        if counts is None:
+            await main.init_database()
+    print(f"재생: {recording} ({manifest.get('source')}, 폴링 {len(polls)}회 × {args.repeat}, 작업 디렉터리 {workdir})")
+
+    result = await replay(main, polls, kakao, args)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "recording": recording,
+            "source": manifest.get("source"),
+            "speedup": args.speedup,
+            "repeat": args.repeat,
+            "mock_latency_ms": args.mock_latency_ms,
+            "fixture": counts,
+        },
+        **result,
+    }
+
+
+def print_summary(report: dict):
+    print(f"\n=== {report['records']}건 / {report['busy_seconds']}초 → {report['records_per_sec']:,.1f} records/s ===")
+    for stage, values in report["stages"].items():
+        print(f"{stage:<11} {values['seconds']:>9.3f}s  {values['ms_per_record']:>8.3f}ms/건  {values['share']:>5.1f}%")
+    print(f"DB 쓰기 {report['db']['rows_written']}행 (레코드당 {report['db']['rows_written_per_record']}), "
+          f"쓰기 문장 {report['db']['write_statements']}회 (레코드당 {report['db']['write_statements_per_record']})")
+    for statement, count in report["db"]["statements"].items():
+        rows = report["db"]["rows"].get(statement)
+        print(f"  {statement:<36} {count}" + (f"  ({rows}행)" if rows is not None else ""))
+    if report["kakao"]["unrecorded"]:
+        print(f"⚠️ 녹화에 없는 Kakao 질의 {report['kakao']['unrecorded']}건 (좌표 없음으로 처리)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Safe182 폴링 오프라인 재생")
+    parser.add_argument("recording", help="녹화 디렉터리")
+    parser.add_argument("--record", action="store_true", help="실제 Safe182/Kakao 를 호출해 녹화")
+    parser.add_argument("--synthesize", action="store_true", help="합성 데이터로 녹화 생성")
+    parser.add_argument("--polls", type=int, default=12, help="녹화할 폴링 횟수")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_SECONDS, help="--record 폴링 간격 (초)")
+    parser.add_argument("--records", type=int, default=100, help="--synthesize 폴링 1회 레코드 수")
+    parser.add_argument("--churn", type=float, default=0.1, help="--synthesize 폴링마다 새로 들어오는 비율")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speedup", type=float, default=0.0, help="녹화 간격을 이 배수로 줄여 대기 (0 = 대기 없음)")
+    parser.add_argument("--repeat", type=int, default=1, help="녹화 전체를 반복 재생")
+    parser.add_argument("--ws-clients", type=int, default=100, help="브로드캐스트 받을 가짜 WebSocket 수")
+    parser.add_argument("--mock-latency-ms", type=float, default=0.0, help="로컬 Safe182/Kakao 응답 지연")
+    parser.add_argument("--fixture-persons", type=int, default=0, help="기존 실종자 N명이 있는 DB 에서 재생")
+    parser.add_argument("--workdir", help="DB 작업 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--verbose", action="store_true", help="서버 print 출력 표시")
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+
+    report = asyncio.run(run(args))
+    if "records" in report:
+        print_summary(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+    elif "records" in report:
+        print(json.dumps({key: value for key, value in report.items() if key != "per_poll"}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+벤치마크용 합성 SQLite 데이터 (실종자 / 목격 신고 / 기사 위치 / FCM 토큰 / API 요청 기록)
+
+main.py 는 현재 디렉터리의 missing_persons.db 와 static/ 을 쓰므로 작업 디렉터리를 만들어 옮긴 뒤 사용한다.
+    enter_workdir(path)
+    import main
+    await build_fixture(main, persons=10000)
+"""
+import os
+import json
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from benchmarks.mock_upstreams import DAEJEON_BOUNDS, DISTRICTS, DONGS, CLOTHING
+
+CATEGORIES = ["아동", "청소년", "성인", "치매노인", "지적장애"]
+PRIORITIES = ["HIGH", "MEDIUM", "LOW"]
+
+
+def enter_workdir(path: str):
+    os.makedirs(os.path.join(path, "static"), exist_ok=True)
+    os.chdir(path)
+
+
+def fixture_counts(persons: int) -> dict:
+    """실종자 수 기준 다른 테이블 크기 (목격 신고 = 실종자 수, 기사 위치 점 = 실종자 수 × 2)"""
+    return {
+        "persons": persons,
+        "sightings": persons,
+        "driver_points": persons * 2,
+        "drivers": max(persons // 50, 10),
+        "api_requests": max(persons // 10, 10),
+    }
+
+
+def fixture_ready(db_path: str, persons: int) -> bool:
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM bench_fixture_meta WHERE key = 'counts'").fetchone()
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+    return bool(row) and json.loads(row[0]) == fixture_counts(persons)
+
+
+def _point(rng: random.Random):
+    south, west, north, east = DAEJEON_BOUNDS
+    return rng.uniform(south, north), rng.uniform(west, east)
+
+
+async def build_fixture(main_module, persons: int, seed: int = 0, db_path: str = "missing_persons.db") -> dict:
+    """현재 디렉터리에 스키마(init_database)를 만들고 합성 데이터를 채운다. 같은 크기면 재사용"""
+    counts = fixture_counts(persons)
+    if fixture_ready(db_path, persons):
+        # 재사용하는 DB 도 현재 코드의 마이그레이션은 적용
+        await main_module.init_database()
+        return dict(counts, reused=True)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    await main_module.init_database()
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    conn = sqlite3.connect(db_path)
+    with conn:
+        person_rows = []
+        for i in range(counts["persons"]):
+            lat, lng = _point(rng)
+            created = now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+            source = "REPORTER" if i % 20 == 0 else "SAFE182"
+            person_rows.append((
+                f"BENCH_{i:07d}", f"실종자{i:07d}", rng.randint(5, 90), rng.choice(["남자", "여자"]),
+                f"대전광역시 {rng.choice(DISTRICTS)} {rng.choice(DONGS)}", "", "", None,
+                rng.choice(PRIORITIES), json.dumps(["야간"], ensure_ascii=False), "{}", lat, lng,
+                created.isoformat(), created.isoformat(), "ACTIVE", rng.choice(CATEGORIES), source, None,
+                created.strftime("%Y%m%d"), rng.choice(CLOTHING), None, None,
+                "PENDING" if source == "REPORTER" and i % 40 == 0 else "APPROVED",
+            ))
+        conn.executemany('''
+            INSERT INTO missing_persons
+            (id, name, age, gender, location, description, photo_url, photo_base64,
+             priority, risk_factors, extracted_features, lat, lng, created_at, updated_at,
+             status, category, source, confidence_score, last_seen, clothing_description,
+             medical_condition, emergency_contact, approval_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', person_rows)
+
+        conn.executemany('''
+            INSERT INTO sighting_reports
+            (person_id, reporter_id, reporter_lat, reporter_lng, description, confidence_level, reported_at, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (f"BENCH_{rng.randrange(counts['persons']):07d}", f"driver_{rng.randrange(counts['drivers'])}",
+             *_point(rng), "비슷한 사람 목격", rng.choice(["HIGH", "MEDIUM", "LOW"]),
+             (now - timedelta(minutes=rng.randint(0, 30 * 24 * 60))).isoformat(),
+             rng.choice(["PENDING", "CONFIRMED", "REJECTED"]))
+            for _ in range(counts["sightings"])
+        ])
+
+        conn.executemany('''
+            INSERT INTO driver_locations (driver_id, lat, lng, accuracy, speed, heading, timestamp, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (f"driver_{rng.randrange(counts['drivers'])}", *_point(rng), 10.0, rng.uniform(0, 60), rng.uniform(0, 360),
+             (now - timedelta(seconds=rng.randint(0, 7 * 24 * 3600))).isoformat(), 1)
+            for _ in range(counts["driver_points"])
+        ])
+
+        conn.executemany('''
+            INSERT INTO fcm_tokens (token, user_id, driver_name, platform, registered_at, last_active, active)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+        ''', [
+            (f"bench-token-{i}", f"driver_{i}", f"기사{i}", "flutter", now.isoformat(), now.isoformat())
+            for i in range(counts["drivers"])
+        ])
+
+        conn.executemany('''
+            INSERT INTO api_requests (request_time, endpoint, method, result_count, success, response_time, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            ((now - timedelta(minutes=rng.randint(0, 6 * 60))).isoformat(), "SAFE182", "POST", 100,
+             1 if rng.random() > 0.05 else 0, rng.uniform(0.2, 2.0), None)
+            for _ in range(counts["api_requests"])
+        ])
+
+        conn.execute("CREATE TABLE IF NOT EXISTS bench_fixture_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("INSERT OR REPLACE INTO bench_fixture_meta VALUES ('counts', ?)", (json.dumps(counts),))
+    conn.close()
+    return dict(counts, reused=False)
@@ -0,0 +1,682 @@
+import os
+import math
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from osm_feature_store import get_store
+
+# 실종 위치 기준 각 방향 샘플 지점 (약 500m)
+DIRECTION_OFFSETS = {
+    "north": {"angle": 0, "lat_offset": 0.0045, "lon_offset": 0},
+    "east": {"angle": 90, "lat_offset": 0, "lon_offset": 0.006},
+    "south": {"angle": 180, "lat_offset": -0.0045, "lon_offset": 0},
+    "west": {"angle": 270, "lat_offset": 0, "lon_offset": -0.006},
+}
+# 각 방향 지점 주변 특징 반경 (m)
+FEATURE_RADIUS = 200
+FEATURE_TAGS = {
+    "highway": True,
+    "landuse": True,
+    "amenity": True,
+    "natural": True,
+    "building": True,
+}
+
+# 특징 출처: auto (오프라인 저장소가 덮는 범위면 저장소, 아니면 Overpass) | store (저장소만, 네트워크 없음) | osmnx
+ENVIRONMENT_SOURCE = os.getenv("ENVIRONMENT_SOURCE", "auto")
+
+# 극좌표 격자 모드 기본값: 방위 수 × 거리 링(m), 셀 반경(m)
+ENVIRONMENT_GRID_BEARINGS = int(os.getenv("ENVIRONMENT_GRID_BEARINGS", "8"))
+ENVIRONMENT_GRID_RINGS = [int(r) for r in os.getenv("ENVIRONMENT_GRID_RINGS", "250,500,1000").split(",") if r.strip()]
+ENVIRONMENT_GRID_CELL_RADIUS = int(os.getenv("ENVIRONMENT_GRID_CELL_RADIUS", "150"))
+ENVIRONMENT_GRID_MAX_CELLS = 256
+# 링 거리 / 셀 반경 상한 (m) - 한 번에 조회하는 범위가 도보 탐색 반경을 넘지 않도록
+ENVIRONMENT_GRID_MAX_RING = int(os.getenv("ENVIRONMENT_GRID_MAX_RING", "5000"))
+ENVIRONMENT_GRID_MAX_CELL_RADIUS = int(os.getenv("ENVIRONMENT_GRID_MAX_CELL_RADIUS", "1000"))
+
+ENVIRONMENT_CACHE_SIZE = int(os.getenv("ENVIRONMENT_CACHE_SIZE", "512"))
+# 좌표 반올림 자릿수 (4자리 ≈ 11m)
+ENVIRONMENT_CACHE_PRECISION = int(os.getenv("ENVIRONMENT_CACHE_PRECISION", "4"))
+
+DEFAULT_DIRECTION_ENVIRONMENT = {
+    "road_type": "골목길",
+    "land_use": "주거지역",
+    "poi": ["없음"],
+    "hazard": ["없음"],
+    "slope": "평지",
+}
+
+
+def meters_to_degrees(lat: float, meters: float) -> Tuple[float, float]:
+    """위도 기준 m → (위도 차, 경도 차)"""
+    dlat = meters / 111320.0
+    dlon = meters / (111320.0 * math.cos(math.radians(lat)))
+    return dlat, dlon
+
+
+def point_bbox(lat: float, lon: float, meters: float) -> Tuple[float, float, float, float]:
+    """(west, south, east, north)"""
+    dlat, dlon = meters_to_degrees(lat, meters)
+    return lon - dlon, lat - dlat, lon + dlon, lat + dlat
+
+
+# 분류 이름 (배열 인덱스 순서)
+ROAD_TYPES = ["대로", "이차로", "골목길"]
+LAND_USES = ["상업지역", "공업지역", "공원", "주거지역"]
+POI_TYPES = ["학교", "병원", "버스정류장", "편의점"]
+HAZARD_TYPES = ["하천", "대형교차로"]
+
+# 태그 값 → 분류 조회표 (부분 문자열 검사 대신 정확히 일치하는 값만)
+ROAD_CLASSES = {
+    "motorway": "대로", "motorway_link": "대로", "trunk": "대로", "trunk_link": "대로",
+    "primary": "대로", "primary_link": "대로",
+    "secondary": "이차로", "secondary_link": "이차로", "tertiary": "이차로", "tertiary_link": "이차로",
+    "unclassified": "골목길", "residential": "골목길", "living_street": "골목길", "service": "골목길",
+    "pedestrian": "골목길", "footway": "골목길", "path": "골목길", "steps": "골목길", "track": "골목길",
+}
+# 도로 분류별 길이 가중치 (큰 길은 짧아도 주변 성격을 좌우)
+ROAD_CLASS_WEIGHTS = np.array([4.0, 2.0, 1.0])
+LAND_USE_CLASSES = {
+    "commercial": "상업지역", "retail": "상업지역",
+    "industrial": "공업지역",
+    "park": "공원", "recreation_ground": "공원", "village_green": "공원",
+    "residential": "주거지역",
+}
+AMENITY_POIS = {
+    "school": "학교", "prep_school": "학교", "kindergarten": "학교",
+    "hospital": "병원", "clinic": "병원",
+    "bus_station": "버스정류장",
+    "convenience": "편의점",
+}
+HIGHWAY_POIS = {"bus_stop": "버스정류장"}
+WATER_NATURALS = {"water": True, "riverbank": True, "wetland": True}
+MAJOR_HIGHWAYS = {"motorway": True, "motorway_link": True, "motorway_junction": True, "trunk": True, "trunk_link": True}
+
+# (열, 조회표, 분류 이름) → 값을 분류 인덱스로 바꾸는 표 (-1 = 해당 없음)
+CODE_TABLES = {
+    "road": ("highway", {v: ROAD_TYPES.index(c) for v, c in ROAD_CLASSES.items()}),
+    "land": ("landuse", {v: LAND_USES.index(c) for v, c in LAND_USE_CLASSES.items()}),
+    "amenity_poi": ("amenity", {v: POI_TYPES.index(c) for v, c in AMENITY_POIS.items()}),
+    "highway_poi": ("highway", {v: POI_TYPES.index(c) for v, c in HIGHWAY_POIS.items()}),
+    "water": ("natural", {v: 1 for v in WATER_NATURALS}),
+    "major": ("highway", {v: 1 for v in MAJOR_HIGHWAYS}),
+}
+
+def feature_weights(features) -> Tuple[np.ndarray, np.ndarray]:
+    """특징별 (길이 m, 면적 m²) - 저장소 질의 결과는 열 그대로, GeoDataFrame 은 투영해서 계산"""
+    if "length_m" in features.columns and "area_m2" in features.columns:
+        return features["length_m"].to_numpy(dtype=float), features["area_m2"].to_numpy(dtype=float)
+
+    if "geometry" in features.columns and hasattr(features, "estimate_utm_crs"):
+        projected = features.geometry.to_crs(features.estimate_utm_crs())
+        return projected.length.to_numpy(dtype=float), projected.area.to_numpy(dtype=float)
+
+    ones = np.ones(len(features))
+    return ones, ones
+
+
+def encode_frame(features) -> Dict[str, np.ndarray]:
+    """DataFrame/GeoDataFrame 태그 열 → 분류 인덱스 배열"""
+    # 열마다 고유값으로 1번만 인수분해한 뒤, 고유값에만 조회표 적용
+    factorized = {}
+    for column in {column for column, _ in CODE_TABLES.values()}:
+        if column in features.columns:
+            codes, uniques = pd.factorize(features[column].to_numpy())
+            factorized[column] = (codes, list(uniques))
+
+    encoded = {}
+    for name, (column, table) in CODE_TABLES.items():
+        if column in factorized:
+            codes, uniques = factorized[column]
+            lookup = np.array([table.get(v, -1) for v in uniques] + [-1], dtype=np.int64)
+            encoded[name] = lookup[codes]
+        else:
+            encoded[name] = np.full(len(features), -1, dtype=np.int64)
+    encoded["length"], encoded["area"] = feature_weights(features)
+    return encoded
+
+
+def encode_store(store, indices: np.ndarray) -> Dict[str, np.ndarray]:
+    """오프라인 저장소 특징 → 분류 인덱스 배열 (어휘 코드로 조회표 인덱싱, 문자열 처리 없음)"""
+    # 저장소 어휘 → 분류 인덱스 배열 (저장소마다 1회 계산해 저장소에 보관)
+    tables = store.derived.get("class_tables")
+    if tables is None:
+        tables = {}
+        for name, (column, table) in CODE_TABLES.items():
+            # 마지막 칸은 태그 없음(-1 코드)용
+            tables[name] = np.array([table.get(v, -1) for v in store.vocab[column]] + [-1], dtype=np.int64)
+        store.derived["class_tables"] = tables
+
+    encoded = {
+        name: tables[name][store.codes[column][indices]]
+        for name, (column, _) in CODE_TABLES.items()
+    }
+    encoded["length"] = store.length_m[indices].astype(float)
+    encoded["area"] = store.area_m2[indices].astype(float)
+    return encoded
+
+
+def weighted_top(classes: np.ndarray, weights: np.ndarray, names: List[str], default: str,
+                 class_weights: np.ndarray = None) -> str:
+    """분류별 가중치 합이 가장 큰 분류 (가중치가 모두 0이면 개수 기준)"""
+    mask = classes >= 0
+    if not mask.any():
+        return default
+
+    w = weights[mask]
+    if not (w > 0).any():
+        w = np.ones(len(w))
+    totals = np.bincount(classes[mask], weights=w, minlength=len(names))
+    if class_weights is not None:
+        totals = totals * class_weights
+    return names[int(np.argmax(totals))]
+
+
+def classify_encoded(encoded: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    분류 인덱스 배열 → 도로/토지/POI/위험 분류
+    도로는 길이, 토지 이용은 면적 가중 (행 순서와 무관)
+    """
+    # 도로 타입 (길이 × 분류 가중치)
+    road_type = weighted_top(encoded["road"], encoded["length"], ROAD_TYPES, "골목길", ROAD_CLASS_WEIGHTS)
+
+    # 토지 이용 (면적)
+    land_use = weighted_top(encoded["land"], encoded["area"], LAND_USES, "주거지역")
+
+    # POI (많은 순 최대 3개)
+    pois = np.concatenate([encoded["amenity_poi"], encoded["highway_poi"]])
+    counts = np.bincount(pois[pois >= 0], minlength=len(POI_TYPES))
+    order = np.argsort(-counts, kind="stable")
+    poi = [POI_TYPES[i] for i in order[:3] if counts[i] > 0] or ["없음"]
+
+    # 위험 요소
+    hazard = []
+    if (encoded["water"] > 0).any():
+        hazard.append("하천")
+    if (encoded["major"] > 0).any():
+        hazard.append("대형교차로")
+
+    if not hazard:
+        hazard = ["없음"]
+
+    return {
+        "road_type": road_type,
+        "land_use": land_use,
+        "poi": poi,
+        "hazard": hazard,
+        "slope": "평지",
+    }
+
+
+def classify_features(features) -> Dict[str, Any]:
+    """한 방향 지점 주변 OSM 특징 (DataFrame/GeoDataFrame) → 도로/토지/POI/위험 분류"""
+    return classify_encoded(encode_frame(features))
+
+
+def _one_hot(classes: np.ndarray, size: int) -> np.ndarray:
+    onehot = np.zeros((len(classes), size))
+    mask = classes >= 0
+    onehot[np.nonzero(mask)[0], classes[mask]] = 1.0
+    return onehot
+
+
+def classify_groups(encoded: Dict[str, np.ndarray], membership: np.ndarray,
+                    weights: Dict[str, np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    여러 셀(그룹)을 한 번에 분류 - membership: (특징 수, 그룹 수) bool
+    weights: 그룹 안으로 잘린 길이/면적 (특징 수, 그룹 수), 없으면 특징 전체 길이/면적
+    classify_encoded 와 같은 규칙을 행렬 곱으로 계산
+    """
+    m = membership.astype(float)
+    if weights is None:
+        weights = {"length": m * encoded["length"][:, None], "area": m * encoded["area"][:, None]}
+
+    def top(classes: np.ndarray, w: np.ndarray, size: int, default: int, class_weights=None) -> np.ndarray:
+        onehot = _one_hot(classes, size)
+        counts = m.T @ onehot
+        totals = w.T @ onehot
+        # 가중치가 없는 셀은 개수 기준
+        totals = np.where(totals.sum(axis=1, keepdims=True) > 0, totals, counts)
+        if class_weights is not None:
+            totals = totals * class_weights
+        return np.where(counts.sum(axis=1) > 0, totals.argmax(axis=1), default)
+
+    poi_counts = m.T @ (_one_hot(encoded["amenity_poi"], len(POI_TYPES)) + _one_hot(encoded["highway_poi"], len(POI_TYPES)))
+    hazards = np.column_stack([
+        m.T @ (encoded["water"] > 0).astype(float),
+        m.T @ (encoded["major"] > 0).astype(float),
+    ]) if len(m) else np.zeros((m.shape[1], len(HAZARD_TYPES)))
+
+    return {
+        "road_type": top(encoded["road"], weights["length"], len(ROAD_TYPES), ROAD_TYPES.index("골목길"), ROAD_CLASS_WEIGHTS),
+        "land_use": top(encoded["land"], weights["area"], len(LAND_USES), LAND_USES.index("주거지역")),
+        "poi_counts": poi_counts,
+        "hazard": hazards > 0,
+        "feature_count": membership.sum(axis=0),
+    }
+
+
+def decode_group(classified: Dict[str, np.ndarray], g: int) -> Dict[str, Any]:
+    """classify_groups 결과 중 한 그룹 → 기존 방향 환경 dict"""
+    counts = classified["poi_counts"][g]
+    order = np.argsort(-counts, kind="stable")
+    hazard = [HAZARD_TYPES[h] for h in range(len(HAZARD_TYPES)) if classified["hazard"][g, h]]
+    return {
+        "road_type": ROAD_TYPES[int(classified["road_type"][g])],
+        "land_use": LAND_USES[int(classified["land_use"][g])],
+        "poi": [POI_TYPES[i] for i in order[:3] if counts[i] > 0] or ["없음"],
+        "hazard": hazard or ["없음"],
+        "slope": "평지",
+    }
+
+
+def grid_cells(lat: float, lon: float, bearings: int, rings: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    극좌표 격자 셀 중심 (링 × 방위 순서, 방위 0 = 북쪽, 시계 방향)
+    반환: (방위 각도 (B,), 셀 중심 (R*B, 2) lat/lon)
+    """
+    bearing_deg = np.arange(bearings) * 360.0 / bearings
+    theta = np.radians(bearing_deg)
+    distances = np.asarray(rings, dtype=float)[:, None]
+
+    dlat, dlon = meters_to_degrees(lat, 1.0)
+    center_lat = lat + distances * np.cos(theta)[None, :] * dlat
+    center_lon = lon + distances * np.sin(theta)[None, :] * dlon
+    return bearing_deg, np.column_stack([center_lat.ravel(), center_lon.ravel()])
+
+
+def frame_geometry(features) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """GeoDataFrame 도형 → 저장소와 같은 (꼭짓점 (V, 2) lat/lon, 오프셋, 종류) - 부분/링 사이는 NaN 행"""
+    gap = [(np.nan, np.nan)]
+    chunks, kinds = [], []
+    for geom in features.geometry:
+        parts = list(getattr(geom, "geoms", [geom])) if geom is not None else []
+        rings = []
+        for part in parts:
+            if part.is_empty:
+                continue
+            if part.geom_type == "Polygon":
+                rings.extend([part.exterior, *part.interiors])
+            else:
+                rings.append(part)
+        coords = []
+        for ring in rings:
+            coords.extend([(y, x) for x, y, *_ in ring.coords] + gap)
+        chunks.append(np.array(coords[:-1] or gap, dtype=float))
+        geom_type = geom.geom_type if geom is not None else "Point"
+        kinds.append(2 if "Polygon" in geom_type else 1 if "LineString" in geom_type else 0)
+
+    offsets = np.concatenate([[0], np.cumsum([len(c) for c in chunks])]).astype(np.int64)
+    vertices = np.vstack(chunks) if chunks else np.zeros((0, 2))
+    return vertices, offsets, np.array(kinds, dtype=np.int8)
+
+
+# 면 특징이 셀 원을 덮는 비율 추정용 표본점 (셀 반경 단위: 중심 + 0.45 링 6개 + 0.8 링 12개, 거의 등면적)
+CELL_SAMPLE_POINTS = np.vstack([[0.0, 0.0]] + [
+    radius * np.column_stack([np.cos(np.arange(n) * 2 * np.pi / n), np.sin(np.arange(n) * 2 * np.pi / n)])
+    for radius, n in [(0.45, 6), (0.8, 12)]
+])
+
+
+def cell_membership(feature_bounds: np.ndarray, geometry: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                    centers: np.ndarray, cell_radius: float, areas: np.ndarray) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    셀(반경 cell_radius 원)에 실제로 걸치는 특징 → (membership (특징 수, 셀 수), 셀 안으로 잘린 길이/면적)
+    범위 상자 겹침은 후보만 고르고, 꼭짓점 선분과 셀 중심 거리로 판정
+    (긴 대각선 도로/하천이 범위 상자만 지나는 셀에 위험 요소/전체 길이로 들어가지 않도록)
+    """
+    vertices, offsets, kind = geometry
+    n_features, n_cells = len(feature_bounds), len(centers)
+    membership = np.zeros((n_features, n_cells), dtype=bool)
+    weights = {"length": np.zeros((n_features, n_cells)), "area": np.zeros((n_features, n_cells))}
+    if not n_features or not n_cells:
+        return membership, weights
+
+    lat0 = float(centers[:, 0].mean())
+    dlat, dlon = meters_to_degrees(lat0, cell_radius)
+    west, east = centers[:, 1] - dlon, centers[:, 1] + dlon
+    south, north = centers[:, 0] - dlat, centers[:, 0] + dlat
+    b = feature_bounds[:, :, None]
+    candidates = (b[:, 0] <= east) & (b[:, 2] >= west) & (b[:, 1] <= north) & (b[:, 3] >= south)
+    f_idx, c_idx = np.nonzero(candidates)
+    if not len(f_idx):
+        return membership, weights
+
+    # 후보 (특징, 셀) 쌍마다 특징의 선분을 펼침 - 특징의 마지막 꼭짓점은 길이 0 선분 (점 특징 포함)
+    counts = np.diff(offsets)
+    pair_counts = counts[f_idx]
+    starts = np.concatenate([[0], np.cumsum(pair_counts)[:-1]])
+    a_index = np.repeat(offsets[f_idx] - starts, pair_counts) + np.arange(pair_counts.sum())
+    is_last = np.zeros(len(vertices), dtype=bool)
+    is_last[offsets[1:] - 1] = True
+    b_index = np.where(is_last[a_index], a_index, a_index + 1)
+
+    # 셀 중심 기준 평면 좌표 (m)
+    pair = np.repeat(np.arange(len(f_idx)), pair_counts)
+    center = centers[c_idx[pair]]
+    scale = np.array([111320.0, 111320.0 * math.cos(math.radians(lat0))])
+    a = (vertices[a_index] - center) * scale
+    e = (vertices[b_index] - center) * scale
+    ay, ax, ey, ex = a[:, 0], a[:, 1], e[:, 0], e[:, 1]
+    r = float(cell_radius)
+    r2 = r ** 2
+    # 셀 상자에 걸치는 선분만 거리/길이 계산, 셀 가로줄에 걸치는 선분만 교차 검사 (NaN 선분은 비교에서 빠짐)
+    y_overlap = (np.minimum(ay, ey) <= r) & (np.maximum(ay, ey) >= -r)
+    band = y_overlap & (np.maximum(ax, ex) >= -r)
+    near = band & (np.minimum(ax, ex) <= r)
+    n_pairs = len(f_idx)
+
+    rows = np.nonzero(near)[0]
+    py, px = ay[rows], ax[rows]
+    dy, dx = ey[rows] - py, ex[rows] - px
+    length2 = dy * dy + dx * dx
+    ad = py * dy + px * dx
+    a2 = py * py + px * px
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(length2 > 0, np.clip(-ad / length2, 0.0, 1.0), 0.0)
+        nearest = (py + t * dy) ** 2 + (px + t * dx) ** 2
+        # 선분이 원 안에 들어가는 구간 길이 (|a + s·d| = r 의 두 근 사이를 [0, 1] 로 자름)
+        root = np.sqrt(np.maximum(ad * ad - length2 * (a2 - r2), 0.0))
+        s0 = np.clip((-ad - root) / length2, 0.0, 1.0)
+        s1 = np.clip((-ad + root) / length2, 0.0, 1.0)
+        inside_length = np.where(length2 > 0, (s1 - s0) * np.sqrt(length2), 0.0)
+
+    # 선분은 쌍 순서대로 정렬돼 있으므로 쌍별 최소 거리는 구간 최솟값
+    row_pairs = pair[rows]
+    kept = np.bincount(row_pairs, minlength=n_pairs)
+    min_dist2 = np.full(n_pairs, np.inf)
+    if len(rows):
+        firsts = np.searchsorted(row_pairs, np.arange(n_pairs))
+        has_rows = kept > 0
+        min_dist2[has_rows] = np.minimum.reduceat(nearest, firsts[has_rows])
+    pair_length = np.bincount(row_pairs, weights=inside_length, minlength=n_pairs)
+    # 모든 꼭짓점이 원 안 = 원 밖 꼭짓점이 없음 (NaN 구분 행은 비교에서 빠짐)
+    contained = np.bincount(pair, weights=ay * ay + ax * ax > r2, minlength=n_pairs) == 0
+    pair_area = areas[f_idx]
+
+    # 면: 셀 중심이 안쪽인지(경계가 멀 때) / 셀을 덮는 비율(면적 가중치가 있을 때)만 표본점 짝홀 교차 검사
+    is_area = kind[f_idx] == 2
+    sampled = is_area & ((min_dist2 > r2) | ((pair_area > 0) & ~contained))
+    coverage = np.zeros((n_pairs, len(CELL_SAMPLE_POINTS)), dtype=bool)
+    rows = np.nonzero(band & sampled[pair])[0]
+    if len(rows):
+        samples = CELL_SAMPLE_POINTS * r
+        sy, sx = samples[None, :, 0], samples[None, :, 1]
+        py, px, qy, qx = ay[rows, None], ax[rows, None], ey[rows, None], ex[rows, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            crosses = ((py > sy) != (qy > sy)) & (sx < px + (sy - py) * (qx - px) / (qy - py))
+        n_samples = len(CELL_SAMPLE_POINTS)
+        slots = (pair[rows, None] * n_samples + np.arange(n_samples)).ravel()
+        coverage = np.bincount(slots, weights=crosses.ravel(), minlength=n_pairs * n_samples).reshape(n_pairs, n_samples) % 2 == 1
+
+    member = (min_dist2 <= r2) | (is_area & coverage[:, 0])
+    # 통째로 들어간 면은 자기 면적, 아니면 덮는 비율 × 셀 면적 (자기 면적 이하)
+    clipped_area = np.where(contained, pair_area, np.minimum(pair_area, coverage.mean(axis=1) * math.pi * r2))
+
+    membership[f_idx, c_idx] = member
+    weights["length"][f_idx, c_idx] = np.where(member, pair_length, 0.0)
+    weights["area"][f_idx, c_idx] = np.where(member & is_area, clipped_area, 0.0)
+    return membership, weights
+
+
+class EnvironmentAnalyzer:
+    """
+    실종 위치 동서남북 환경 분석
+    4방향을 감싸는 범위를 한 번만 조회한 뒤 방향별로 잘라서 분류하고, 반올림 좌표 단위로 캐시
+    """
+
+    def __init__(self, cache_size: int = ENVIRONMENT_CACHE_SIZE, precision: int = ENVIRONMENT_CACHE_PRECISION,
+                 source: str = ENVIRONMENT_SOURCE, feature_store=None):
+        self.cache_size = cache_size
+        # 지정하지 않으면 OSM_STORE_PATH 의 공용 저장소 사용
+        self.feature_store = feature_store
+        self.precision = precision
+        self.source = source if source in ("auto", "store", "osmnx") else "auto"
+        self.cache = OrderedDict()
+        self.stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "store_queries": 0,
+            "fetches": 0,
+            "fetch_errors": 0,
+            "fetch_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def make_key(self, lat: float, lon: float) -> Tuple[float, float]:
+        return round(lat, self.precision), round(lon, self.precision)
+
+    @staticmethod
+    def direction_points(lat: float, lon: float) -> Dict[str, Tuple[float, float]]:
+        return {
+            direction: (lat + offset["lat_offset"], lon + offset["lon_offset"])
+            for direction, offset in DIRECTION_OFFSETS.items()
+        }
+
+    def query_bbox(self, lat: float, lon: float) -> Tuple[float, float, float, float]:
+        """4방향 지점 반경을 모두 포함하는 범위 (west, south, east, north)"""
+        bboxes = [point_bbox(p_lat, p_lon, FEATURE_RADIUS) for p_lat, p_lon in self.direction_points(lat, lon).values()]
+        return (
+            min(b[0] for b in bboxes), min(b[1] for b in bboxes),
+            max(b[2] for b in bboxes), max(b[3] for b in bboxes),
+        )
+
+    def _fetch_features(self, bbox: Tuple[float, float, float, float]):
+        """범위 (west, south, east, north) 를 Overpass 1회로 조회"""
+        import osmnx as ox  # geopandas 포함 무거운 모듈이라 실제 사용 시점에 import
+        from shapely.geometry import box
+
+        return ox.features_from_polygon(box(*bbox), tags=FEATURE_TAGS)
+
+    def _select_store(self, bbox: Tuple[float, float, float, float]):
+        if self.source == "osmnx":
+            return None
+
+        store = self.feature_store or get_store()
+        if store is None:
+            if self.source == "store":
+                raise RuntimeError("오프라인 OSM 저장소 없음 (python osm_feature_store.py build 로 생성)")
+            return None
+
+        if self.source == "store" or store.covers(*bbox):
+            return store
+        return None
+
+    def analyze_from_store(self, store, lat: float, lon: float) -> Dict[str, Dict[str, Any]]:
+        """오프라인 저장소에서 방향별 범위 질의 (네트워크 없음)"""
+        self.stats["store_queries"] += 1
+        result = {}
+        for direction, (p_lat, p_lon) in self.direction_points(lat, lon).items():
+            indices = store.query_indices(*point_bbox(p_lat, p_lon, FEATURE_RADIUS))
+            result[direction] = classify_encoded(encode_store(store, indices)) if len(indices) else dict(DEFAULT_DIRECTION_ENVIRONMENT)
+        return result
+
+    def analyze(self, lat: float, lon: float) -> Dict[str, Dict[str, Any]]:
+        """동기 분석 (스레드에서 실행)"""
+        store = self._select_store(self.query_bbox(lat, lon))
+        if store is not None:
+            return self.analyze_from_store(store, lat, lon)
+
+        start_time = time.time()
+        self.stats["fetches"] += 1
+        try:
+            gdf = self._fetch_features(self.query_bbox(lat, lon))
+        except Exception as e:
+            # 범위 안에 태그가 하나도 없으면 osmnx 가 예외를 던짐 → 전 방향 기본값
+            self.stats["fetch_errors"] += 1
+            print(f"⚠️  환경 데이터 없음: {e}")
+            gdf = None
+        self.stats["fetch_seconds"] += time.time() - start_time
+
+        if gdf is not None and not gdf.empty:
+            # 길이/면적은 합쳐진 범위에서 1번만 투영해서 계산
+            lengths, areas = feature_weights(gdf)
+            gdf = gdf.assign(length_m=lengths, area_m2=areas)
+
+        result = {}
+        for direction, (p_lat, p_lon) in self.direction_points(lat, lon).items():
+            if gdf is None or gdf.empty:
+                result[direction] = dict(DEFAULT_DIRECTION_ENVIRONMENT)
+                continue
+            try:
+                west, south, east, north = point_bbox(p_lat, p_lon, FEATURE_RADIUS)
+                result[direction] = classify_features(gdf.cx[west:east, south:north])
+            except Exception as e:
+                print(f"⚠️  {direction} 방향 데이터 없음: {e}")
+                result[direction] = dict(DEFAULT_DIRECTION_ENVIRONMENT)
+
+        return result
+
+    def _grid_features(self, bbox: Tuple[float, float, float, float]):
+        """격자 전체 범위의 특징을 1번에 조회 → (범위 상자 (F, 4), 도형 (꼭짓점, 오프셋, 종류), 분류 인덱스 배열)"""
+        store = self._select_store(bbox)
+        if store is not None:
+            self.stats["store_queries"] += 1
+            indices = store.query_indices(*bbox)
+            return store.bounds[indices], store.geometry(indices), encode_store(store, indices)
+
+        start_time = time.time()
+        self.stats["fetches"] += 1
+        try:
+            gdf = self._fetch_features(bbox)
+        except Exception as e:
+            self.stats["fetch_errors"] += 1
+            print(f"⚠️  환경 데이터 없음: {e}")
+            gdf = None
+        self.stats["fetch_seconds"] += time.time() - start_time
+
+        if gdf is None or gdf.empty:
+            empty_geometry = (np.zeros((0, 2)), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int8))
+            return np.zeros((0, 4)), empty_geometry, encode_frame(pd.DataFrame({"length_m": [], "area_m2": []}))
+        return gdf.bounds.to_numpy(dtype=float), frame_geometry(gdf), encode_frame(gdf)
+
+    def analyze_grid(self, lat: float, lon: float, bearings: int = ENVIRONMENT_GRID_BEARINGS,
+                     rings: List[int] = None, cell_radius: int = ENVIRONMENT_GRID_CELL_RADIUS) -> Dict[str, Any]:
+        """
+        극좌표 격자 환경 분석 (방위 × 거리 링). 격자 전체를 감싸는 범위를 1번만 조회하고
+        모든 셀을 행렬 연산으로 한 번에 분류. 셀 값은 분류 인덱스/비트마스크 배열 (링 × 방위 순서)
+        """
+        rings = rings or ENVIRONMENT_GRID_RINGS
+        bearing_deg, centers = grid_cells(lat, lon, bearings, rings)
+
+        dlat, dlon = meters_to_degrees(lat, max(rings) + cell_radius)
+        bbox = (lon - dlon, lat - dlat, lon + dlon, lat + dlat)
+        feature_bounds, geometry, encoded = self._grid_features(bbox)
+
+        # 면적 가중치는 토지 이용 분류에만 쓰이므로 해당 면만 셀 덮는 비율을 계산
+        land_area = np.where(encoded["land"] >= 0, encoded["area"], 0.0)
+        membership, weights = cell_membership(feature_bounds, geometry, centers, cell_radius, land_area)
+        cells = classify_groups(encoded, membership, weights)
+
+        # 동서남북 요약: 방위가 ±45° 안인 셀들을 합쳐서 분류 (기존 예측 입력 형식)
+        cardinal = np.array([DIRECTION_OFFSETS[d]["angle"] for d in DIRECTION_OFFSETS])
+        cell_bearings = np.tile(bearing_deg, len(rings))
+        diff = np.abs((cell_bearings[:, None] - cardinal[None, :] + 180) % 360 - 180)
+        in_direction = (diff <= 45).astype(float)
+        direction_membership = (membership.astype(float) @ in_direction) > 0
+        direction_weights = {name: w @ in_direction for name, w in weights.items()}
+        directions = classify_groups(encoded, direction_membership, direction_weights)
+
+        poi_bits = (cells["poi_counts"] > 0).astype(np.int64) @ (1 << np.arange(len(POI_TYPES)))
+        hazard_bits = cells["hazard"].astype(np.int64) @ (1 << np.arange(len(HAZARD_TYPES)))
+
+        return {
+            "grid": {
+                "shape": [len(rings), bearings],
+                "bearings": bearing_deg.tolist(),
+                "rings": list(rings),
+                "cell_radius": cell_radius,
+                "centers": np.round(centers, 6).tolist(),
+                "road_type": cells["road_type"].tolist(),
+                "land_use": cells["land_use"].tolist(),
+                "poi": poi_bits.tolist(),
+                "hazard": hazard_bits.tolist(),
+                "feature_count": cells["feature_count"].tolist(),
+                "legend": {
+                    "road_type": ROAD_TYPES,
+                    "land_use": LAND_USES,
+                    "poi": POI_TYPES,
+                    "hazard": HAZARD_TYPES,
+                },
+            },
+            "environment": {
+                direction: decode_group(directions, d) if directions["feature_count"][d] else dict(DEFAULT_DIRECTION_ENVIRONMENT)
+                for d, direction in enumerate(DIRECTION_OFFSETS)
+            },
+            "features": len(feature_bounds),
+        }
+
+    async def analyze_grid_async(self, lat: float, lon: float, bearings: int = ENVIRONMENT_GRID_BEARINGS,
+                                 rings: List[int] = None, cell_radius: int = ENVIRONMENT_GRID_CELL_RADIUS) -> Dict[str, Any]:
+        rings = list(rings or ENVIRONMENT_GRID_RINGS)
+        if bearings < 1 or not rings or bearings * len(rings) > ENVIRONMENT_GRID_MAX_CELLS:
+            raise ValueError(f"격자 크기 오류: 방위 {bearings} × 링 {len(rings)} (최대 {ENVIRONMENT_GRID_MAX_CELLS}셀)")
+        if any(r <= 0 or r > ENVIRONMENT_GRID_MAX_RING for r in rings):
+            raise ValueError(f"링 거리 오류: {rings} (1~{ENVIRONMENT_GRID_MAX_RING}m)")
+        if cell_radius <= 0 or cell_radius > ENVIRONMENT_GRID_MAX_CELL_RADIUS:
+            raise ValueError(f"셀 반경 오류: {cell_radius} (1~{ENVIRONMENT_GRID_MAX_CELL_RADIUS}m)")
+
+        self.stats["requests"] += 1
+        key_lat, key_lon = self.make_key(lat, lon)
+        key = ("grid", key_lat, key_lon, bearings, tuple(rings), cell_radius)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        grid = await asyncio.to_thread(self.analyze_grid, key_lat, key_lon, bearings, rings, cell_radius)
+        self._cache_put(key, grid)
+        return grid
+
+    def _cache_get(self, key):
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+            return cached
+
+    def _cache_put(self, key, value):
+        with self._lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def get_cached(self, lat: float, lon: float):
+        return self._cache_get(self.make_key(lat, lon))
+
+    def store(self, lat: float, lon: float, environment: Dict):
+        self._cache_put(self.make_key(lat, lon), environment)
+
+    async def analyze_async(self, lat: float, lon: float) -> Dict[str, Dict[str, Any]]:
+        """캐시 확인 후 미스면 스레드에서 분석 (이벤트 루프 블로킹 없음)"""
+        self.stats["requests"] += 1
+        cached = self.get_cached(lat, lon)
+        if cached is not None:
+            return cached
+
+        # 같은 반올림 좌표로 분석하면 캐시 키와 결과가 일치
+        key_lat, key_lon = self.make_key(lat, lon)
+        environment = await asyncio.to_thread(self.analyze, key_lat, key_lon)
+        self.store(lat, lon, environment)
+        return environment
+
+    def get_stats(self):
+        store = (self.feature_store or get_store()) if self.source != "osmnx" else None
+        return dict(
+            self.stats,
+            source=self.source,
+            store=store.get_stats() if store else None,
+            fetch_seconds=round(self.stats["fetch_seconds"], 2),
+            cache_size=len(self.cache),
+            hit_rate=round(self.stats["cache_hits"] / self.stats["requests"] * 100, 1) if self.stats["requests"] else 0.0,
+        )
+
+
+environment_analyzer = EnvironmentAnalyzer()
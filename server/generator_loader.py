@@ -0,0 +1,90 @@
+import time
+import threading
+import importlib
+from datetime import datetime
+
+
+class ImageGeneratorLoader:
+    """
+    이미지 생성기 지연 로딩 + 백그라운드 워밍업
+    image_generator 모듈(torch/diffusers/insightface)은 실제로 필요할 때만 import 하고,
+    한 번 로딩된 모델은 프로세스가 살아있는 동안 메모리에 상주시킨다.
+    """
+
+    def __init__(self):
+        self.state = "not_loaded"  # not_loaded → importing → loading → ready / failed
+        self.error = None
+        self.import_seconds = None
+        self.load_seconds = None
+        self.load_timings = {}
+        self.ready_at = None
+        self._generator = None
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+
+    def get(self):
+        """모델이 로딩된 생성기 반환 (워밍업 중이면 완료될 때까지 대기)"""
+        with self._lock:
+            if self._generator is not None and self.state == "ready":
+                return self._generator
+
+            try:
+                if self._generator is None:
+                    self.state = "importing"
+                    start_time = time.time()
+                    module = importlib.import_module("image_generator")
+                    self.import_seconds = time.time() - start_time
+                    print(f"이미지 생성 모듈 import 완료 ({self.import_seconds:.1f}초)")
+                    self._generator = module.get_generator()
+
+                self.state = "loading"
+                start_time = time.time()
+                if not self._generator.initialize_models():
+                    raise RuntimeError("모델 초기화 실패")
+                self.load_seconds = time.time() - start_time
+                self.load_timings = dict(self._generator.load_timings)
+
+                self.state = "ready"
+                self.error = None
+                self.ready_at = datetime.now().isoformat()
+                print(f"✅ 이미지 생성 모델 상주 완료 (로딩 {self.load_seconds:.1f}초)")
+
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                print(f"이미지 생성기 로딩 실패: {e}")
+                raise
+
+            return self._generator
+
+    def start_warmup(self):
+        """서버 시작 시 백그라운드 스레드에서 모델 미리 로딩"""
+        if self._warmup_thread and self._warmup_thread.is_alive():
+            return
+
+        def _warmup():
+            print("🔥 이미지 생성 모델 워밍업 시작 (백그라운드)")
+            try:
+                self.get()
+            except Exception:
+                pass
+
+        self._warmup_thread = threading.Thread(target=_warmup, name="image-generator-warmup", daemon=True)
+        self._warmup_thread.start()
+
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def get_status(self):
+        return {
+            "state": self.state,
+            "ready": self.is_ready(),
+            "import_seconds": round(self.import_seconds, 2) if self.import_seconds is not None else None,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+            "load_timings": {name: round(seconds, 2) for name, seconds in self.load_timings.items()},
+            "ready_at": self.ready_at,
+            "error": self.error,
+        }
+
+
+generator_loader = ImageGeneratorLoader()
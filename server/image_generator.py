@@ -1,42 +1,303 @@
 import os
 import io
+import time
 import base64
+import hashlib
+from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
 import torch
 import cv2
 import numpy as np
-import requests
 from PIL import Image
-from diffusers import StableDiffusionXLPipeline, EulerDiscreteScheduler
+from diffusers import StableDiffusionXLPipeline, EulerDiscreteScheduler, DPMSolverMultistepScheduler
 from insightface.app import FaceAnalysis
+from insightface.app.common import Face
 from huggingface_hub import hf_hub_download
 import insightface
 from compel import Compel, ReturnedEmbeddingsType
+from translation_service import translation_service
+
+IMAGE_GEN_PROFILE = os.getenv("IMAGE_GEN_PROFILE", "auto")
+IMAGE_GEN_THREADS = int(os.getenv("IMAGE_GEN_THREADS", "0"))
+PROMPT_CACHE_SIZE = int(os.getenv("IMAGE_GEN_PROMPT_CACHE_SIZE", "32"))
+FACE_CACHE_DIR = os.getenv("FACE_CACHE_DIR", "./face_cache")
+FACE_CACHE_MEMORY_SIZE = int(os.getenv("FACE_CACHE_MEMORY_SIZE", "256"))
+FAST_DET_SIZE = (320, 320)
+IMAGE_GEN_MAX_BATCH = int(os.getenv("IMAGE_GEN_MAX_BATCH", "4"))
+
+# 모든 생성에 공통으로 쓰는 고정 부정 프롬프트 (프로세스당 1회 인코딩)
+NEGATIVE_PROMPT = """portrait only, headshot, close-up, upper body only, half body, cropped, cut off, cut feet, cut shoes,
+standing pose, crouching, squatting, lying down, kneeling, bent over,
+side view, profile view, back view, rear view, turned away,
+looking away, looking down, looking up, eyes closed, head turned,
+crossed legs, legs tucked under chair, hands covering clothes, clenched fists, slouching, leaning back too far,
+busy background, props, chair back, armrests,
+wide-angle distortion, big head, foreshortened head, fisheye, extreme perspective, dutch angle,
+cartoon, anime, illustration, drawing, painting, sketch, rendered, CGI, 3D,
+low quality, blurry, out of focus, motion blur, distorted, deformed, ugly, bad anatomy, bad hands, extra fingers,
+multiple people, crowd, duplicated, duplicate person, extra limbs, missing limbs,
+text, watermark, readable logo, frame, border,
+dark, underexposed, overexposed, harsh shadows, color cast, uneven lighting,
+partial body crop,
+hood up, hood worn, hood forward, hood visible around the head, hood framing the face,
+hood touching/overlapping/covering the cap or brim, hood covering ears,
+hood casting shadow onto the cap,
+wearing the hood when wearing a hoodie (hood must not be worn),
+wearing hat, wearing cap, wearing beanie, hat on head, cap on head,
+beanie when baseball cap requested, knit cap when baseball cap requested,
+baseball cap when beanie requested, curved brim when beanie requested,
+wrong hat type, incorrect headwear"""
+
+# 이미지 생성 프로필 (auto: CUDA 있으면 gpu, 없으면 cpu)
+# width/height 는 SDXL 렌더링 해상도, output_* 은 업스케일 후 최종 해상도
+GENERATION_PROFILES = {
+    "gpu": {
+        "dtype": "float16",
+        "scheduler": "euler",
+        "steps": 35,
+        "guidance_scale": 8.5,
+        "width": 768,
+        "height": 1024,
+        "output_width": 768,
+        "output_height": 1024,
+        "attention_slicing": False,
+        "vae_tiling": False,
+    },
+    "cpu": {
+        "dtype": "float32",
+        "scheduler": "dpmpp",
+        "steps": 20,
+        "guidance_scale": 7.0,
+        "width": 768,
+        "height": 1024,
+        "output_width": 768,
+        "output_height": 1024,
+        "attention_slicing": True,
+        "vae_tiling": True,
+    },
+    "cpu_fast": {
+        "dtype": "bfloat16",
+        "scheduler": "dpmpp",
+        "steps": 14,
+        "guidance_scale": 7.0,
+        "width": 576,
+        "height": 768,
+        "output_width": 768,
+        "output_height": 1024,
+        "attention_slicing": True,
+        "vae_tiling": True,
+    },
+}
+
+TORCH_DTYPES = {
+    "float16": torch.float16,
+    "float32": torch.float32,
+    "bfloat16": torch.bfloat16,
+}
+
+def resolve_profile_name(profile_name: str = None) -> str:
+    name = (profile_name or IMAGE_GEN_PROFILE).lower()
+    if name == "auto":
+        return "gpu" if torch.cuda.is_available() else "cpu"
+    if name not in GENERATION_PROFILES:
+        print(f"⚠️ 알 수 없는 이미지 생성 프로필: {name} → auto")
+        return "gpu" if torch.cuda.is_available() else "cpu"
+    return name
+
+class PromptEmbeddingCache:
+    """
+    Compel 임베딩 캐시 (프롬프트 해시 키, conditioning + pooled 함께 저장)
+    고정 프롬프트는 pin 해서 제거되지 않게 두고, 인물별 프롬프트는 LRU로 제거
+    """
+    
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # key → (embeddings, 인코딩 소요 시간)
+        self.pinned = {}
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(prompt: str) -> str:
+        return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+    
+    def get_or_encode(self, prompt: str, encode_fn, pin: bool = False):
+        """캐시된 임베딩 반환, 없으면 인코딩 후 저장 → (embeddings, 절약된 시간)"""
+        key = self.make_key(prompt)
+        
+        with self._lock:
+            cached = self.pinned.get(key) or self.entries.get(key)
+            if cached is not None:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += cached[1]
+                return cached[0], cached[1]
+            self.misses += 1
+        
+        start_time = time.time()
+        embeddings = encode_fn(prompt)
+        encode_seconds = time.time() - start_time
+        
+        with self._lock:
+            if pin:
+                self.pinned[key] = (embeddings, encode_seconds)
+            else:
+                self.entries[key] = (embeddings, encode_seconds)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+        
+        return embeddings, 0.0
+    
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "pinned": len(self.pinned),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+            "saved_seconds": round(self.saved_seconds, 2),
+        }
+
+class FaceEmbeddingCache:
+    """
+    사진별 얼굴 정보 캐시 (bbox, kps, det_score, embedding)
+    메모리(LRU, 최대 max_size) + 디스크(npz) 2단계로 저장해서 재승인/재생성 시 얼굴 감지를 건너뜀
+    persist=False 항목(생성 템플릿 얼굴 등 다시 나올 일이 드문 것)은 메모리에만 둔다
+    """
+    
+    FIELDS = ("bbox", "kps", "det_score", "embedding")
+    
+    def __init__(self, cache_dir: str = FACE_CACHE_DIR, max_size: int = FACE_CACHE_MEMORY_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max(1, max_size)
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(data) -> str:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return hashlib.sha1(data).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+    
+    def _remember(self, key: str, face):
+        # self._lock 안에서 호출
+        self.memory[key] = face
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+    
+    def get(self, key: str, persist: bool = True):
+        with self._lock:
+            face = self.memory.get(key)
+            if face is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return face
+        
+        path = self._path(key)
+        if persist and os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    face = Face(**{name: data[name] for name in self.FIELDS if name in data.files})
+                if "det_score" in face:
+                    face.det_score = float(face.det_score)
+                with self._lock:
+                    self._remember(key, face)
+                    self.hits += 1
+                return face
+            except Exception as e:
+                print(f"얼굴 캐시 로드 실패 ({key[:8]}): {e}")
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def put(self, key: str, face, persist: bool = True):
+        record = Face(**{name: face[name] for name in self.FIELDS if face.get(name) is not None})
+        with self._lock:
+            self._remember(key, record)
+        if not persist:
+            return record
+        try:
+            np.savez(self._path(key), **{name: np.asarray(record[name]) for name in record})
+        except Exception as e:
+            print(f"얼굴 캐시 저장 실패 ({key[:8]}): {e}")
+        return record
+    
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            "memory_size": len(self.memory),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+        }
 
 class MissingPersonImageGenerator:
-    def __init__(self):
+    def __init__(self, profile_name: str = None):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         print(f"이미지 생성 디바이스: {self.device}")
         
+        self.profile_name = resolve_profile_name(profile_name)
+        self.profile = GENERATION_PROFILES[self.profile_name]
+        print(f"이미지 생성 프로필: {self.profile_name}")
+        
+        if self.device == "cpu" and self.profile_name == "gpu":
+            print("⚠️ CPU 환경에서 gpu 프로필(fp16) 사용 - 매우 느릴 수 있습니다")
+        
         self.sdxl_pipeline = None
         self.face_analyzer = None
         self.face_swapper = None
         self.compel = None
+        self.prompt_cache = PromptEmbeddingCache(PROMPT_CACHE_SIZE)
+        self.face_cache = FaceEmbeddingCache()
+        self.last_timings = {}
+        
+        # 모델 상주 상태 (한 번 로딩 후 재사용)
+        self.models_ready = False
+        self.load_timings = {}
+        self._init_lock = threading.Lock()
+        # SDXL 파이프라인/Compel/insightface 는 스레드 안전하지 않으므로 생성은 한 번에 하나씩
+        self._generate_lock = threading.Lock()
         
     def initialize_models(self):
+        with self._init_lock:
+            if self.models_ready:
+                return True
+            return self._load_models()
+    
+    def _load_models(self):
         try:
             print("=== Face Swap + Compel 모델 초기화 시작 ===")
+            self.load_timings = {}
             
             # 1. InsightFace
             print("1. InsightFace 초기화 중...")
+            step_start = time.time()
             self.face_analyzer = FaceAnalysis(
                 name='buffalo_l',
                 providers=['CPUExecutionProvider']
             )
             self.face_analyzer.prepare(ctx_id=0, det_size=(640, 640))
+            self.load_timings["insightface"] = time.time() - step_start
             print("✅ InsightFace 로딩 완료")
             
             # 2. Face Swapper (로컬만 사용)
             print("2. Face Swapper 모델 로딩 중 (로컬)...")
+            step_start = time.time()
             swapper_path = "./models/inswapper_128.onnx"
             
             if not os.path.exists(swapper_path):
@@ -46,31 +307,63 @@ class MissingPersonImageGenerator:
             else:
                 self.face_swapper = insightface.model_zoo.get_model(swapper_path)
                 print(f"✅ Face Swapper 로딩 완료 (로컬: {swapper_path})")
+            self.load_timings["face_swapper"] = time.time() - step_start
             
             # 3. SDXL 파이프라인
-            print("3. SDXL 파이프라인 로딩 중...")
+            print(f"3. SDXL 파이프라인 로딩 중 ({self.profile['dtype']})...")
+            step_start = time.time()
+            
+            if self.device == "cpu":
+                num_threads = IMAGE_GEN_THREADS or max(1, (os.cpu_count() or 2) // 2)
+                torch.set_num_threads(num_threads)
+                print(f"   torch 스레드 수: {num_threads}")
+            
+            torch_dtype = TORCH_DTYPES[self.profile["dtype"]]
             self.sdxl_pipeline = StableDiffusionXLPipeline.from_pretrained(
                 "stabilityai/stable-diffusion-xl-base-1.0",
-                torch_dtype=torch.float16,
-                variant="fp16"
+                torch_dtype=torch_dtype,
+                variant="fp16" if torch_dtype == torch.float16 else None
             ).to(self.device)
             
-            self.sdxl_pipeline.scheduler = EulerDiscreteScheduler.from_config(
-                self.sdxl_pipeline.scheduler.config
-            )
+            if self.profile["scheduler"] == "dpmpp":
+                self.sdxl_pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
+                    self.sdxl_pipeline.scheduler.config,
+                    algorithm_type="dpmsolver++",
+                    use_karras_sigmas=True
+                )
+            else:
+                self.sdxl_pipeline.scheduler = EulerDiscreteScheduler.from_config(
+                    self.sdxl_pipeline.scheduler.config
+                )
+            
+            # 피크 메모리 제한 (CPU 프로필)
+            if self.profile["attention_slicing"]:
+                self.sdxl_pipeline.enable_attention_slicing()
+            if self.profile["vae_tiling"]:
+                self.sdxl_pipeline.enable_vae_tiling()
+            self.load_timings["sdxl"] = time.time() - step_start
             
             print("✅ SDXL 파이프라인 로딩 완료")
             
             # 4. Compel 초기화
             print("4. Compel 초기화 중 (긴 프롬프트 지원)...")
+            step_start = time.time()
             self.compel = Compel(
                 tokenizer=[self.sdxl_pipeline.tokenizer, self.sdxl_pipeline.tokenizer_2],
                 text_encoder=[self.sdxl_pipeline.text_encoder, self.sdxl_pipeline.text_encoder_2],
                 returned_embeddings_type=ReturnedEmbeddingsType.PENULTIMATE_HIDDEN_STATES_NON_NORMALIZED,
                 requires_pooled=[False, True]
             )
+            self.load_timings["compel"] = time.time() - step_start
             print("✅ Compel 초기화 완료!")
             
+            # 5. 고정 부정 프롬프트 미리 인코딩
+            step_start = time.time()
+            self.prompt_cache.get_or_encode(NEGATIVE_PROMPT, self.compel, pin=True)
+            self.load_timings["negative_prompt"] = time.time() - step_start
+            print("✅ 부정 프롬프트 임베딩 캐시 완료")
+            
+            self.models_ready = True
             print("=== 모든 모델 로딩 완료 ===")
             return True
             
@@ -80,22 +373,65 @@ class MissingPersonImageGenerator:
             traceback.print_exc()
             return False
     
-    def extract_source_face(self, image: Image.Image):
+    def detect_faces(self, image_bgr, input_size=None):
+        """검출 모델만 실행 (랜드마크/인식 모델 생략) → bbox, kps 만 가진 Face 목록"""
+        bboxes, kpss = self.face_analyzer.det_model.detect(image_bgr, input_size=input_size, max_num=0, metric='default')
+        
+        faces = []
+        for i in range(bboxes.shape[0]):
+            faces.append(Face(
+                bbox=bboxes[i, 0:4],
+                kps=kpss[i] if kpss is not None else None,
+                det_score=float(bboxes[i, 4])
+            ))
+        return faces
+    
+    def analyze_source_face(self, image_bgr):
+        """
+        축소 해상도로 먼저 얼굴 위치를 찾고, 해당 영역만 전체 분석
+        축소 검출에 실패하면 원본 전체를 분석
+        """
+        quick_faces = self.detect_faces(image_bgr, input_size=FAST_DET_SIZE)
+        
+        if quick_faces:
+            main_face = max(quick_faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1]))
+            x1, y1, x2, y2 = main_face.bbox
+            margin_x = (x2 - x1) * 0.6
+            margin_y = (y2 - y1) * 0.6
+            height, width = image_bgr.shape[:2]
+            left = int(max(0, x1 - margin_x))
+            top = int(max(0, y1 - margin_y))
+            right = int(min(width, x2 + margin_x))
+            bottom = int(min(height, y2 + margin_y))
+            
+            faces = self.face_analyzer.get(image_bgr[top:bottom, left:right])
+            if faces:
+                face = faces[0]
+                offset = np.array([left, top], dtype=np.float32)
+                face.bbox = face.bbox + np.tile(offset, 2)
+                face.kps = face.kps + offset
+                return face
+        
+        faces = self.face_analyzer.get(image_bgr)
+        return faces[0] if faces else None
+    
+    def extract_source_face(self, image: Image.Image, cache_key: str = None):
         try:
             image_np = np.array(image)
             image_bgr = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
             
-            faces = self.face_analyzer.get(image_bgr)
+            face = self.analyze_source_face(image_bgr)
             
-            if not faces or len(faces) == 0:
+            if face is None:
                 print("⚠️ 얼굴 감지 실패")
                 return None
             
-            face = faces[0]
-            
             print(f"✅ 원본 얼굴 추출 성공")
             print(f"   - 신뢰도: {face.det_score:.2f}")
             
+            if cache_key:
+                face = self.face_cache.put(cache_key, face)
+            
             return face
             
         except Exception as e:
@@ -125,7 +461,18 @@ class MissingPersonImageGenerator:
             target_np = np.array(target_image)
             target_bgr = cv2.cvtColor(target_np, cv2.COLOR_RGB2BGR)
             
-            target_faces = self.face_analyzer.get(target_bgr)
+            # 같은 프롬프트/시드의 템플릿은 동일하므로 선택된 얼굴 위치 재사용 (메모리에만 보관)
+            template_key = "template_" + self.face_cache.make_key(target_np.tobytes())
+            cached_face = self.face_cache.get(template_key, persist=False)
+            if cached_face is not None:
+                print("템플릿 얼굴 캐시 사용 (감지 생략)")
+                print("얼굴 교체 중...")
+                result = self.face_swapper.get(target_bgr, cached_face, source_face, paste_back=True)
+                print("✅ 얼굴 교체 완료")
+                return Image.fromarray(cv2.cvtColor(result, cv2.COLOR_BGR2RGB))
+            
+            # 교체에는 bbox/kps 만 필요하므로 검출 모델만 실행
+            target_faces = self.detect_faces(target_bgr)
             
             if not target_faces or len(target_faces) == 0:
                 print("⚠️ 타겟 이미지에 얼굴 없음")
@@ -148,6 +495,7 @@ class MissingPersonImageGenerator:
                 best_face = target_faces[0]
             
             print(f"선택된 얼굴 각도: {self.align_face_angle(best_face.kps):.1f}도")
+            self.face_cache.put(template_key, best_face, persist=False)
             
             print("얼굴 교체 중...")
             result = self.face_swapper.get(target_bgr, best_face, source_face, paste_back=True)
@@ -189,40 +537,224 @@ class MissingPersonImageGenerator:
         return img_str
     
     def translate_description_to_english(self, korean_desc: str) -> str:
+        # main.py 와 같은 번역 서비스 사용 (용어집 + 캐시 + DeepL)
+        return translation_service.translate(korean_desc)
+    
+    def build_prompts(self, description: str, age: int, gender: str, english_desc: str = None):
+        """인적사항/옷차림 설명으로 SDXL 긍정·부정 프롬프트 생성 (english_desc 를 넘기면 번역 생략)"""
+        if english_desc is None:
+            english_desc = self.translate_description_to_english(description)
+        english_desc_modified = english_desc
+
+        # "후드티" → "hoodie (hood down, not worn)"
+        if "hoodie" in english_desc.lower() or "후드" in description:
+            english_desc_modified = english_desc_modified.replace("hoodie", "hoodie (hood down, not worn)")
+            english_desc_modified += ", hood is not worn"
+        
+        # "모자" 감지
+        if any(word in description for word in ["모자", "캡", "비니"]):
+            english_desc_modified += ", not wearing the hat/cap"
+        
+        print(f"[번역된 설명] {english_desc}")
+        print(f"[보정된 설명] {english_desc_modified}")
+        
+        gender_en = "male" if gender == "남성" else "female"
+        
+        prompt = f"""professional full body portrait photograph,
+Korean {gender_en} person, {age} years old,
+{english_desc_modified},
+standing is not allowed.
+seated on a simple backless stool (seat height 45–50cm), slight anterior pelvic tilt.
+camera at eye level to the torso (navel to chest height), 70–100mm lens, distance ~3–4m to avoid distortion.
+front view; centered; full body visible head to toe; no cropping.
+natural relaxed posture: torso leaning forward 5–10°, shoulders neutral.
+knees shoulder-width (90–100° angle), lower legs slightly forward so trousers and shoes are fully visible; feet flat, toes pointing forward.
+hands resting lightly on thighs, fingers naturally separated; detailed hands (nails, knuckles) without covering garments.
+plain white seamless background; clean studio lighting; soft key 45° camera-left, gentle rim light; fill -1EV; even professional exposure; sharp focus; photorealistic fashion lookbook.
+trousers show realistic fabric drape and subtle knee folds; hem sits lightly on shoes; socks minimal and unobtrusive.
+shoes fully visible (uppers and a hint of outsole), no perspective exaggeration.
+cap/logo minimal without readable text.
+hood must not be worn, hood down."""
+        
+        negative_prompt = NEGATIVE_PROMPT
+        
+        return prompt, negative_prompt
+    
+    def render_template(self, prompt: str, negative_prompt: str, seed: int = 42) -> Image.Image:
+        """Compel 인코딩 + SDXL 전신 템플릿 생성 (선택된 프로필의 해상도/스텝 사용)"""
+        return self.render_templates([prompt], negative_prompt, [seed])[0]
+    
+    def render_templates(self, prompts: List[str], negative_prompt: str, seeds: List[int]) -> List[Image.Image]:
+        """여러 프롬프트를 한 번의 SDXL 배치 호출로 생성 (샘플별 시드 고정)"""
+        profile = self.profile
+        batch_size = len(prompts)
+        
+        # 3. Compel로 긴 프롬프트 처리 (임베딩 캐시 사용)
+        print("\n3단계: Compel로 프롬프트 인코딩")
+        
+        step_start = time.time()
+        saved_seconds = 0.0
+        conditioning_results = []
+        for prompt in prompts:
+            result, saved = self.prompt_cache.get_or_encode(prompt, self.compel)
+            conditioning_results.append(result)
+            saved_seconds += saved
+        negative_conditioning_result, saved = self.prompt_cache.get_or_encode(
+            negative_prompt, self.compel, pin=negative_prompt == NEGATIVE_PROMPT
+        )
+        saved_seconds += saved
+        
+        # 튜플 언팩킹
+        if isinstance(negative_conditioning_result, tuple) and len(negative_conditioning_result) == 2:
+            conditionings = [result[0] for result in conditioning_results]
+            pooled_conditioning = torch.cat([result[1] for result in conditioning_results])
+            negative_conditioning, negative_pooled = negative_conditioning_result
+            negative_pooled = negative_pooled.expand(batch_size, -1)
+            print("✅ 프롬프트 인코딩 완료 (pooled 포함)")
+        else:
+            conditionings = conditioning_results
+            negative_conditioning = negative_conditioning_result
+            pooled_conditioning = None
+            negative_pooled = None
+            print("✅ 프롬프트 인코딩 완료")
+        
+        # 프롬프트마다 토큰 길이가 다를 수 있으므로 배치 결합 전에 길이 맞춤
+        if batch_size > 1 and len({c.shape[1] for c in conditionings + [negative_conditioning]}) > 1:
+            padded = self.compel.pad_conditioning_tensors_to_same_length(conditionings + [negative_conditioning])
+            conditionings, negative_conditioning = padded[:-1], padded[-1]
+        conditioning = torch.cat(conditionings)
+        negative_conditioning = negative_conditioning.expand(batch_size, -1, -1)
+        
+        self.last_timings["prompt_encode"] = time.time() - step_start
+        self.last_timings["prompt_cache_saved"] = saved_seconds
+        print(f"   임베딩 캐시: {saved_seconds:.2f}초 절약")
+        
+        # 4. SDXL로 템플릿 생성
+        print(f"\n4단계: SDXL 전신 템플릿 생성 (프로필: {self.profile_name}, 배치 {batch_size})")
+        print(f"   {profile['width']}x{profile['height']}, {profile['steps']} steps, {profile['scheduler']}")
+        
+        step_start = time.time()
+        generators = [torch.Generator(device=self.device).manual_seed(seed) for seed in seeds]
+        
+        pipeline_kwargs = {
+            "prompt_embeds": conditioning,
+            "negative_prompt_embeds": negative_conditioning,
+            "num_inference_steps": profile["steps"],
+            "guidance_scale": profile["guidance_scale"],
+            "height": profile["height"],
+            "width": profile["width"],
+            "generator": generators if batch_size > 1 else generators[0],
+        }
+        if pooled_conditioning is not None:
+            pipeline_kwargs["pooled_prompt_embeds"] = pooled_conditioning
+            pipeline_kwargs["negative_pooled_prompt_embeds"] = negative_pooled
+        
+        with torch.inference_mode():
+            template_images = self.sdxl_pipeline(**pipeline_kwargs).images
+        
+        # 저해상도로 렌더링한 경우 얼굴 교체 전에 출력 해상도로 업스케일
+        output_size = (profile["output_width"], profile["output_height"])
+        if template_images[0].size != output_size:
+            print(f"   업스케일: {template_images[0].size[0]}x{template_images[0].size[1]} → {output_size[0]}x{output_size[1]}")
+            template_images = [image.resize(output_size, Image.LANCZOS) for image in template_images]
+        self.last_timings["sdxl"] = time.time() - step_start
+        
+        print("✅ 템플릿 생성 완료")
+        return template_images
+    
+    def generate_batch(self, jobs: List[Dict]) -> List[Optional[str]]:
+        """
+        여러 실종자 이미지를 배치로 생성
+        jobs: [{"photo_base64", "description", "age", "gender", "seed"(선택)}]
+        반환: jobs 순서대로 생성된 base64 (실패한 항목은 None - 원본을 다시 저장하지 않도록)
+        """
+        with self._generate_lock:
+            return self._generate_batch(jobs)
+    
+    def _generate_batch(self, jobs: List[Dict]) -> List[Optional[str]]:
+        results: List[Optional[str]] = [None] * len(jobs)
+        
         try:
-            # 이미 영어면 그대로 반환
-            if not korean_desc or all(ord(c) < 128 for c in korean_desc if c.isalpha()):
-                return korean_desc
-            deepl_key = os.getenv("DEEPL_API_KEY", "")
-        
-            if deepl_key and deepl_key != "":
-                try:
-                    print(f"[DeepL] 번역 시도: {korean_desc}")
-                    
-                    deepl_response = requests.post(
-                        "https://api-free.deepl.com/v2/translate",
-                        data={
-                            "auth_key": deepl_key,
-                            "text": korean_desc,
-                            "source_lang": "KO",
-                            "target_lang": "EN-US"
-                        },
-                        timeout=10
-                    )
-                    
-                    if deepl_response.status_code == 200:
-                        translated = deepl_response.json()["translations"][0]["text"]
-                        print(f"[DeepL] 번역 완료: {translated}")
-                        return translated
-                    else:
-                        print(f"[DeepL] 오류: {deepl_response.status_code}")
+            if not self.models_ready:
+                self.initialize_models()
+            
+            print(f"\n=== 배치 전신 이미지 생성 시작 ({len(jobs)}명) ===")
+            total_start = time.time()
+            batch_timings = {"source_face": 0.0, "prompt_build": 0.0, "prompt_encode": 0.0,
+                             "prompt_cache_saved": 0.0, "sdxl": 0.0, "face_swap": 0.0}
+            
+            # 1. 원본 얼굴 추출 (실패한 항목은 None)
+            step_start = time.time()
+            ready_jobs = []
+            for index, job in enumerate(jobs):
+                source_face = self.get_source_face(job["photo_base64"])
+                if source_face is None:
+                    print(f"⚠️ [{index}] 얼굴 추출 실패 - 생성 생략")
+                    continue
+                ready_jobs.append((index, job, source_face))
+            batch_timings["source_face"] = time.time() - step_start
+            
+            # 2. 프롬프트 생성 (설명은 번역 서비스에 한 번에 요청)
+            step_start = time.time()
+            english_descs = translation_service.translate_many([job["description"] for _, job, _ in ready_jobs])
+            prompts = [
+                self.build_prompts(job["description"], job["age"], job["gender"], english_desc)[0]
+                for (_, job, _), english_desc in zip(ready_jobs, english_descs)
+            ]
+            batch_timings["prompt_build"] = time.time() - step_start
+            
+            # 3~5. 최대 배치 크기 단위로 SDXL 1회 호출 후 각각 얼굴 교체
+            for chunk_start in range(0, len(ready_jobs), IMAGE_GEN_MAX_BATCH):
+                chunk = ready_jobs[chunk_start:chunk_start + IMAGE_GEN_MAX_BATCH]
+                chunk_prompts = prompts[chunk_start:chunk_start + IMAGE_GEN_MAX_BATCH]
+                seeds = [job.get("seed", 42) for _, job, _ in chunk]
                 
-                except Exception as e:
-                    print(f"[DeepL] 실패: {e}")
+                self.last_timings = {}
+                template_images = self.render_templates(chunk_prompts, NEGATIVE_PROMPT, seeds)
+                for name in ("prompt_encode", "prompt_cache_saved", "sdxl"):
+                    batch_timings[name] += self.last_timings.get(name, 0.0)
+                
+                step_start = time.time()
+                for (index, job, source_face), template_image in zip(chunk, template_images):
+                    final_image = self.swap_face_with_alignment(template_image, source_face)
+                    result_base64 = self.image_to_base64(final_image)
+                    if result_base64:
+                        results[index] = result_base64
+                batch_timings["face_swap"] += time.time() - step_start
+            
+            batch_timings["total"] = time.time() - total_start
+            self.last_timings = batch_timings
+            self.print_timings()
+            
         except Exception as e:
-            print(f"[번역] 실패: {e}, 원문 사용")
+            print(f"배치 이미지 생성 오류: {e}")
+            import traceback
+            traceback.print_exc()
         
-        return korean_desc
+        return results
+    
+    def get_source_face(self, photo_base64: str):
+        """원본 사진의 얼굴 (캐시에 있으면 감지 생략)"""
+        face_key = self.face_cache.make_key(self.strip_data_url(photo_base64))
+        
+        source_face = self.face_cache.get(face_key)
+        if source_face is not None:
+            print("✅ 원본 얼굴 캐시 사용 (감지 생략)")
+            return source_face
+        
+        original_image = self.base64_to_image(photo_base64)
+        return self.extract_source_face(original_image, cache_key=face_key)
+    
+    @staticmethod
+    def strip_data_url(base64_string: str) -> str:
+        return base64_string.split(',')[1] if base64_string.startswith('data:') else base64_string
+    
+    def print_timings(self):
+        print("\n⏱️ 단계별 소요 시간")
+        for name, seconds in self.last_timings.items():
+            print(f"   - {name}: {seconds:.2f}초")
+        print(f"   프롬프트 캐시: {self.prompt_cache.get_stats()}")
+        print(f"   얼굴 캐시: {self.face_cache.get_stats()}")
     
     def generate_missing_person_image(
         self,
@@ -230,18 +762,30 @@ class MissingPersonImageGenerator:
         description: str,
         age: int,
         gender: str
+    ) -> str:
+        with self._generate_lock:
+            return self._generate_missing_person_image(original_photo_base64, description, age, gender)
+    
+    def _generate_missing_person_image(
+        self,
+        original_photo_base64: str,
+        description: str,
+        age: int,
+        gender: str
     ) -> str:
         try:
-            if not self.sdxl_pipeline:
+            if not self.models_ready:
                 self.initialize_models()
             
             print("\n=== Face Swap + Compel 전신 이미지 생성 시작 ===")
+            self.last_timings = {}
+            total_start = time.time()
             
             # 1. 원본에서 얼굴 추출
             print("\n1단계: 원본 얼굴 추출")
-            original_image = self.base64_to_image(original_photo_base64)
-            
-            source_face = self.extract_source_face(original_image)
+            step_start = time.time()
+            source_face = self.get_source_face(original_photo_base64)
+            self.last_timings["source_face"] = time.time() - step_start
             
             if not source_face:
                 print("⚠️ 얼굴 추출 실패 - 원본 반환")
@@ -250,122 +794,30 @@ class MissingPersonImageGenerator:
             # 2. 프롬프트 생성
             print("\n2단계: 긴 프롬프트 생성")
             
-            english_desc = self.translate_description_to_english(description)
-            english_desc_modified = english_desc
-
-            # "후드티" → "hoodie (hood down, not worn)"
-            if "hoodie" in english_desc.lower() or "후드" in description:
-                english_desc_modified = english_desc_modified.replace("hoodie", "hoodie (hood down, not worn)")
-                english_desc_modified += ", hood is not worn"
-            
-            # "모자" 감지
-            if any(word in description for word in ["모자", "캡", "비니"]):
-                english_desc_modified += ", not wearing the hat/cap"
-            
-            print(f"[번역된 설명] {english_desc}")
-            print(f"[보정된 설명] {english_desc_modified}")
-            
-            gender_en = "male" if gender == "남성" else "female"
-            
-            prompt = f"""professional full body portrait photograph,
-Korean {gender_en} person, {age} years old,
-{english_desc_modified},
-standing is not allowed.
-seated on a simple backless stool (seat height 45–50cm), slight anterior pelvic tilt.
-camera at eye level to the torso (navel to chest height), 70–100mm lens, distance ~3–4m to avoid distortion.
-front view; centered; full body visible head to toe; no cropping.
-natural relaxed posture: torso leaning forward 5–10°, shoulders neutral.
-knees shoulder-width (90–100° angle), lower legs slightly forward so trousers and shoes are fully visible; feet flat, toes pointing forward.
-hands resting lightly on thighs, fingers naturally separated; detailed hands (nails, knuckles) without covering garments.
-plain white seamless background; clean studio lighting; soft key 45° camera-left, gentle rim light; fill -1EV; even professional exposure; sharp focus; photorealistic fashion lookbook.
-trousers show realistic fabric drape and subtle knee folds; hem sits lightly on shoes; socks minimal and unobtrusive.
-shoes fully visible (uppers and a hint of outsole), no perspective exaggeration.
-cap/logo minimal without readable text.
-hood must not be worn, hood down."""
-            
-            negative_prompt = """portrait only, headshot, close-up, upper body only, half body, cropped, cut off, cut feet, cut shoes,
-standing pose, crouching, squatting, lying down, kneeling, bent over,
-side view, profile view, back view, rear view, turned away,
-looking away, looking down, looking up, eyes closed, head turned,
-crossed legs, legs tucked under chair, hands covering clothes, clenched fists, slouching, leaning back too far,
-busy background, props, chair back, armrests,
-wide-angle distortion, big head, foreshortened head, fisheye, extreme perspective, dutch angle,
-cartoon, anime, illustration, drawing, painting, sketch, rendered, CGI, 3D,
-low quality, blurry, out of focus, motion blur, distorted, deformed, ugly, bad anatomy, bad hands, extra fingers,
-multiple people, crowd, duplicated, duplicate person, extra limbs, missing limbs,
-text, watermark, readable logo, frame, border,
-dark, underexposed, overexposed, harsh shadows, color cast, uneven lighting,
-partial body crop,
-hood up, hood worn, hood forward, hood visible around the head, hood framing the face,
-hood touching/overlapping/covering the cap or brim, hood covering ears,
-hood casting shadow onto the cap,
-wearing the hood when wearing a hoodie (hood must not be worn),
-wearing hat, wearing cap, wearing beanie, hat on head, cap on head,
-beanie when baseball cap requested, knit cap when baseball cap requested,
-baseball cap when beanie requested, curved brim when beanie requested,
-wrong hat type, incorrect headwear"""
+            step_start = time.time()
+            prompt, negative_prompt = self.build_prompts(description, age, gender)
+            self.last_timings["prompt_build"] = time.time() - step_start
             
             print(f"[프롬프트] {prompt}")
             print(f"[프롬프트 단어 수] {len(prompt.split())}")
             
-            # 3. Compel로 긴 프롬프트 처리
-            print("\n3단계: Compel로 프롬프트 인코딩")
-            
-            conditioning_result = self.compel(prompt)
-            negative_conditioning_result = self.compel(negative_prompt)
-            
-            # 튜플 언팩킹
-            if isinstance(conditioning_result, tuple) and len(conditioning_result) == 2:
-                conditioning, pooled_conditioning = conditioning_result
-                negative_conditioning, negative_pooled = negative_conditioning_result
-                print("✅ 프롬프트 인코딩 완료 (pooled 포함)")
-            else:
-                conditioning = conditioning_result
-                negative_conditioning = negative_conditioning_result
-                pooled_conditioning = None
-                negative_pooled = None
-                print("✅ 프롬프트 인코딩 완료")
-            
-            # 4. SDXL로 템플릿 생성
-            print("\n4단계: SDXL 전신 템플릿 생성")
-            print("   (약 20-30초 소요)")
-            
-            generator = torch.Generator(device=self.device).manual_seed(42)
-            
-            if pooled_conditioning is not None:
-                template_image = self.sdxl_pipeline(
-                    prompt_embeds=conditioning,
-                    pooled_prompt_embeds=pooled_conditioning,
-                    negative_prompt_embeds=negative_conditioning,
-                    negative_pooled_prompt_embeds=negative_pooled,
-                    num_inference_steps=35,
-                    guidance_scale=8.5,
-                    height=1024,
-                    width=768,
-                    generator=generator
-                ).images[0]
-            else:
-                template_image = self.sdxl_pipeline(
-                    prompt_embeds=conditioning,
-                    negative_prompt_embeds=negative_conditioning,
-                    num_inference_steps=35,
-                    guidance_scale=8.5,
-                    height=1024,
-                    width=768,
-                    generator=generator
-                ).images[0]
-            
-            print("✅ 템플릿 생성 완료")
+            # 3~4. 프롬프트 인코딩 + SDXL 템플릿
+            template_image = self.render_template(prompt, negative_prompt)
             
             # 5. 얼굴 교체
             print("\n5단계: 얼굴 교체 (각도 보정)")
             
+            step_start = time.time()
             final_image = self.swap_face_with_alignment(template_image, source_face)
+            self.last_timings["face_swap"] = time.time() - step_start
             
             print("✅ 최종 이미지 생성 완료")
             
             # 6. Base64 변환
             result_base64 = self.image_to_base64(final_image)
+            self.last_timings["total"] = time.time() - total_start
+            
+            self.print_timings()
             
             return result_base64
             
@@ -378,8 +830,8 @@ wrong hat type, incorrect headwear"""
 
 generator = None
 
-def get_generator():
+def get_generator(profile_name: str = None):
     global generator
     if generator is None:
-        generator = MissingPersonImageGenerator()
+        generator = MissingPersonImageGenerator(profile_name)
     return generator
\ No newline at end of file
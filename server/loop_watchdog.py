@@ -0,0 +1,203 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+from datetime import datetime
+from collections import deque
+from typing import Optional
+
+from metrics import registry
+
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+LOOP_WATCHDOG_THRESHOLD_MS = float(os.getenv("LOOP_WATCHDOG_THRESHOLD_MS", "250"))
+LOOP_WATCHDOG_HEARTBEAT_MS = float(os.getenv("LOOP_WATCHDOG_HEARTBEAT_MS", "50"))
+LOOP_WATCHDOG_EVENTS = int(os.getenv("LOOP_WATCHDOG_EVENTS", "100"))
+# 한 번의 멈춤 동안 threshold 간격으로 다시 찍는 스택 수 (오래 걸리는 작업이 어디서 시간을 쓰는지)
+LOOP_WATCHDOG_MAX_SAMPLES = int(os.getenv("LOOP_WATCHDOG_MAX_SAMPLES", "20"))
+LOOP_WATCHDOG_STACK_DEPTH = int(os.getenv("LOOP_WATCHDOG_STACK_DEPTH", "40"))
+
+LOOP_STALLS = registry.counter(
+    "event_loop_stalls", "이벤트 루프가 임계값 이상 멈춘 횟수", ("route",))
+
+
+def extract_stack(frame, depth: int = LOOP_WATCHDOG_STACK_DEPTH):
+    """바깥 → 안쪽 순서의 "파일:줄 함수" 목록 (가장 안쪽이 루프를 막고 있는 코드)"""
+    stack = []
+    while frame is not None and len(stack) < depth:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def find_route(frame) -> Optional[str]:
+    """
+    막힌 스택에서 ASGI scope 를 찾아 라우트 템플릿을 꺼낸다.
+    코루틴은 await 체인 전체가 같은 스택 위에서 실행되므로 Starlette 라우팅 프레임의 scope 가 보인다.
+    """
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") in ("http", "websocket"):
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                return f"{scope.get('method', 'WS')} {route.path}"
+            if scope.get("path"):
+                return f"{scope.get('method', 'WS')} {scope['path']}"
+        frame = frame.f_back
+    return None
+
+
+class LoopWatchdog:
+    """
+    이벤트 루프 멈춤 감시
+    루프 위의 하트비트 코루틴이 heartbeat 간격으로 시각을 갱신하고, 별도 데몬 스레드가 그 시각을 확인한다.
+    하트비트가 threshold 이상 늦으면 루프 스레드의 현재 스택(sys._current_frames)과 태스크/라우트를 기록한다.
+    꺼져 있으면 스레드와 하트비트가 모두 멈춰 부하가 없다.
+    """
+
+    def __init__(self, threshold_ms: float = LOOP_WATCHDOG_THRESHOLD_MS, heartbeat_ms: float = LOOP_WATCHDOG_HEARTBEAT_MS,
+                 max_events: int = LOOP_WATCHDOG_EVENTS, max_samples: int = LOOP_WATCHDOG_MAX_SAMPLES):
+        self.threshold = threshold_ms / 1000
+        self.heartbeat = heartbeat_ms / 1000
+        self.max_samples = max_samples
+        self.events = deque(maxlen=max_events)
+        self.stats = {"stalls": 0, "samples": 0, "max_lag_ms": 0.0, "total_stall_ms": 0.0}
+        self.loop = None
+        self.loop_thread_id = None
+        self.last_beat = time.monotonic()
+        self.current = None
+        self._heartbeat_task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._heartbeat_task is not None
+
+    # ---------- 켜고 끄기 ----------
+
+    def start(self):
+        """이벤트 루프 안에서 호출"""
+        if self.enabled:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"이벤트 루프 감시 시작 (임계값 {self.threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        if not self.enabled:
+            return
+        self._stop.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat_task = None
+        await asyncio.to_thread(self._thread.join, 1.0)
+        self._thread = None
+        print("이벤트 루프 감시 중지")
+
+    def configure(self, threshold_ms: Optional[float] = None, heartbeat_ms: Optional[float] = None):
+        if threshold_ms is not None:
+            self.threshold = max(threshold_ms, 10.0) / 1000
+        if heartbeat_ms is not None:
+            self.heartbeat = max(heartbeat_ms, 5.0) / 1000
+
+    # ---------- 감시 ----------
+
+    async def _beat(self):
+        while True:
+            self.last_beat = time.monotonic()
+            await asyncio.sleep(self.heartbeat)
+            self._close_stall(time.monotonic())
+
+    def _watch(self):
+        next_sample = None
+        while not self._stop.wait(min(self.heartbeat, self.threshold / 2)):
+            lag = time.monotonic() - self.last_beat - self.heartbeat
+            if lag < self.threshold:
+                next_sample = None
+                continue
+            if next_sample is None or lag >= next_sample:
+                self._sample(lag)
+                next_sample = lag + self.threshold
+
+    def _sample(self, lag: float):
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+        stack = extract_stack(frame)
+        with self._lock:
+            if self.current is None:
+                task = asyncio.current_task(self.loop)
+                self.current = {
+                    "started_at": datetime.fromtimestamp(time.time() - lag).isoformat(),
+                    "lag_ms": round(lag * 1000, 1),
+                    "task": task.get_name() if task else None,
+                    "route": find_route(frame),
+                    "blocking_frame": stack[-1] if stack else None,
+                    "stacks": [],
+                    "finished": False,
+                }
+                self.events.append(self.current)
+                self.stats["stalls"] += 1
+            event = self.current
+            event["lag_ms"] = round(lag * 1000, 1)
+            if len(event["stacks"]) >= self.max_samples:
+                return
+            self.stats["samples"] += 1
+            # 같은 스택이면 횟수만 올린다 (멈춘 동안 시간을 많이 쓴 스택이 많이 찍힘)
+            for sample in event["stacks"]:
+                if sample["stack"] == stack:
+                    sample["count"] += 1
+                    return
+            event["stacks"].append({"count": 1, "stack": stack})
+
+    def _close_stall(self, now: float):
+        """하트비트가 다시 돌면 진행 중이던 멈춤을 실제 지연으로 마감"""
+        if self.current is None:
+            return
+        with self._lock:
+            event, self.current = self.current, None
+            if event is None:
+                return
+            lag_ms = max((now - self.last_beat - self.heartbeat) * 1000, event["lag_ms"])
+            event["lag_ms"] = round(lag_ms, 1)
+            event["finished"] = True
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], event["lag_ms"])
+            self.stats["total_stall_ms"] = round(self.stats["total_stall_ms"] + event["lag_ms"], 1)
+        LOOP_STALLS.labels(event["route"] or event["task"] or "unknown").inc()
+        print(f"⚠️ 이벤트 루프 {event['lag_ms']:.0f}ms 멈춤: {event['route'] or event['task']} @ {event['blocking_frame']}")
+
+    # ---------- 조회 ----------
+
+    def get_events(self, limit: int = 20):
+        with self._lock:
+            events = list(self.events)[-limit:]
+        events.reverse()
+        return [dict(event, stacks=sorted(event["stacks"], key=lambda s: -s["count"])) for event in events]
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    def get_stats(self):
+        return dict(
+            self.stats,
+            enabled=self.enabled,
+            threshold_ms=round(self.threshold * 1000, 1),
+            heartbeat_ms=round(self.heartbeat * 1000, 1),
+            buffered_events=len(self.events),
+        )
+
+
+loop_watchdog = LoopWatchdog()
@@ -5,19 +5,32 @@ import sqlite3
 import asyncio
 import httpx
 import uuid
-import requests
-import osmnx as ox
+import hashlib
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Callable, Awaitable
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Body, Query, Depends
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field, validator
+from starlette.routing import Match
+from starlette.datastructures import MutableHeaders
 from dotenv import load_dotenv
-from image_generator import get_generator
+from generator_loader import generator_loader
+from translation_service import translation_service
+from system_logger import system_logger, install_logging
+from api_telemetry import api_telemetry
+from loop_watchdog import loop_watchdog, LOOP_WATCHDOG_ENABLED
+from request_profiler import request_profiler
+from polling_scheduler import safe182_scheduler
+from metrics import (
+    registry, timed, monitor_loop_lag, TimedConnection,
+    HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_PROGRESS, BACKGROUND_LOOP_SECONDS, WEBSOCKET_BROADCASTS,
+    GEOCODE_SECONDS, FCM_SEND_SECONDS, IMAGE_GENERATION_SECONDS,
+)
+from environment_analysis import environment_analyzer, ENVIRONMENT_GRID_BEARINGS, ENVIRONMENT_GRID_RINGS, ENVIRONMENT_GRID_CELL_RADIUS
 
 load_dotenv()
 
@@ -29,6 +42,23 @@ KAKAO_JAVASCRIPT_KEY = os.getenv("KAKAO_JAVASCRIPT_KEY")
 FIREBASE_CREDENTIALS = os.getenv("FIREBASE_CREDENTIALS", "./firebase_key.json")
 ITS_CCTV_API_KEY = os.getenv("ITS_CCTV_API_KEY", "")
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
+IMAGE_GEN_WARMUP = os.getenv("IMAGE_GEN_WARMUP", "false").lower() == "true"
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+SAFE182_PAGE_SIZE = int(os.getenv("SAFE182_PAGE_SIZE", "100"))
+SAFE182_MAX_PAGES = int(os.getenv("SAFE182_MAX_PAGES", "50"))
+SAFE182_PAGE_CONCURRENCY = int(os.getenv("SAFE182_PAGE_CONCURRENCY", "4"))
+SAFE182_SYNC_DAYS = 90
+SAFE182_SYNC_OVERLAP_DAYS = int(os.getenv("SAFE182_SYNC_OVERLAP_DAYS", "7"))
+SAFE182_FULL_SYNC_HOURS = float(os.getenv("SAFE182_FULL_SYNC_HOURS", "24"))
+INGEST_GEOCODE_CONCURRENCY = int(os.getenv("INGEST_GEOCODE_CONCURRENCY", "8"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+INGEST_PROGRESS_INTERVAL = float(os.getenv("INGEST_PROGRESS_INTERVAL", "0.5"))
+# 좌표 변환에 실패한 주소는 바뀌거나 이 시간이 지나기 전까지 다시 변환하지 않음
+GEOCODE_RETRY_MINUTES = float(os.getenv("GEOCODE_RETRY_MINUTES", "60"))
+
+def db_connect():
+    """missing_persons.db 연결 (execute 시간이 db_query_duration_seconds 에 기록됨)"""
+    return sqlite3.connect('missing_persons.db', factory=TimedConnection)
 
 class MissingPerson(BaseModel):
     id: str
@@ -98,6 +128,21 @@ class BatchUpdateRequest(BaseModel):
     person_ids: List[str]
     updates: Dict[str, Any]
 
+class BatchApproveRequest(BaseModel):
+    person_ids: List[str]
+
+class ProfilerConfig(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = None
+    route_rates: Optional[Dict[str, float]] = None
+    interval_ms: Optional[float] = None
+
+class LoopWatchdogConfig(BaseModel):
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[float] = None
+    heartbeat_ms: Optional[float] = None
+    clear: bool = False
+
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
@@ -123,6 +168,7 @@ class ConnectionManager:
     async def broadcast(self, message: dict, client_type: str = None):
         if not self.active_connections:
             return
+        WEBSOCKET_BROADCASTS.labels(message.get("type", "unknown")).inc()
         
         disconnected = []
         for connection in self.active_connections:
@@ -185,6 +231,108 @@ class OptimizedAPIManager:
             "cache_age": time.time() - self.cache_timestamp if self.cache_timestamp else 0
         }
 
+def safe182_occurrence_date(item: Dict) -> Optional[str]:
+    """occrde (20250312 / 2025-03-12 ...) → 'YYYY-MM-DD', 알 수 없으면 None"""
+    digits = "".join(ch for ch in str(item.get("occrde") or "") if ch.isdigit())[:8]
+    if len(digits) != 8:
+        return None
+    try:
+        return datetime.strptime(digits, "%Y%m%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+class Safe182SyncState:
+    """
+    Safe182 증분 동기화 워터마크 (safe182_sync_state 테이블에 보관)
+    watermark 는 지금까지 받은 가장 최근 발생일. 평소 폴링은 (watermark - 겹침 일수) 이후만 요청하고,
+    SAFE182_FULL_SYNC_HOURS 마다 90일 전체를 다시 받아 과거 건의 수정도 반영한다.
+    """
+    def __init__(self):
+        self.watermark = None
+        self.last_full_sync = None
+        self.last_sync = None
+        self.last_fetch = {}
+        self.last_ingest = {}
+        # 마지막으로 저장까지 끝난 응답의 해시와 조건부 요청 값 (ETag / Last-Modified)
+        self.digest = None
+        self.validators = {}
+        self.loaded = False
+    
+    def load(self):
+        conn = db_connect()
+        try:
+            rows = conn.execute('SELECT key, value FROM safe182_sync_state').fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        finally:
+            conn.close()
+        state = dict(rows)
+        self.watermark = state.get("watermark")
+        self.last_full_sync = state.get("last_full_sync")
+        self.last_sync = state.get("last_sync")
+        self.loaded = True
+    
+    def save(self):
+        now = datetime.now().isoformat()
+        values = [("watermark", self.watermark), ("last_full_sync", self.last_full_sync), ("last_sync", self.last_sync)]
+        conn = db_connect()
+        with conn:
+            conn.executemany('''
+                INSERT INTO safe182_sync_state (key, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            ''', [(key, value, now) for key, value in values if value is not None])
+        conn.close()
+    
+    def window(self, now: datetime, full: bool = False):
+        """요청할 (시작 시각, 전체 동기화 여부)"""
+        if not self.loaded:
+            self.load()
+        oldest = now - timedelta(days=SAFE182_SYNC_DAYS)
+        if full or not self.watermark or not self.last_full_sync:
+            return oldest, True
+        if now - datetime.fromisoformat(self.last_full_sync) >= timedelta(hours=SAFE182_FULL_SYNC_HOURS):
+            return oldest, True
+        start = datetime.strptime(self.watermark, "%Y-%m-%d") - timedelta(days=SAFE182_SYNC_OVERLAP_DAYS)
+        return max(start, oldest), False
+    
+    def conditional_headers(self, window: List[str]) -> Dict[str, str]:
+        """같은 조회 구간을 다시 요청할 때 보낼 If-None-Match / If-Modified-Since"""
+        if self.validators.get("window") != window:
+            return {}
+        headers = {}
+        if self.validators.get("etag"):
+            headers["If-None-Match"] = self.validators["etag"]
+        if self.validators.get("last_modified"):
+            headers["If-Modified-Since"] = self.validators["last_modified"]
+        return headers
+    
+    def advance(self, records: List[Dict]):
+        """저장까지 끝난 폴링 결과로 워터마크 이동 (실패한 페이지가 있으면 그대로 둔다)"""
+        if not self.last_fetch.get("complete"):
+            return
+        if not self.last_fetch.get("not_modified"):
+            self.digest = self.last_fetch.get("digest")
+            self.validators = self.last_fetch.get("validators") or {}
+        today = datetime.now().strftime("%Y-%m-%d")
+        dates = [date for date in map(safe182_occurrence_date, records) if date and date <= today]
+        if self.watermark:
+            dates.append(self.watermark)
+        if dates:
+            self.watermark = max(dates)
+        self.last_sync = datetime.now().isoformat()
+        if self.last_fetch.get("full"):
+            self.last_full_sync = self.last_sync
+        self.save()
+    
+    def get_stats(self):
+        return {
+            "watermark": self.watermark,
+            "last_sync": self.last_sync,
+            "last_full_sync": self.last_full_sync,
+            "last_fetch": self.last_fetch,
+            "last_ingest": self.last_ingest,
+        }
+
 firebase_admin = None
 firebase_messaging = None
 
@@ -236,6 +384,9 @@ async def init_firebase():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_database()
+    install_logging()
+    system_logger.start()
+    api_telemetry.start()
     firebase_initialized = await init_firebase()
     
     if firebase_initialized:
@@ -245,15 +396,28 @@ async def lifespan(app: FastAPI):
     
     await init_background_tasks()
     
+    if IMAGE_GEN_WARMUP:
+        generator_loader.start_warmup()
+    else:
+        print("이미지 생성 모델은 첫 승인 시 로딩됩니다 (IMAGE_GEN_WARMUP=true 로 사전 로딩)")
+    
     polling_task = asyncio.create_task(start_optimized_polling())
     cleanup_task = asyncio.create_task(cleanup_old_data())
     analytics_task = asyncio.create_task(update_analytics())
+    loop_lag_task = asyncio.create_task(monitor_loop_lag(LOOP_LAG_INTERVAL))
+    if LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
     
     yield
     
     polling_task.cancel()
     cleanup_task.cancel()
     analytics_task.cancel()
+    loop_lag_task.cancel()
+    await loop_watchdog.stop()
+    
+    await api_telemetry.stop()
+    await system_logger.stop()
 
 app = FastAPI(
     title="실종자 요청 처리 시스템", 
@@ -273,12 +437,102 @@ app.add_middleware(
 os.makedirs("static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 manager = ConnectionManager()
+
+def websocket_connection_counts():
+    counts = {("admin",): 0, ("driver",): 0}
+    for info in list(manager.connection_info.values()):
+        key = (info.get("type", "unknown"),)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+registry.gauge("websocket_connections", "WebSocket 연결 수 (client_type 별)", ("client_type",),
+               callback=websocket_connection_counts)
+
+class RequestMetricsMiddleware:
+    """
+    요청 수 / 지연 시간 기록
+    @app.middleware("http") (BaseHTTPMiddleware) 는 요청마다 작업과 스트림을 하나 더 만들므로 순수 ASGI 로 두고,
+    상태 코드는 http.response.start 메시지에서 읽는다.
+    """
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        status = "500"
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+        
+        HTTP_REQUESTS_IN_PROGRESS.labels().inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.labels().dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], route.path if route else "unmatched", status
+            ).observe(time.perf_counter() - start_time)
+
+def match_route_template(scope: dict) -> Optional[str]:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+    return None
+
+class RequestProfileMiddleware:
+    """
+    샘플링 대상 요청만 프로파일 (순수 ASGI)
+    대상이 아니면 send 를 감싸지 않고 그대로 넘기고, 대상이면 응답 시작 시점에 캡처를 끝내고 X-Profile-Id 헤더를 붙인다.
+    """
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        session = request_profiler.begin(scope, match_route_template) if scope["type"] == "http" else None
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+        
+        ended = False
+        
+        def finish(status: int) -> int:
+            nonlocal ended
+            ended = True
+            route = scope.get("route")
+            return request_profiler.end(session, route.path if route else "unmatched", status)
+        
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start" and not ended:
+                capture_id = finish(message["status"])
+                MutableHeaders(scope=message).append("X-Profile-Id", str(capture_id))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if not ended:
+                finish(500)
+
+# 나중에 추가한 미들웨어가 바깥쪽: 프로파일 → 메트릭 → CORS
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(RequestProfileMiddleware)
 api_manager = OptimizedAPIManager()
+safe182_sync = Safe182SyncState()
 
 SAFE_URL = "https://www.safe182.go.kr/api/lcm/findChildList.do"
 KAKAO_GEO = "https://dapi.kakao.com/v2/local/search/address.json"
 ITS_CCTV_URL = "https://openapi.its.go.kr:9443/cctvInfo"
 WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+UTIC_CCTV_URL = "https://www.utic.go.kr/map/mapcctv.do"
 
 async def init_background_tasks():
     print("백그라운드 작업 초기화 중...")
@@ -287,7 +541,7 @@ async def init_background_tasks():
     print("백그라운드 작업 초기화 완료")
 
 async def create_indexes():
-    conn = sqlite3.connect('missing_persons.db')
+    conn = db_connect()
     cursor = conn.cursor()
     
     try:
@@ -307,7 +561,7 @@ async def migrate_legacy_data():
     print("레거시 데이터 마이그레이션 확인 중...")
 
 async def init_database():
-    conn = sqlite3.connect('missing_persons.db')
+    conn = db_connect()
     cursor = conn.cursor()
     
     cursor.execute("PRAGMA table_info(missing_persons)")
@@ -352,7 +606,11 @@ async def init_database():
         ('clothing_description', 'TEXT'),
         ('medical_condition', 'TEXT'),
         ('emergency_contact', 'TEXT'),
-        ('approval_status', 'TEXT DEFAULT "APPROVED"')
+        ('approval_status', 'TEXT DEFAULT "APPROVED"'),
+        ('rejection_reason', 'TEXT'),
+        ('source_fingerprint', 'TEXT'),
+        ('geocode_failed_address', 'TEXT'),
+        ('geocode_failed_at', 'TEXT')
     ]
     
     for column_name, column_type in new_columns:
@@ -508,73 +766,30 @@ async def init_database():
         )
     ''')
     
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS safe182_sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TEXT
+        )
+    ''')
+    
     conn.commit()
     conn.close()
     print("데이터베이스 초기화 및 마이그레이션이 완료되었습니다.")
 
 def log_system_event(level: str, category: str, message: str, component: str = None):
     """
-    시스템 로그 저장
-    level: INFO, WARNING, ERROR
-    category: API, POLLING, GEOCODING 등
+    시스템 로그 저장 (버퍼에 넣고 system_logger 플러셔가 주기적으로 일괄 저장)
+    level: DEBUG, INFO, WARNING, ERROR
+    category: API, POLLING, GEOCODING 등 (system_logs.component 컬럼)
     message: 로그 메시지
-    component: 선택적 컴포넌트명
+    component: 선택적 세부 컴포넌트명 (data 컬럼)
     """
-    try:
-        conn = sqlite3.connect('missing_persons.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO system_logs (level, category, component, message, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            level,
-            category,
-            component or "SYSTEM",
-            message,
-            datetime.now().isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"시스템 로그 저장 실패: {e}")
-
-def save_missing_person(person: MissingPerson):
-    conn = sqlite3.connect('missing_persons.db')
-    cursor = conn.cursor()
-    
-    current_time = datetime.now().isoformat()
-    
-    # Safe182 데이터는 자동 승인, REPORTER는 승인 대기
-    approval_status = 'APPROVED' if person.source != 'REPORTER' else 'PENDING'
-    
-    cursor.execute('''
-        INSERT OR REPLACE INTO missing_persons 
-        (id, name, age, gender, location, description, photo_url, photo_base64, 
-         priority, risk_factors, extracted_features, lat, lng, 
-         created_at, updated_at, status, category, source, confidence_score,
-         last_seen, clothing_description, medical_condition, emergency_contact, 
-         approval_status, rejection_reason)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        person.id, person.name, person.age, person.gender, person.location,
-        person.description, person.photo_url, person.photo_base64, person.priority,
-        json.dumps(person.risk_factors, ensure_ascii=False),
-        json.dumps(person.extracted_features, ensure_ascii=False),
-        person.lat, person.lng, person.created_at, current_time, person.status, 
-        person.category, person.source, person.confidence_score,
-        person.last_seen, person.clothing_description, person.medical_condition,
-        person.emergency_contact, approval_status, None  # ✅ rejection_reason 추가 (NULL)
-    ))
-    
-    conn.commit()
-    conn.close()
-    
-    log_system_event("INFO", "DATABASE", f"실종자 저장: {person.name} ({person.id})")
+    system_logger.log(level, category, message, component)
 
 def get_missing_persons(status: str = "ACTIVE", limit: int = None, offset: int = 0) -> List[Dict]:
-    conn = sqlite3.connect('missing_persons.db')
+    conn = db_connect()
     cursor = conn.cursor()
     
     query = '''
@@ -613,73 +828,154 @@ def get_missing_persons(status: str = "ACTIVE", limit: int = None, offset: int =
     conn.close()
     return persons
 
-def get_existing_person_ids() -> set:
-    conn = sqlite3.connect('missing_persons.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT id FROM missing_persons WHERE status = "ACTIVE"')
-    ids = {row[0] for row in cursor.fetchall()}
-    
-    conn.close()
-    return ids
+SAFE182_NOT_MODIFIED = "not_modified"
 
-async def fetch_safe182_data():
+async def fetch_safe182_page(client: httpx.AsyncClient, params: Dict, page: int, headers: Dict[str, str] = None):
+    """
+    Safe182 한 페이지 요청 → (목록, totalCount 또는 None, 응답 헤더). 실패하면 None
+    조건부 요청에 304 가 오면 SAFE182_NOT_MODIFIED
+    """
+    start_time = time.time()
     try:
-        from datetime import datetime, timedelta
-        
-        # 오늘 기준 3개월 전부터 오늘까지
-        end_date_dt = datetime.now()
-        start_date_dt = end_date_dt - timedelta(days=90)
-        
-        # findChildList API는 YYYY-MM-DD 형식 사용
-        start_date = start_date_dt.strftime("%Y-%m-%d")  # ⭐ %Y%m%d → %Y-%m-%d
-        end_date = end_date_dt.strftime("%Y-%m-%d")      # ⭐ %Y%m%d → %Y-%m-%d
-        
-        params = {
-            "rowSize": 100, 
-            "page": 1,
-            "occrAdres": "대전",
-            "detailDate1": start_date,  # ⭐ occrde1 → detailDate1
-            "detailDate2": end_date      # ⭐ occrde2 → detailDate2
-        }
+        response = await client.post(SAFE_URL, data=dict(params, page=page), headers=headers)  # ⭐ 그냥 SAFE_URL 사용
+        response_time = time.time() - start_time
         
-        if SAFE182_ESNTL_ID and SAFE182_AUTH_KEY:
-            params["esntlId"] = SAFE182_ESNTL_ID
-            params["authKey"] = SAFE182_AUTH_KEY
+        if response.status_code == 304:
+            await log_api_request("SAFE182", "POST", 0, True, response_time)
+            return SAFE182_NOT_MODIFIED
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            start_time = time.time()
-            response = await client.post(SAFE_URL, data=params)  # ⭐ 그냥 SAFE_URL 사용
-            response_time = time.time() - start_time
-            
-            if response.status_code != 200:
-                api_manager.record_error()
-                log_system_event("ERROR", "SAFE182_API", f"API 오류: {response.status_code}")
-                return []
-            
-            data = response.json()
-            
-            if isinstance(data, dict):
-                if "list" in data:
-                    persons_list = data["list"]
-                else:
-                    log_system_event("WARNING", "SAFE182_API", f"알 수 없는 응답 형식: {list(data.keys())}")
-                    return []
-            elif isinstance(data, list):
-                persons_list = data
+        if response.status_code != 200:
+            api_manager.record_error()
+            await log_api_request("SAFE182", "POST", 0, False, response_time, f"HTTP {response.status_code}")
+            log_system_event("ERROR", "SAFE182_API", f"API 오류: {response.status_code} (page {page})")
+            return None
+        
+        data = response.json()
+        total = None
+        
+        if isinstance(data, dict):
+            if "list" in data:
+                persons_list = data["list"] or []
+                total = data.get("totalCount")
             else:
-                log_system_event("WARNING", "SAFE182_API", "응답이 예상 형식이 아닙니다")
-                return []
-            
-            await log_api_request("SAFE182", "POST", len(persons_list), True, response_time)
-            print(f"Safe182에서 {len(persons_list)}명의 실종자 데이터를 가져왔습니다 ({start_date} ~ {end_date})")
-            return persons_list
-            
+                log_system_event("WARNING", "SAFE182_API", f"알 수 없는 응답 형식: {list(data.keys())}")
+                return None
+        elif isinstance(data, list):
+            persons_list = data
+        else:
+            log_system_event("WARNING", "SAFE182_API", "응답이 예상 형식이 아닙니다")
+            return None
+        
+        await log_api_request("SAFE182", "POST", len(persons_list), True, response_time)
+        try:
+            total = int(total) if total is not None else None
+        except (TypeError, ValueError):
+            total = None
+        return persons_list, total, response.headers
+        
     except Exception as e:
         api_manager.record_error()
-        await log_api_request("SAFE182", "POST", 0, False, 0, str(e))
-        log_system_event("ERROR", "SAFE182_API", f"API 호출 실패: {e}")
-        return []
+        await log_api_request("SAFE182", "POST", 0, False, time.time() - start_time, str(e))
+        log_system_event("ERROR", "SAFE182_API", f"API 호출 실패 (page {page}): {e}")
+        return None
+
+async def fetch_safe182_data(full: bool = False, conditional: bool = False):
+    """
+    Safe182 실종자 목록 (모든 페이지)
+    첫 페이지의 totalCount 로 나머지 페이지를 동시에 받고, totalCount 가 없으면 짧은 페이지가 나올 때까지 차례로 받는다.
+    평소에는 워터마크 이후 구간만, 전체 동기화 주기가 되었거나 full=True 면 90일 전체를 요청한다.
+    conditional=True 면 첫 페이지에 ETag / Last-Modified 를 실어 보내고, 304 면 빈 목록을 돌려준다.
+    결과(페이지 수, 누락 여부, 304 여부, 응답 해시)는 safe182_sync.last_fetch 에 남는다.
+    """
+    end_date_dt = datetime.now()
+    start_date_dt, full = safe182_sync.window(end_date_dt, full)
+    
+    # findChildList API는 YYYY-MM-DD 형식 사용
+    start_date = start_date_dt.strftime("%Y-%m-%d")
+    end_date = end_date_dt.strftime("%Y-%m-%d")
+    
+    params = {
+        "rowSize": SAFE182_PAGE_SIZE,
+        "occrAdres": "대전",
+        "detailDate1": start_date,
+        "detailDate2": end_date
+    }
+    
+    if SAFE182_ESNTL_ID and SAFE182_AUTH_KEY:
+        params["esntlId"] = SAFE182_ESNTL_ID
+        params["authKey"] = SAFE182_AUTH_KEY
+    
+    window = [start_date, end_date]
+    complete = True
+    truncated = False
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        headers = safe182_sync.conditional_headers(window) if conditional else None
+        first = await fetch_safe182_page(client, params, 1, headers)
+        if first is None or first == SAFE182_NOT_MODIFIED:
+            not_modified = first is not None
+            safe182_sync.last_fetch = {"full": full, "pages": 1 if not_modified else 0, "records": 0,
+                                       "complete": not_modified, "not_modified": not_modified,
+                                       "window": window, "at": end_date_dt.isoformat()}
+            if not_modified:
+                print(f"Safe182 변경 없음 (304, {start_date} ~ {end_date})")
+            return []
+        persons_list, total, response_headers = first
+        pages = 1
+        
+        if total is not None:
+            pages = max(1, -(-total // SAFE182_PAGE_SIZE))
+            truncated = pages > SAFE182_MAX_PAGES
+            pages = min(pages, SAFE182_MAX_PAGES)
+            semaphore = asyncio.Semaphore(SAFE182_PAGE_CONCURRENCY)
+            
+            async def fetch_page(page: int):
+                async with semaphore:
+                    return await fetch_safe182_page(client, params, page)
+            
+            for result in await asyncio.gather(*(fetch_page(page) for page in range(2, pages + 1))):
+                if result is None:
+                    complete = False
+                else:
+                    persons_list.extend(result[0])
+        else:
+            last_page = persons_list
+            while len(last_page) >= SAFE182_PAGE_SIZE:
+                if pages >= SAFE182_MAX_PAGES:
+                    truncated = True
+                    break
+                result = await fetch_safe182_page(client, params, pages + 1)
+                if result is None:
+                    complete = False
+                    break
+                pages += 1
+                last_page = result[0]
+                persons_list.extend(last_page)
+    
+    if truncated:
+        log_system_event("WARNING", "SAFE182_API", f"페이지 상한({SAFE182_MAX_PAGES}) 초과, 일부 건은 다음 전체 동기화에서 받습니다")
+    digest = hashlib.sha1(json.dumps(persons_list, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
+    safe182_sync.last_fetch = {
+        "full": full,
+        "pages": pages,
+        "records": len(persons_list),
+        "total": total,
+        "complete": complete,
+        "truncated": truncated,
+        "not_modified": False,
+        # 응답이 마지막으로 저장한 것과 똑같은지 (조건부 요청을 지원하지 않는 API 대비)
+        "digest": digest,
+        "same_as_last": digest == safe182_sync.digest,
+        "validators": {
+            "window": window,
+            "etag": response_headers.get("etag"),
+            "last_modified": response_headers.get("last-modified"),
+        },
+        "window": window,
+        "at": end_date_dt.isoformat(),
+    }
+    print(f"Safe182에서 {len(persons_list)}명의 실종자 데이터를 가져왔습니다 "
+          f"({start_date} ~ {end_date}, {pages}페이지{', 전체 동기화' if full else ''})")
+    return persons_list
 
 def preprocess_address(address: str) -> str:
     if not address:
@@ -721,7 +1017,9 @@ def preprocess_address(address: str) -> str:
     
     return address if address else original
 
-async def geocode_address(address: str) -> Dict[str, float]:
+@timed(GEOCODE_SECONDS)
+async def geocode_address(address: str, client: Optional[httpx.AsyncClient] = None) -> Dict[str, float]:
+    """주소 → 대전 좌표 (Kakao). 여러 건을 연달아 변환할 때는 client 를 넘겨 연결을 재사용한다"""
     if not address or not KAKAO_API_KEY:
         return None
     
@@ -817,41 +1115,49 @@ async def geocode_address(address: str) -> Dict[str, float]:
             clean_addr = re.sub(r'대전광역시|대전시|대전', '', original).strip()
             attempts.append(("구매칭", f"{prefix} {clean_addr}"))
     
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(timeout=10.0)
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            for desc, test_addr in attempts:
-                if not test_addr or len(test_addr) < 2:
-                    continue
-                
+        for desc, test_addr in attempts:
+            if not test_addr or len(test_addr) < 2:
+                continue
+            
+            async with api_telemetry.track("KAKAO") as call:
                 response = await client.get(
                     KAKAO_GEO,
                     headers={"Authorization": f"KakaoAK {KAKAO_API_KEY}"},
                     params={"query": test_addr}
                 )
+                if response.status_code != 200:
+                    call.fail(f"HTTP {response.status_code}")
+            
+            if response.status_code == 200:
+                data = response.json()
+                docs = data.get("documents", [])
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    docs = data.get("documents", [])
+                if docs:
+                    address_name = docs[0].get("address_name", "")
+                    if "대전" not in address_name and address_name:
+                        print(f"대전이 아닌 좌표 결과 무시: '{original}' -> '{address_name}'")
+                        continue
                     
-                    if docs:
-                        address_name = docs[0].get("address_name", "")
-                        if "대전" not in address_name and address_name:
-                            print(f"대전이 아닌 좌표 결과 무시: '{original}' -> '{address_name}'")
-                            continue
-                        
-                        result = {
-                            "lat": float(docs[0]["y"]),
-                            "lng": float(docs[0]["x"])
-                        }
-                        print(f"{desc}: '{original}' -> '{test_addr}' -> {result}")
-                        return result
-            
-            print(f"대전 지역 좌표 찾기 실패: '{original}'")
-            return None
-            
+                    result = {
+                        "lat": float(docs[0]["y"]),
+                        "lng": float(docs[0]["x"])
+                    }
+                    print(f"{desc}: '{original}' -> '{test_addr}' -> {result}")
+                    return result
+        
+        print(f"대전 지역 좌표 찾기 실패: '{original}'")
+        return None
+        
     except Exception as e:
         print(f"지오코딩 오류: {e}")
         return None
+    finally:
+        if owns_client:
+            await client.aclose()
 
 def original_for_log(original, cleaned):
     """로그 출력용 헬퍼 함수"""
@@ -860,8 +1166,6 @@ def original_for_log(original, cleaned):
     return f"{original} -> {cleaned}"
 
 async def fetch_cctv_data(lat: float, lng: float, radius: int):
-    UTIC_CCTV_URL = "https://www.utic.go.kr/map/mapcctv.do"
-    
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         "Referer": "https://www.utic.go.kr/map/map.do?menu=cctv",
@@ -874,9 +1178,9 @@ async def fetch_cctv_data(lat: float, lng: float, radius: int):
         "type": "E"
     }
     
+    start_time = time.time()
     try:
         async with httpx.AsyncClient(verify=False) as client:
-            start_time = time.time()
             response = await client.post(UTIC_CCTV_URL, headers=headers, data=data, timeout=15.0)
             response_time = time.time() - start_time
             
@@ -906,7 +1210,7 @@ async def fetch_cctv_data(lat: float, lng: float, radius: int):
                 
     except Exception as e:
         print(f"UTIC CCTV API 오류: {e}")
-        await log_api_request("UTIC_CCTV", "POST", 0, False, 0, str(e))
+        await log_api_request("UTIC_CCTV", "POST", 0, False, time.time() - start_time, str(e))
         log_system_event("ERROR", "UTIC_CCTV", f"요청 실패: {e}")
         return []
 
@@ -915,7 +1219,7 @@ async def fetch_weather_data(lat: float, lng: float):
         return None
     
     try:
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient() as client, api_telemetry.track("WEATHER") as call:
             response = await client.get(
                 WEATHER_URL,
                 params={
@@ -928,19 +1232,22 @@ async def fetch_weather_data(lat: float, lng: float):
             )
             
             if response.status_code == 200:
+                call.count = 1
                 return response.json()
+            call.fail(f"HTTP {response.status_code}")
             
     except Exception as e:
         log_system_event("ERROR", "WEATHER_API", f"날씨 정보 요청 실패: {e}")
     
     return None
 
+@timed(FCM_SEND_SECONDS)
 async def send_fcm_notification(person: MissingPerson, custom_message: str = None):
     if not firebase_messaging:
         log_system_event("WARNING", "FCM", "Firebase가 초기화되지 않았습니다")
         return False
     
-    conn = sqlite3.connect('missing_persons.db')
+    conn = db_connect()
     cursor = conn.cursor()
     
     cursor.execute('SELECT token FROM fcm_tokens WHERE active = 1')
@@ -997,8 +1304,11 @@ async def send_fcm_notification(person: MissingPerson, custom_message: str = Non
         )
     )
     
+    start_time = time.time()
     try:
         response = firebase_messaging.send_multicast(message)
+        await log_api_request("FCM", "POST", response.success_count, response.success_count > 0,
+                              time.time() - start_time, None if response.success_count else f"전체 실패 {response.failure_count}건")
         
         cursor.execute('''
             INSERT INTO notifications 
@@ -1048,167 +1358,412 @@ async def send_fcm_notification(person: MissingPerson, custom_message: str = Non
         conn.commit()
         conn.close()
         
+        await log_api_request("FCM", "POST", 0, False, time.time() - start_time, str(e))
         log_system_event("ERROR", "FCM", f"전송 실패: {e}")
         return False
 
 async def log_api_request(endpoint: str, method: str, count: int, success: bool, response_time: float, error: str = None):
-    """API 요청 로그 저장"""
-    try:
-        conn = sqlite3.connect('missing_persons.db')
-        cursor = conn.cursor()
-        
-        from datetime import datetime
-        timestamp = datetime.now().isoformat()
-        status_code = 200 if success else 500
-        
-        cursor.execute('''
-            INSERT INTO api_requests (timestamp, endpoint, method, status_code, response_time)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (timestamp, endpoint, method, status_code, response_time))
-        
-        conn.commit()
-        conn.close()
-        
-    except Exception as e:
-        print(f"API 로그 저장 실패: {e}")
+    """
+    외부 API 호출 기록 (api_telemetry 메모리 카운터/히스토그램에 넣고,
+    플러셔가 api_requests 와 api_telemetry_rollups 에 주기적으로 저장)
+    """
+    api_telemetry.record(endpoint, success, response_time, count=count, method=method, error=error)
+
+INGEST_UPSERT_SQL = '''
+    INSERT INTO missing_persons 
+    (id, name, age, gender, location, description, photo_url, photo_base64, 
+     priority, risk_factors, extracted_features, lat, lng, 
+     created_at, updated_at, status, category, source, confidence_score,
+     last_seen, clothing_description, medical_condition, emergency_contact, 
+     approval_status, rejection_reason, source_fingerprint, geocode_failed_address, geocode_failed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name, age = excluded.age, gender = excluded.gender,
+        location = excluded.location, description = excluded.description, photo_url = excluded.photo_url,
+        lat = excluded.lat, lng = excluded.lng, updated_at = excluded.updated_at,
+        category = excluded.category, last_seen = excluded.last_seen,
+        clothing_description = excluded.clothing_description, source_fingerprint = excluded.source_fingerprint,
+        geocode_failed_address = excluded.geocode_failed_address, geocode_failed_at = excluded.geocode_failed_at
+'''
+
+class IngestSource:
+    """
+    수집 원본 어댑터 (ingest_records 에 넘김)
+    새 가져오기 경로는 상속해서 map_record(원본 → MissingPerson 필드) 와 record_id 를 구현한다
+    """
+    name = "UNKNOWN"
+    
+    def map_record(self, raw: Dict) -> Dict:
+        raise NotImplementedError
+    
+    def record_id(self, mapped: Dict) -> str:
+        raise NotImplementedError
+    
+    def fingerprint(self, raw: Dict) -> str:
+        """원본 레코드 해시 (필드 순서와 무관). 저장된 값과 같으면 변경 없음"""
+        return hashlib.sha1(json.dumps(raw, sort_keys=True, ensure_ascii=False, default=str).encode()).hexdigest()
 
-async def start_optimized_polling():
-    print("=" * 50)
-    print("✅ Safe182 폴링 시작")
-    print("=" * 50)
+class Safe182Source(IngestSource):
+    name = "SAFE182"
     
-    # ✅ 첫 실행은 무조건 API 호출
-    first_run = True
+    def map_record(self, item: Dict) -> Dict:
+        # ✅ Safe182 필드명 → MissingPerson 필드명 변환
+        return {
+            'name': item.get('nm', '이름 미상'),  # nm → name
+            'age': item.get('age'),
+            'gender': item.get('sexdstnDscd', ''),  # 성별 구분 코드
+            'location': item.get('occrAdres', ''),  # 발생 주소
+            'description': item.get('etc', ''),  # 기타 사항
+            'photo_url': item.get('tknphotoFile', ''),  # 사진 파일
+            'photo_base64': None,
+            'priority': 'MEDIUM',
+            'risk_factors': [],
+            'extracted_features': {},
+            'status': 'ACTIVE',
+            'source': 'SAFE182',
+            'category': None,
+            'created_at': datetime.now().isoformat(),
+            'last_seen': item.get('occrde', ''),  # 발생 일자
+            'clothing_description': item.get('dressingDscd', ''),  # 복장
+            'medical_condition': None,
+            'emergency_contact': None,
+            'lat': 36.3504,  # 대전 기본 좌표
+            'lng': 127.3845,
+            'confidence_score': None
+        }
     
-    while True:
-        try:
-            # ✅ 첫 실행은 캐시 무시
-            if not first_run:
-                cached_data = api_manager.get_cached_data()
-                if cached_data:
-                    print(f"💾 캐시된 데이터 사용 중 (5분 후 재확인)")
-                    await asyncio.sleep(300)
-                    continue
-                
-                if not api_manager.should_make_request():
-                    print("⏳ API 호출 제한, 1분 후 재시도")
-                    await asyncio.sleep(60)
-                    continue
-            
-            first_run = False
-            
-            print("🔄 Safe182 API 호출 중...")
-            log_system_event("INFO", "POLLING", "Safe182 API 폴링 시작")
-            raw_data_list = await fetch_safe182_data()
-            
-            if not raw_data_list:
-                print("⚠️  데이터 없음 (5분 후 재시도)")
-                await asyncio.sleep(300)
-                continue
-            
-            print(f"✅ Safe182에서 {len(raw_data_list)}명의 데이터 수신")
+    def record_id(self, mapped: Dict) -> str:
+        # Safe182 데이터에는 id가 없으므로 이름/발생일/주소로 생성
+        unique_str = f"{mapped.get('name', '')}_{mapped.get('last_seen', '')}_{mapped.get('location', '')}"
+        return f"SAFE182_{hashlib.md5(unique_str.encode()).hexdigest()[:12]}"
 
-            api_manager.update_cache(raw_data_list)
+SAFE182_SOURCE = Safe182Source()
 
-            # ✅ Safe182 필드명 → MissingPerson 필드명 변환
-            processed_data = []
-            for item in raw_data_list:
-                mapped = {
-                    'name': item.get('nm', '이름 미상'),  # nm → name
-                    'age': item.get('age'),
-                    'gender': item.get('sexdstnDscd', ''),  # 성별 구분 코드
-                    'location': item.get('occrAdres', ''),  # 발생 주소
-                    'description': item.get('etc', ''),  # 기타 사항
-                    'photo_url': item.get('tknphotoFile', ''),  # 사진 파일
-                    'photo_base64': None,
-                    'priority': 'MEDIUM',
-                    'risk_factors': [],
-                    'extracted_features': {},
-                    'status': 'ACTIVE',
-                    'source': 'SAFE182',
-                    'category': None,
-                    'created_at': datetime.now().isoformat(),
-                    'last_seen': item.get('occrde', ''),  # 발생 일자
-                    'clothing_description': item.get('dressingDscd', ''),  # 복장
-                    'medical_condition': None,
-                    'emergency_contact': None,
-                    'lat': 36.3504,  # 대전 기본 좌표
-                    'lng': 127.3845,
-                    'confidence_score': None
-                }
-                processed_data.append(mapped)
+def get_ingest_rows(ids: List[str]) -> Dict[str, tuple]:
+    """id → (source_fingerprint, location, lat, lng, geocode_failed_address, geocode_failed_at)"""
+    rows = {}
+    conn = db_connect()
+    try:
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            cursor = conn.execute(
+                f'SELECT id, source_fingerprint, location, lat, lng, geocode_failed_address, geocode_failed_at '
+                f'FROM missing_persons WHERE id IN ({",".join("?" * len(chunk))})',
+                chunk
+            )
+            for row in cursor.fetchall():
+                rows[row[0]] = row[1:]
+    finally:
+        conn.close()
+    return rows
 
-            if not processed_data:
-                await asyncio.sleep(300)
-                continue
+def upsert_ingested_persons(persons: List[tuple]):
+    """
+    (MissingPerson, fingerprint, 좌표 변환 실패 (주소, 시각) 또는 None) 목록을 한 트랜잭션으로 저장
+    기존 행은 원본에서 오는 필드만 갱신하고 created_at, 상태/승인, 생성 이미지 등 서버에서 바꾼 값은 그대로 둔다
+    """
+    if not persons:
+        return
+    current_time = datetime.now().isoformat()
+    conn = db_connect()
+    with conn:
+        conn.executemany(INGEST_UPSERT_SQL, [
+            (
+                person.id, person.name, person.age, person.gender, person.location,
+                person.description, person.photo_url, person.photo_base64, person.priority,
+                json.dumps(person.risk_factors, ensure_ascii=False),
+                json.dumps(person.extracted_features, ensure_ascii=False),
+                person.lat, person.lng, person.created_at, current_time, person.status,
+                person.category, person.source, person.confidence_score,
+                person.last_seen, person.clothing_description, person.medical_condition,
+                person.emergency_contact, 'APPROVED' if person.source != 'REPORTER' else 'PENDING', None, fingerprint,
+                *(failure or (None, None))
+            )
+            for person, fingerprint, failure in persons
+        ])
+    conn.close()
 
-            existing_ids = get_existing_person_ids()
-            new_persons = []
-            updated_persons = []
+def recent_geocode_failure(stored: Optional[tuple], location: str) -> bool:
+    """같은 주소의 좌표 변환이 GEOCODE_RETRY_MINUTES 안에 실패했는지 (stored: get_ingest_rows 의 행)"""
+    if not stored or not stored[5] or stored[4] != location:
+        return False
+    return datetime.now() - datetime.fromisoformat(stored[5]) < timedelta(minutes=GEOCODE_RETRY_MINUTES)
+
+async def geocode_addresses(addresses, on_done: Optional[Callable[[int], Awaitable[None]]] = None) -> Dict[str, Optional[Dict]]:
+    """주소 → 좌표 (실패는 None). 클라이언트 하나를 공유해 INGEST_GEOCODE_CONCURRENCY 개씩 동시에 변환"""
+    coords = {}
+    if not addresses:
+        return coords
+    semaphore = asyncio.Semaphore(INGEST_GEOCODE_CONCURRENCY)
+
+    async def geocode(client: httpx.AsyncClient, address: str):
+        async with semaphore:
+            coords[address] = await geocode_address(address, client)
+        if on_done:
+            await on_done(len(coords))
+
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        await asyncio.gather(*(geocode(client, address) for address in addresses))
+    return coords
+
+async def ingest_records(raw_records: List[Dict], source: IngestSource = SAFE182_SOURCE,
+                         progress: Optional[Callable[[Dict], Awaitable[None]]] = None) -> Dict:
+    """
+    공통 수집 엔진 (정기 폴링 / 수동 갱신 / 다른 가져오기 경로)
+    매핑 → id 생성·중복 제거 → 저장된 원본 해시와 비교 → 분류 → 좌표 변환 → INGEST_BATCH_SIZE 단위 UPSERT
+    좌표 변환은 바뀐 주소만, 같은 주소는 한 번만, INGEST_GEOCODE_CONCURRENCY 개씩 동시에 한다.
+    좌표 변환에 실패한 주소는 행에 기록해 두고, 주소가 바뀌거나 GEOCODE_RETRY_MINUTES 가 지나기 전에는 다시 변환하지 않는다
+    (원본이 그대로인 행의 재시도는 retry_geocode_failures).
+    progress 를 넘기면 {"stage", "done", "total"} 로 진행 상황을 알린다 (좌표 변환은 INGEST_PROGRESS_INTERVAL 간격).
+    반환: 건수(new / updated / unchanged / duplicates ...), 단계별 시간(ms), 신규/갱신 id
+    """
+    stages = {}
+    run_start = started = time.perf_counter()
+    last_progress = 0.0
+
+    def mark(stage: str, since: float) -> float:
+        now = time.perf_counter()
+        stages[stage] = stages.get(stage, 0.0) + now - since
+        return now
+
+    async def notify(stage: str, done: int, total: int):
+        nonlocal last_progress
+        if progress is None:
+            return
+        now = time.perf_counter()
+        if 0 < done < total and now - last_progress < INGEST_PROGRESS_INTERVAL:
+            return
+        last_progress = now
+        await progress({"stage": stage, "done": done, "total": total})
+
+    await notify("mapping", 0, len(raw_records))
+    mapped_records = [(source.map_record(raw), source.fingerprint(raw)) for raw in raw_records]
+    started = mark("mapping", started)
+
+    # 같은 id 가 여러 번 오면 (페이지 경계 등) 마지막 것만
+    persons = {}
+    for mapped, fingerprint in mapped_records:
+        mapped['id'] = mapped.get('id') or source.record_id(mapped)
+        persons[mapped['id']] = (MissingPerson(**mapped), fingerprint)
+    started = mark("id", started)
+
+    existing = get_ingest_rows(list(persons))
+    changed = [(person, fingerprint, existing.get(person_id))
+               for person_id, (person, fingerprint) in persons.items()
+               if existing.get(person_id) is None or existing[person_id][0] != fingerprint]
+    started = mark("diff", started)
+
+    for person, _, _ in changed:
+        # category 재분류 (ISRID 기준)
+        if person.age:
+            person.category = _categorize_person(person.age, person.medical_condition)
+    started = mark("categorize", started)
+
+    # 주소가 그대로면 저장된 좌표(또는 최근 실패 기록)를 다시 쓰고, 나머지는 주소별로 한 번씩 동시에 변환
+    addresses = set()
+    failures = {}  # id → (실패한 주소, 실패 시각)
+    for person, _, stored in changed:
+        if stored and stored[1] == person.location and stored[2] is not None:
+            person.lat, person.lng = stored[2], stored[3]
+        elif recent_geocode_failure(stored, person.location):
+            person.lat = person.lng = None
+            failures[person.id] = (stored[4], stored[5])
+        elif person.location:
+            addresses.add(person.location)
+
+    await notify("geocode", 0, len(addresses))
+    coords = await geocode_addresses(addresses, lambda done: notify("geocode", done, len(addresses)))
+    failed_at = datetime.now().isoformat()
+    geocode_failed = 0
+    for person, _, stored in changed:
+        if person.location in coords:
+            coord = coords[person.location]
+            person.lat = coord["lat"] if coord else None
+            person.lng = coord["lng"] if coord else None
+            if not coord:
+                geocode_failed += 1
+                failures[person.id] = (person.location, failed_at)
+                log_system_event("WARNING", "GEOCODING", 
+                            f"좌표 변환 실패: {person.name}")
+    started = mark("geocode", started)
+
+    for offset in range(0, len(changed), INGEST_BATCH_SIZE):
+        await notify("save", offset, len(changed))
+        upsert_ingested_persons([(person, fingerprint, failures.get(person.id))
+                                 for person, fingerprint, _ in changed[offset:offset + INGEST_BATCH_SIZE]])
+    started = mark("save", started)
+
+    new_ids = [person.id for person, _, stored in changed if stored is None]
+    updated_ids = [person.id for person, _, stored in changed if stored is not None]
+    report = {
+        "source": source.name,
+        "records": len(raw_records),
+        "duplicates": len(raw_records) - len(persons),
+        "new": len(new_ids),
+        "updated": len(updated_ids),
+        "unchanged": len(persons) - len(changed),
+        "geocoded": len(addresses),
+        "geocode_failed": geocode_failed,
+        "batches": -(-len(changed) // INGEST_BATCH_SIZE),
+        "seconds": round(time.perf_counter() - run_start, 3),
+        "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in stages.items()},
+        "new_ids": new_ids,
+        "updated_ids": updated_ids,
+    }
+    await notify("save", len(changed), len(changed))
+    if changed:
+        log_system_event("INFO", "DATABASE", 
+                       f"{source.name} 저장: 신규 {report['new']}명, 갱신 {report['updated']}명 (변경 없음 {report['unchanged']}명)")
+    return report
 
-            for person_data in processed_data:
-                person_data.setdefault('extracted_features', {})
-                
-                # Safe182 데이터에는 id가 없으므로 생성
-                if 'id' not in person_data or not person_data['id']:
-                    if 'writeSn' in person_data and person_data['writeSn']:
-                        person_data['id'] = f"SAFE182_{person_data['writeSn']}"
-                    else:
-                        import hashlib
-                        unique_str = f"{person_data.get('name', '')}_{person_data.get('last_seen', '')}_{person_data.get('location', '')}"
-                        person_data['id'] = f"SAFE182_{hashlib.md5(unique_str.encode()).hexdigest()[:12]}"
-                
-                person = MissingPerson(**person_data)
-                
-                # Safe182 데이터의 category 재분류 (ISRID 기준)
-                if person.age:
-                    person.category = _categorize_person(person.age, person.medical_condition)
-                
-                if person.location:
-                    coord = await geocode_address(person.location)
-                    if coord:
-                        person.lat = coord["lat"]
-                        person.lng = coord["lng"]
-                    else:
-                        person.lat = None
-                        person.lng = None
-                        log_system_event("WARNING", "GEOCODING", 
-                                    f"좌표 변환 실패: {person.name}")
-                
-                save_missing_person(person)
-                
-                if person.id not in existing_ids:
-                    new_persons.append(person)
-                else:
-                    updated_persons.append(person)
-            
-            if new_persons or updated_persons:
-                print(f"📊 신규: {len(new_persons)}명, 갱신: {len(updated_persons)}명")
-                log_system_event("INFO", "POLLING", 
-                               f"데이터 업데이트: 신규 {len(new_persons)}명, 갱신 {len(updated_persons)}명")
-                
-                await manager.broadcast({
-                    "type": "update",
-                    "new": len(new_persons),
-                    "updated": len(updated_persons)
-                })
-            
-            print("⏰ 5분 후 다시 확인...")
-            await asyncio.sleep(300)
+def ingest_summary(report: Dict) -> Dict:
+    """수집 보고서에서 id 목록을 뺀 요약 (헬스체크 / API 응답용)"""
+    return {key: value for key, value in report.items() if key not in ("new_ids", "updated_ids")}
+
+async def retry_geocode_failures(limit: int = INGEST_BATCH_SIZE) -> Dict:
+    """
+    좌표 변환에 실패한 지 GEOCODE_RETRY_MINUTES 가 지난 행을 다시 변환
+    (원본이 바뀌지 않은 행은 수집에서 건너뛰므로 폴링마다 여기서 재시도 대상만 확인한다)
+    반환: {"retried", "recovered", "recovered_ids"}
+    """
+    result = {"retried": 0, "recovered": 0, "recovered_ids": []}
+    if not KAKAO_API_KEY:
+        return result
+    cutoff = (datetime.now() - timedelta(minutes=GEOCODE_RETRY_MINUTES)).isoformat()
+    conn = db_connect()
+    try:
+        rows = conn.execute('''
+            SELECT id, location FROM missing_persons
+            WHERE geocode_failed_at IS NOT NULL AND geocode_failed_at < ? AND lat IS NULL
+            ORDER BY geocode_failed_at LIMIT ?
+        ''', (cutoff, limit)).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return result
+
+    coords = await geocode_addresses({location for _, location in rows if location})
+    now = datetime.now().isoformat()
+    recovered = [(id_, coords[location]) for id_, location in rows if coords.get(location)]
+    conn = db_connect()
+    with conn:
+        conn.executemany('''
+            UPDATE missing_persons
+            SET lat = ?, lng = ?, geocode_failed_address = NULL, geocode_failed_at = NULL, updated_at = ?
+            WHERE id = ?
+        ''', [(coord["lat"], coord["lng"], now, id_) for id_, coord in recovered])
+        conn.executemany('UPDATE missing_persons SET geocode_failed_at = ? WHERE id = ?',
+                         [(now, id_) for id_, location in rows if not coords.get(location)])
+    conn.close()
+    result.update(retried=len(rows), recovered=len(recovered), recovered_ids=[id_ for id_, _ in recovered])
+    if recovered:
+        log_system_event("INFO", "GEOCODING", f"좌표 변환 재시도: {len(rows)}건 중 {len(recovered)}건 복구")
+    return result
+
+async def announce_ingest(report: Dict):
+    """수집 결과 로그 + WebSocket 알림 (변경이 없으면 아무것도 하지 않음)"""
+    if not (report["new"] or report["updated"]):
+        return
+    print(f"📊 신규: {report['new']}명, 갱신: {report['updated']}명")
+    log_system_event("INFO", "POLLING", 
+                   f"데이터 업데이트: 신규 {report['new']}명, 갱신 {report['updated']}명")
+    
+    await manager.broadcast({
+        "type": "update",
+        "new": report["new"],
+        "updated": report["updated"]
+    })
+
+async def poll_safe182_cycle(reason: str = "scheduled") -> Dict:
+    """
+    Safe182 폴링 1회 (safe182_scheduler 가 호출)
+    정기 폴링은 조건부 요청 / 응답 해시로 바뀐 게 없으면 수집을 건너뛴다.
+    수동 요청(reason != "scheduled")은 항상 수집하고 진행 상황을 관리자 WebSocket 에 ingest_progress 로 보낸다.
+    outcome: changed / unchanged / empty / error
+    """
+    loop_start = time.perf_counter()
+    forced = reason != "scheduled"
+    run_id = uuid.uuid4().hex[:8]
+    
+    async def progress(update: Dict):
+        if forced:
+            await manager.broadcast({
+                "type": "ingest_progress",
+                "run_id": run_id,
+                "source": SAFE182_SOURCE.name,
+                "reason": reason,
+                **update,
+                "timestamp": datetime.now().isoformat()
+            }, client_type="admin")
+    
+    try:
+        print(f"🔄 Safe182 API 호출 중... ({reason})")
+        log_system_event("INFO", "POLLING", f"Safe182 API 폴링 시작 ({reason})")
+        await progress({"stage": "fetch", "done": 0, "total": None})
+        raw_data_list = await fetch_safe182_data(conditional=not forced)
+        fetch = safe182_sync.last_fetch
+        await progress({"stage": "fetch", "done": len(raw_data_list), "total": len(raw_data_list)})
+        
+        if fetch.get("not_modified") or (raw_data_list and fetch.get("same_as_last") and not forced):
+            print("💤 Safe182 응답 변경 없음")
+            safe182_sync.advance(raw_data_list)
+            outcome = {"outcome": "unchanged", "records": len(raw_data_list), "new": 0, "updated": 0}
+        elif not raw_data_list:
+            print("⚠️  데이터 없음")
+            outcome = {"outcome": "empty" if fetch.get("complete") else "error", "records": 0, "new": 0, "updated": 0}
+        else:
+            print(f"✅ Safe182에서 {len(raw_data_list)}명의 데이터 수신")
+            api_manager.update_cache(raw_data_list)
             
-        except Exception as e:
-            print(f"❌ 폴링 오류: {e}")
-            log_system_event("ERROR", "POLLING", f"폴링 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            await asyncio.sleep(60)
+            report = await ingest_records(raw_data_list, SAFE182_SOURCE, progress)
+            safe182_sync.last_ingest = dict(ingest_summary(report), at=datetime.now().isoformat())
+            safe182_sync.advance(raw_data_list)
+            await announce_ingest(report)
+            outcome = {
+                "outcome": "changed" if report["new"] or report["updated"] else "unchanged",
+                "records": len(raw_data_list),
+                "new": report["new"],
+                "updated": report["updated"],
+                "unchanged": report["unchanged"],
+                "stages_ms": report["stages_ms"],
+            }
+        outcome["complete"] = fetch.get("complete", False)
+        
+        retry = await retry_geocode_failures()
+        if retry["retried"]:
+            outcome["geocode_retried"] = retry["retried"]
+            outcome["geocode_recovered"] = retry["recovered"]
+        if retry["recovered"]:
+            await announce_ingest({"new": 0, "updated": retry["recovered"]})
+            if outcome["outcome"] == "unchanged":
+                outcome["outcome"] = "changed"
+        
+    except Exception as e:
+        print(f"❌ 폴링 오류: {e}")
+        log_system_event("ERROR", "POLLING", f"폴링 오류: {e}")
+        import traceback
+        traceback.print_exc()
+        outcome = {"outcome": "error", "error": str(e)}
+    
+    outcome["run_id"] = run_id
+    await progress({"stage": "done", "outcome": outcome["outcome"], "result": outcome})
+    BACKGROUND_LOOP_SECONDS.labels("polling", outcome["outcome"]).observe(time.perf_counter() - loop_start)
+    return outcome
+
+async def start_optimized_polling():
+    print("=" * 50)
+    print("✅ Safe182 폴링 시작 (적응형 주기)")
+    print("=" * 50)
+    
+    await safe182_scheduler.run(poll_safe182_cycle)
 
 async def cleanup_old_data():
     while True:
         try:
             await asyncio.sleep(3600)
+            loop_start = time.perf_counter()
             
-            conn = sqlite3.connect('missing_persons.db')
+            conn = db_connect()
             cursor = conn.cursor()
             
             one_week_ago = (datetime.now() - timedelta(days=7)).isoformat()
@@ -1223,18 +1778,24 @@ async def cleanup_old_data():
             conn.commit()
             conn.close()
             
+            # 텔레메트리 롤업은 TELEMETRY_DB 에 있으므로 따로 정리
+            deleted_count += await asyncio.to_thread(api_telemetry.prune)
+            
             if deleted_count > 0:
                 log_system_event("INFO", "CLEANUP", f"오래된 데이터 {deleted_count}건 정리 완료")
+            BACKGROUND_LOOP_SECONDS.labels("cleanup", "ok").observe(time.perf_counter() - loop_start)
             
         except Exception as e:
+            BACKGROUND_LOOP_SECONDS.labels("cleanup", "error").observe(time.perf_counter() - loop_start)
             log_system_event("ERROR", "CLEANUP", f"데이터 정리 실패: {e}")
 
 async def update_analytics():
     while True:
         try:
             await asyncio.sleep(1800)
+            loop_start = time.perf_counter()
             
-            conn = sqlite3.connect('missing_persons.db')
+            conn = db_connect()
             cursor = conn.cursor()
             
             today = datetime.now().date().isoformat()
@@ -1274,8 +1835,10 @@ async def update_analytics():
                 "type": "analytics_update",
                 "data": analytics_data
             })
+            BACKGROUND_LOOP_SECONDS.labels("analytics", "ok").observe(time.perf_counter() - loop_start)
             
         except Exception as e:
+            BACKGROUND_LOOP_SECONDS.labels("analytics", "error").observe(time.perf_counter() - loop_start)
             log_system_event("ERROR", "ANALYTICS", f"분석 데이터 업데이트 실패: {e}")
 
 @app.websocket("/ws")
@@ -1379,7 +1942,7 @@ async def create_missing_person(request: Dict[str, Any] = Body(...)):
                 missing_person.lat = coord["lat"]
                 missing_person.lng = coord["lng"]
         
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         # ✅ 24개 컬럼, 24개 값
@@ -1442,7 +2005,7 @@ async def create_missing_person(request: Dict[str, Any] = Body(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 async def get_real_time_stats():
-    conn = sqlite3.connect('missing_persons.db')
+    conn = db_connect()
     cursor = conn.cursor()
     
     cursor.execute('SELECT COUNT(*) FROM missing_persons WHERE status = "ACTIVE"')
@@ -1472,7 +2035,7 @@ async def update_driver_location(driver_id: str, location: dict):
     if not location.get("lat") or not location.get("lng"):
         return
     
-    conn = sqlite3.connect('missing_persons.db')
+    conn = db_connect()
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -1498,7 +2061,7 @@ async def update_driver_location(driver_id: str, location: dict):
 async def handle_sighting_report(message: dict):
     report_data = ReportRequest(**message.get("data", {}))
     
-    conn = sqlite3.connect('missing_persons.db')
+    conn = db_connect()
     cursor = conn.cursor()
     
     report_id = str(uuid.uuid4())  # UUID 생성
@@ -1579,7 +2142,7 @@ def _categorize_person(age: int, medical_condition: str = None) -> str:
 @app.get("/api/person/{person_id}")
 async def get_person_detail(person_id: str):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -1619,7 +2182,7 @@ async def get_person_detail(person_id: str):
 @app.post("/api/register_token")
 async def register_fcm_token(request: FCMTokenRequest):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         current_time = datetime.now().isoformat()
@@ -1662,7 +2225,7 @@ async def register_fcm_token(request: FCMTokenRequest):
 @app.post("/api/report_sighting")
 async def report_sighting(request: ReportRequest):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         current_time = datetime.now().isoformat()
@@ -1714,7 +2277,7 @@ async def report_sighting(request: ReportRequest):
 @app.get("/api/active_tokens")
 async def get_active_tokens():
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -1749,7 +2312,7 @@ async def get_active_tokens():
 @app.post("/api/send_notification")
 async def send_custom_notification(request: NotificationRequest):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT * FROM missing_persons WHERE id = ?', (request.person_id,))
@@ -1884,7 +2447,7 @@ async def get_weather(lat: float, lng: float):
 @app.get("/api/statistics")
 async def get_statistics():
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT COUNT(*) FROM missing_persons WHERE status = "ACTIVE"')
@@ -1893,10 +2456,10 @@ async def get_statistics():
         cursor.execute('SELECT COUNT(*) FROM missing_persons WHERE priority = "HIGH" AND status = "ACTIVE"')
         high_priority = cursor.fetchone()[0]
         
-        cursor.execute('SELECT COUNT(*) FROM api_requests WHERE DATE(request_time) = DATE("now")')
+        cursor.execute('SELECT COUNT(*) FROM api_requests WHERE DATE(request_time) = DATE("now", "localtime")')
         today_requests = cursor.fetchone()[0]
         
-        cursor.execute('SELECT COUNT(*) FROM api_requests WHERE success = 1 AND DATE(request_time) = DATE("now")')
+        cursor.execute('SELECT COUNT(*) FROM api_requests WHERE success = 1 AND DATE(request_time) = DATE("now", "localtime")')
         today_success = cursor.fetchone()[0]
         
         cursor.execute('SELECT COUNT(*) FROM notifications WHERE DATE(sent_at) = DATE("now")')
@@ -1951,7 +2514,7 @@ async def get_statistics():
 @app.get("/api/analytics")
 async def get_analytics(request: AnalyticsRequest = Depends()):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         start_date = request.start_date
@@ -2003,7 +2566,7 @@ async def get_analytics(request: AnalyticsRequest = Depends()):
 @app.post("/api/batch_update")
 async def batch_update_persons(request: BatchUpdateRequest):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         updated_count = 0
@@ -2058,7 +2621,7 @@ async def get_system_logs(
     limit: int = Query(100, ge=1, le=1000)
 ):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         query = "SELECT timestamp, level, component, message, data FROM system_logs"
@@ -2099,35 +2662,43 @@ async def get_system_logs(
         log_system_event("ERROR", "SYSTEM_LOGS", f"시스템 로그 조회 실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/telemetry/apis")
+async def get_api_telemetry(
+    hours: int = Query(0, ge=0, le=24 * 30),
+    integration: str = None
+):
+    """
+    외부 연동별 호출 수, 오류율, 지연 p50/p95/p99
+    hours=0 이면 프로세스 시작 이후 메모리 집계, hours>0 이면 저장된 롤업으로 기간 집계
+    """
+    try:
+        if hours:
+            return await asyncio.to_thread(api_telemetry.load_history, hours, integration)
+        
+        summary = api_telemetry.get_summary()
+        if integration:
+            summary["integrations"] = {k: v for k, v in summary["integrations"].items() if k == integration}
+        return summary
+        
+    except Exception as e:
+        log_system_event("ERROR", "TELEMETRY", f"API 텔레메트리 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/force_update")
 async def force_update():
+    """
+    폴링 스케줄러에 즉시 1회를 요청하고 결과를 기다린다 (정기 폴링과 같은 경로)
+    진행 상황은 관리자 WebSocket 에 {"type": "ingest_progress", "run_id", "stage", "done", "total"} 로 전송
+    """
     try:
         log_system_event("INFO", "MANUAL_UPDATE", "수동 업데이트 요청")
         
-        raw_data_list = await fetch_safe182_data()
-        if not raw_data_list:
-            return {"status": "error", "message": "Safe182 API에서 데이터를 가져올 수 없습니다"}
-        
-        existing_ids = get_existing_person_ids()
-        new_count = 0
-        updated_count = 0
-        
-        for person_data in raw_data_list:
-            person = MissingPerson(**person_data)
-            
-            coord = await geocode_address(person.location)
-            person.lat = coord["lat"]
-            person.lng = coord["lng"]
-            
-            if person.id not in existing_ids:
-                new_count += 1
-            else:
-                updated_count += 1
-            
-            save_missing_person(person)
-        
-        api_manager.update_cache(raw_data_list)
+        result = await safe182_scheduler.request_cycle(poll_safe182_cycle, "manual")
+        if result["outcome"] in ("error", "empty"):
+            return {"status": "error", "message": "Safe182 API에서 데이터를 가져올 수 없습니다", "run_id": result.get("run_id")}
         
+        new_count = result.get("new", 0)
+        updated_count = result.get("updated", 0)
         log_system_event("INFO", "MANUAL_UPDATE", f"업데이트 완료: 신규 {new_count}명, 갱신 {updated_count}명")
         
         return {
@@ -2135,6 +2706,9 @@ async def force_update():
             "message": f"업데이트 완료: 신규 {new_count}명, 갱신 {updated_count}명",
             "new": new_count,
             "updated": updated_count,
+            "unchanged": result.get("unchanged", 0),
+            "stages_ms": result.get("stages_ms", {}),
+            "run_id": result.get("run_id"),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -2142,10 +2716,62 @@ async def force_update():
         log_system_event("ERROR", "MANUAL_UPDATE", f"업데이트 실패: {e}")
         raise HTTPException(status_code=500, detail=f"업데이트 실패: {str(e)}")
 
+@app.get("/api/admin/profiles")
+async def list_profiles(route: str = None):
+    """최근 요청 프로파일 목록 (X-Profile: 1 헤더 / ?profile=1 / 샘플링 비율로 수집)"""
+    return {"stats": request_profiler.get_stats(), "captures": request_profiler.list_captures(route)}
+
+@app.get("/api/admin/profiles/merged", response_class=PlainTextResponse)
+async def get_merged_profile(route: str, idle: bool = False):
+    """같은 라우트의 캡처를 합친 collapsed-stack 텍스트"""
+    stacks = request_profiler.merged_stacks(route)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="해당 라우트의 프로파일이 없습니다")
+    return PlainTextResponse(request_profiler.collapsed(stacks, include_idle=idle))
+
+@app.get("/api/admin/profiles/{capture_id}", response_class=PlainTextResponse)
+async def get_profile(capture_id: int, idle: bool = True):
+    """collapsed-stack 텍스트 (flamegraph.pl / speedscope 에 그대로 입력)"""
+    capture = request_profiler.get_capture(capture_id)
+    if not capture:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다")
+    return PlainTextResponse(request_profiler.collapsed(capture["stacks"], include_idle=idle))
+
+@app.post("/api/admin/profiles/config")
+async def configure_profiler(config: ProfilerConfig):
+    """프로파일러 켜기/끄기, 전체/라우트별 샘플링 비율, 샘플 간격 변경"""
+    request_profiler.configure(config.enabled, config.sample_rate, config.route_rates, config.interval_ms)
+    log_system_event("INFO", "PROFILER", f"프로파일러 설정 변경: {config.model_dump(exclude_none=True)}")
+    return {"status": "success", "stats": request_profiler.get_stats()}
+
+@app.get("/api/admin/loop_watchdog")
+async def get_loop_watchdog(limit: int = Query(20, ge=1, le=100)):
+    """이벤트 루프 멈춤 기록 (최근 순, 멈춘 동안 찍힌 스택과 라우트/태스크)"""
+    return {"stats": loop_watchdog.get_stats(), "events": loop_watchdog.get_events(limit)}
+
+@app.post("/api/admin/loop_watchdog")
+async def configure_loop_watchdog(config: LoopWatchdogConfig):
+    """실행 중 감시 켜기/끄기, 임계값 변경, 기록 비우기"""
+    loop_watchdog.configure(config.threshold_ms, config.heartbeat_ms)
+    if config.clear:
+        loop_watchdog.clear()
+    if config.enabled is True:
+        loop_watchdog.start()
+    elif config.enabled is False:
+        await loop_watchdog.stop()
+    
+    log_system_event("INFO", "LOOP_WATCHDOG", f"감시 설정 변경: {config.model_dump(exclude_none=True)}")
+    return {"status": "success", "stats": loop_watchdog.get_stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus 텍스트 노출 형식 메트릭"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/api/health")
 async def health_check():
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         cursor.execute('SELECT 1')
         db_status = "healthy"
@@ -2161,8 +2787,17 @@ async def health_check():
         "components": {
             "database": db_status,
             "firebase": firebase_status,
-            "api_manager": "healthy"
+            "api_manager": "healthy",
+            "image_generator": "healthy" if generator_loader.is_ready() else generator_loader.state
         },
+        "image_generator": generator_loader.get_status(),
+        "translation": translation_service.get_stats(),
+        "environment": environment_analyzer.get_stats(),
+        "system_logs": system_logger.get_stats(),
+        "telemetry": api_telemetry.get_stats(),
+        "loop_watchdog": loop_watchdog.get_stats(),
+        "safe182_sync": safe182_sync.get_stats(),
+        "polling": safe182_scheduler.get_stats(),
         "version": "2.0.0",
         "uptime": time.time() - api_manager.last_request_time if api_manager.last_request_time else 0
     }
@@ -2170,7 +2805,7 @@ async def health_check():
 @app.post("/api/missing_persons/{person_id}/approve")
 async def approve_missing_person(person_id: str):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -2194,7 +2829,7 @@ async def approve_missing_person(person_id: str):
             try:
                 print(f"SDXL 이미지 생성 시작: {person_id}")
                 
-                generator = get_generator()
+                generator = await asyncio.to_thread(generator_loader.get)
                 
                 clean_base64 = person[7]
                 if clean_base64.startswith('data:'):
@@ -2204,19 +2839,21 @@ async def approve_missing_person(person_id: str):
                 age = person[2] or 30
                 gender = person[3] or "남자"
                 
-                generated_base64 = generator.generate_missing_person_image(
-                    original_photo_base64=clean_base64,
-                    description=clothing_description,
-                    age=age,
-                    gender=gender
-                )
+                with IMAGE_GENERATION_SECONDS.labels("single").time():
+                    generated_base64 = await asyncio.to_thread(
+                        generator.generate_missing_person_image,
+                        original_photo_base64=clean_base64,
+                        description=clothing_description,
+                        age=age,
+                        gender=gender
+                    )
                 
                 if generated_base64:
                     # 검증 추가
                     if generated_base64 and generated_base64.startswith('/9j/'):
                         print(f"올바른 이미지 생성, DB 업데이트")
                         
-                        conn = sqlite3.connect('missing_persons.db')
+                        conn = db_connect()
                         cursor = conn.cursor()
                         cursor.execute('''
                             UPDATE missing_persons 
@@ -2252,10 +2889,102 @@ async def approve_missing_person(person_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/missing_persons/approve_batch")
+async def approve_missing_persons_batch(request: BatchApproveRequest):
+    """여러 REPORTER 신고를 한 번에 승인하고 전신 이미지를 배치로 생성"""
+    try:
+        conn = db_connect()
+        cursor = conn.cursor()
+        
+        current_time = datetime.now().isoformat()
+        approved_ids = []
+        jobs = []
+        
+        for person_id in request.person_ids:
+            cursor.execute('''
+                UPDATE missing_persons 
+                SET approval_status = 'APPROVED', 
+                    updated_at = ?
+                WHERE id = ? AND source = 'REPORTER'
+            ''', (current_time, person_id))
+            
+            if cursor.rowcount == 0:
+                continue
+            approved_ids.append(person_id)
+            
+            cursor.execute('SELECT description, age, gender, photo_base64 FROM missing_persons WHERE id = ?', (person_id,))
+            description, age, gender, photo_base64 = cursor.fetchone()
+            
+            if photo_base64:
+                jobs.append({
+                    "person_id": person_id,
+                    "photo_base64": photo_base64,
+                    "description": description or "일반적인 옷차림",
+                    "age": age or 30,
+                    "gender": gender or "남자",
+                })
+        
+        conn.commit()
+        conn.close()
+        
+        if not approved_ids:
+            raise HTTPException(status_code=404, detail="승인할 실종자를 찾을 수 없습니다")
+        
+        generated_count = 0
+        if jobs:
+            try:
+                print(f"SDXL 배치 이미지 생성 시작: {len(jobs)}명")
+                generator = await asyncio.to_thread(generator_loader.get)
+                with IMAGE_GENERATION_SECONDS.labels("batch").time():
+                    generated_list = await asyncio.to_thread(generator.generate_batch, jobs)
+                
+                conn = db_connect()
+                cursor = conn.cursor()
+                for job, generated_base64 in zip(jobs, generated_list):
+                    # None = 생성 실패 (원본 사진 그대로 둠)
+                    if generated_base64 is None:
+                        continue
+                    cursor.execute('''
+                        UPDATE missing_persons 
+                        SET photo_base64 = ?, updated_at = ?
+                        WHERE id = ?
+                    ''', (generated_base64, datetime.now().isoformat(), job["person_id"]))
+                    generated_count += 1
+                conn.commit()
+                conn.close()
+                
+                log_system_event("INFO", "IMAGE_GEN", f"SDXL 배치 이미지 생성 완료: {generated_count}/{len(jobs)}명")
+                
+            except Exception as e:
+                print(f"배치 이미지 생성 프로세스 오류: {e}")
+                import traceback
+                traceback.print_exc()
+        
+        for person_id in approved_ids:
+            log_system_event("INFO", "APPROVAL", f"실종자 승인: {person_id}")
+            await manager.broadcast({
+                "type": "person_approved",
+                "person_id": person_id
+            })
+        
+        return {
+            "success": True,
+            "message": f"{len(approved_ids)}명의 실종자가 승인되었습니다",
+            "approved": approved_ids,
+            "generated_count": generated_count
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_system_event("ERROR", "APPROVAL", f"일괄 승인 실패: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/missing_persons/{person_id}/reject")
 async def reject_missing_person(person_id: str, reason: str = Body(None)):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         print(f"거절 처리: person_id={person_id}, reason={reason}")  # 디버깅 로그
@@ -2295,7 +3024,7 @@ async def reject_missing_person(person_id: str, reason: str = Body(None)):
 @app.delete("/api/missing_persons/{person_id}")
 async def delete_missing_person(person_id: str):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -2329,7 +3058,7 @@ async def delete_missing_person(person_id: str):
 @app.get("/api/pending_reports")
 async def get_pending_reports():
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         # approval_status 컬럼이 있는지 확인
@@ -2376,7 +3105,7 @@ async def get_pending_reports():
 @app.get("/api/sighting_reports")
 async def get_sighting_reports(status: str = "all"):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         if status == "all":
@@ -2445,7 +3174,7 @@ async def get_sighting_reports(status: str = "all"):
 @app.get("/api/sighting_report/{report_id}")
 async def get_sighting_report_by_id(report_id: int):
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT * FROM sighting_reports WHERE id = ?', (report_id,))
@@ -2469,7 +3198,7 @@ async def get_sighting_report_by_id(report_id: int):
 @app.patch("/api/sighting_report/{report_id}/status")
 async def update_report_status(report_id: str, status: str):  # int → str
     try:
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT person_id FROM sighting_reports WHERE id = ?', (report_id,))
@@ -2529,7 +3258,7 @@ async def delete_sighting_report(report_id: str):  # int → str
     try:
         print(f"신고 삭제 요청: ID {report_id}")
         
-        conn = sqlite3.connect('missing_persons.db')
+        conn = db_connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT id, person_id, status FROM sighting_reports WHERE id = ?', (report_id,))
@@ -2574,8 +3303,6 @@ async def delete_sighting_report(report_id: str):  # int → str
     
 @app.get("/api/all_cctvs")
 async def get_all_cctvs():
-    UTIC_CCTV_URL = "https://www.utic.go.kr/map/mapcctv.do"
-    
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
         "Referer": "https://www.utic.go.kr/map/map.do?menu=cctv",
@@ -2589,12 +3316,13 @@ async def get_all_cctvs():
     }
     
     try:
-        async with httpx.AsyncClient(verify=False) as client:
+        async with httpx.AsyncClient(verify=False) as client, api_telemetry.track("UTIC_CCTV", "POST") as call:
             response = await client.post(UTIC_CCTV_URL, headers=headers, data=data, timeout=15.0)
             
             if response.status_code == 200:
                 cctvs = response.json()
                 daejeon_cctvs = [c for c in cctvs if c.get("CENTERNAME") == "대전교통정보센터"]
+                call.count = len(daejeon_cctvs)
                 
                 processed_cctvs = []
                 for cctv in daejeon_cctvs:
@@ -2629,6 +3357,7 @@ async def get_all_cctvs():
                 
                 return {"cctvs": processed_cctvs, "count": len(processed_cctvs)}
             else:
+                call.fail(f"HTTP {response.status_code}")
                 return {"cctvs": [], "count": 0}
                 
     except Exception as e:
@@ -2648,110 +3377,8 @@ async def get_environment(request: dict):
         
         print(f"🗺️  환경 분석: ({lat}, {lon})")
         
-        # 500m 반경
-        radius = 500
-        
-        # 각 방향별 환경
-        directions = {
-            "north": {"angle": 0, "lat_offset": 0.0045, "lon_offset": 0},
-            "east": {"angle": 90, "lat_offset": 0, "lon_offset": 0.006},
-            "south": {"angle": 180, "lat_offset": -0.0045, "lon_offset": 0},
-            "west": {"angle": 270, "lat_offset": 0, "lon_offset": -0.006}
-        }
-        
-        result = {}
-        
-        for direction, offset in directions.items():
-            target_lat = lat + offset["lat_offset"]
-            target_lon = lon + offset["lon_offset"]
-            
-            try:
-                # 해당 방향 지점 반경 200m OSM 데이터
-                tags = {
-                    'highway': True,
-                    'landuse': True,
-                    'amenity': True,
-                    'natural': True,
-                    'building': True
-                }
-                
-                gdf = ox.features_from_point((target_lat, target_lon), tags=tags, dist=200)
-                
-                # 도로 타입
-                road_type = "골목길"
-                if not gdf.empty and 'highway' in gdf.columns:
-                    highways = gdf['highway'].dropna()
-                    if len(highways) > 0:
-                        hw = str(highways.iloc[0])
-                        if 'primary' in hw or 'trunk' in hw:
-                            road_type = "대로"
-                        elif 'secondary' in hw or 'tertiary' in hw:
-                            road_type = "이차로"
-                
-                # 토지 이용
-                land_use = "주거지역"
-                if not gdf.empty and 'landuse' in gdf.columns:
-                    landuses = gdf['landuse'].dropna()
-                    if len(landuses) > 0:
-                        lu = str(landuses.iloc[0])
-                        if 'commercial' in lu or 'retail' in lu:
-                            land_use = "상업지역"
-                        elif 'industrial' in lu:
-                            land_use = "공업지역"
-                        elif 'park' in lu or 'recreation' in lu:
-                            land_use = "공원"
-                
-                # POI
-                poi = []
-                if not gdf.empty and 'amenity' in gdf.columns:
-                    amenities = gdf['amenity'].dropna().unique()
-                    for a in amenities[:3]:
-                        if 'school' in str(a):
-                            poi.append("학교")
-                        elif 'hospital' in str(a):
-                            poi.append("병원")
-                        elif 'bus' in str(a):
-                            poi.append("버스정류장")
-                        elif 'park' in str(a):
-                            poi.append("공원")
-                        elif 'convenience' in str(a) or 'shop' in str(a):
-                            poi.append("편의점")
-                
-                if not poi:
-                    poi = ["없음"]
-                
-                # 위험 요소
-                hazard = []
-                if not gdf.empty and 'natural' in gdf.columns:
-                    naturals = gdf['natural'].dropna()
-                    if any('water' in str(n) or 'river' in str(n) for n in naturals):
-                        hazard.append("하천")
-                
-                if not gdf.empty and 'highway' in gdf.columns:
-                    highways = gdf['highway'].dropna()
-                    if any('motorway' in str(h) or 'trunk' in str(h) for h in highways):
-                        hazard.append("대형교차로")
-                
-                if not hazard:
-                    hazard = ["없음"]
-                
-                result[direction] = {
-                    "road_type": road_type,
-                    "land_use": land_use,
-                    "poi": poi,
-                    "hazard": hazard,
-                    "slope": "평지"
-                }
-                
-            except Exception as e:
-                print(f"⚠️  {direction} 방향 데이터 없음: {e}")
-                result[direction] = {
-                    "road_type": "골목길",
-                    "land_use": "주거지역",
-                    "poi": ["없음"],
-                    "hazard": ["없음"],
-                    "slope": "평지"
-                }
+        # 4방향 범위를 한 번에 조회 (스레드 실행 + 좌표 캐시)
+        result = await environment_analyzer.analyze_async(lat, lon)
         
         print(f"✅ 환경 분석 완료")
         return {"success": True, "environment": result}
@@ -2760,43 +3387,31 @@ async def get_environment(request: dict):
         print(f"❌ 환경 분석 오류: {e}")
         return {"success": False, "error": str(e)}
     
-def translate_to_english(text: str) -> str:
-    """DeepL로 한글을 영어로 번역"""
-    if not text or not text.strip():
-        return ""
-    
-    # 이미 영어면 그대로 반환
-    if all(ord(c) < 128 for c in text if c.isalpha()):
-        return text
-    
+@app.post("/api/get_environment_grid")
+async def get_environment_grid(request: dict):
+    """
+    실종 위치 기준 극좌표 격자 환경 분석 (방위 × 거리 링)
+    요청: lat, lon, bearings (기본 8), rings (m 목록, 기본 250/500/1000), cell_radius (m)
+    """
     try:
-        print(f"[DeepL] 번역 시도: {text}")
-        
-        url = "https://api-free.deepl.com/v2/translate"
-        params = {
-            "auth_key": DEEPL_API_KEY,
-            "text": text,
-            "source_lang": "KO",
-            "target_lang": "EN-US"
-        }
-        
-        response = requests.post(url, data=params, timeout=10)
-        response.raise_for_status()
+        lat = request.get("lat")
+        lon = request.get("lon")
+        bearings = int(request.get("bearings") or ENVIRONMENT_GRID_BEARINGS)
+        rings = [int(r) for r in request.get("rings") or ENVIRONMENT_GRID_RINGS]
+        cell_radius = request.get("cell_radius")
+        cell_radius = int(cell_radius) if cell_radius is not None else ENVIRONMENT_GRID_CELL_RADIUS
         
-        result = response.json()
-        translated = result["translations"][0]["text"]
+        print(f"🗺️  격자 환경 분석: ({lat}, {lon}) {bearings}방위 × {len(rings)}링")
         
-        print(f"[DeepL] 번역 완료: {translated}")
-        return translated
+        result = await environment_analyzer.analyze_grid_async(lat, lon, bearings, rings, cell_radius)
+        return {"success": True, **result}
         
-    except requests.exceptions.RequestException as e:
-        print(f"DeepL API 오류: {e}")
-        print(f"   원문 사용: {text}")
-        return text
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"번역 실패: {e}")
-        return text
-
+        print(f"❌ 격자 환경 분석 오류: {e}")
+        return {"success": False, "error": str(e)}
+    
 @app.get("/")
 async def get_admin_dashboard():
     import os
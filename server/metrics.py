@@ -0,0 +1,307 @@
+import re
+import time
+import asyncio
+import sqlite3
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+# Prometheus 텍스트 노출 형식 (prometheus_client 없이)
+# 카운터/히스토그램 갱신은 잠금 없이 리스트 원소 덧셈만 한다 (GIL 하에서 드물게 증분 1건이 누락될 수 있음)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SLOW_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple, object] = {}
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            # setdefault 는 원자적이라 동시에 만들어져도 하나만 남는다
+            child = self.children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self.children.items())]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 callback: Optional[Callable[[], Dict[Tuple, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        # 수집 시점에 값을 읽어오는 게이지 ({라벨 튜플: 값})
+        self.callback = callback
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def _samples(self):
+        if self.callback is not None:
+            items = [(tuple(key), value) for key, value in self.callback().items()]
+        else:
+            items = [(key, child.value) for key, child in list(self.children.items())]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _samples(self):
+        lines = []
+        for key, child in list(self.children.items()):
+            counts = list(child.counts)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in list(self.metrics.values())) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (라우트 템플릿 기준)", ("method", "route", "status"))
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "처리 중인 HTTP 요청 수")
+BACKGROUND_LOOP_SECONDS = registry.histogram(
+    "background_loop_duration_seconds", "백그라운드 루프 1회 작업 시간 (대기 제외)", ("task", "outcome"), SLOW_BUCKETS)
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds", "SQLite execute 시간 (문장 종류/테이블별)", ("operation", "table"), FAST_BUCKETS)
+DB_ROWS_WRITTEN = registry.counter(
+    "db_rows_written", "SQLite 쓰기 문장이 바꾼 행 수 (executemany 는 전체 합)", ("operation", "table"))
+GEOCODE_SECONDS = registry.histogram(
+    "geocode_duration_seconds", "주소 → 좌표 변환 시간 (Kakao 재시도 포함)", ("outcome",))
+FCM_SEND_SECONDS = registry.histogram(
+    "fcm_send_duration_seconds", "FCM 알림 전송 시간", ("outcome",))
+IMAGE_GENERATION_SECONDS = registry.histogram(
+    "image_generation_duration_seconds", "SDXL 이미지 생성 시간", ("mode",), SLOW_BUCKETS)
+WEBSOCKET_BROADCASTS = registry.counter(
+    "websocket_broadcast_messages", "WebSocket 브로드캐스트 메시지 수 (메시지 type 별)", ("type",))
+EVENT_LOOP_LAG_SECONDS = registry.histogram(
+    "event_loop_lag_seconds", "이벤트 루프 지연 (예정 대비 늦게 깨어난 시간)", (), FAST_BUCKETS + (2.5, 5.0, 10.0))
+EVENT_LOOP_LAG_LAST = registry.gauge(
+    "event_loop_lag_last_seconds", "가장 최근 측정한 이벤트 루프 지연")
+
+
+def timed(histogram: Histogram, success: Callable = bool):
+    """
+    async 함수 소요 시간을 outcome 라벨과 함께 기록
+    success(반환값) 이 참이면 ok, 거짓이면 miss, 예외면 error
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await func(*args, **kwargs)
+                outcome = "ok" if success(result) else "miss"
+                return result
+            finally:
+                histogram.labels(outcome).observe(time.perf_counter() - start_time)
+        return wrapper
+    return decorator
+
+
+# ---------- SQLite ----------
+
+_STATEMENT_PATTERN = re.compile(
+    r"^\s*(?:(SELECT)\b.*?\bFROM\s+([\w\"]+)|(INSERT)(?:\s+OR\s+\w+)?\s+INTO\s+([\w\"]+)|(UPDATE)\s+([\w\"]+)|(DELETE)\s+FROM\s+([\w\"]+)|(\w+))",
+    re.IGNORECASE | re.DOTALL,
+)
+_statement_labels: Dict[str, Tuple[str, str]] = {}
+
+
+def statement_labels(sql: str) -> Tuple[str, str]:
+    labels = _statement_labels.get(sql)
+    if labels is None:
+        match = _STATEMENT_PATTERN.match(sql)
+        groups = [group for group in match.groups() if group] if match else []
+        operation = groups[0].upper() if groups else "OTHER"
+        table = groups[1].strip('"') if len(groups) > 1 else "-"
+        labels = (operation, table)
+        # 문장 종류는 코드에 박힌 SQL 뿐이라 많지 않지만, 동적으로 만든 SQL 대비 상한을 둔다
+        if len(_statement_labels) < 2048:
+            _statement_labels[sql] = labels
+    return labels
+
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        start_time = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            DB_QUERY_SECONDS.labels(*statement_labels(sql)).observe(time.perf_counter() - start_time)
+        self._count_rows(sql)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        start_time = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            DB_QUERY_SECONDS.labels(*statement_labels(sql)).observe(time.perf_counter() - start_time)
+        self._count_rows(sql)
+        return self
+
+    def _count_rows(self, sql):
+        # SELECT 는 rowcount -1, 쓰기 문장은 바뀐 행 수
+        if self.rowcount > 0:
+            DB_ROWS_WRITTEN.labels(*statement_labels(sql)).inc(self.rowcount)
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3.connect(..., factory=TimedConnection) 로 쓰면 모든 execute 시간이 DB_QUERY_SECONDS 에 쌓인다"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# ---------- 이벤트 루프 지연 ----------
+
+async def monitor_loop_lag(interval: float = 0.5):
+    """interval 마다 깨어나 예정보다 늦어진 시간을 기록 (동기 작업이 루프를 막으면 커진다)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - expected, 0.0)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
@@ -1,15 +1,59 @@
 import os
 import json
+import copy
+import sqlite3
+import hashlib
+import threading
 import torch
 import re
-from typing import Dict, Any, Optional
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+from movement_rules import rule_scorer, person_group
+from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, StoppingCriteria, StoppingCriteriaList
 
 BASE_MODEL_NAME = "K-intelligence/Midm-2.0-Mini-Instruct"
 
+# 추론 백엔드: auto | cuda_4bit | cpu_int8 | cpu_bf16 | onnx
+# auto 는 CUDA 가 있으면 cuda_4bit (bitsandbytes 4bit 는 CUDA 전용), 없으면 cpu_int8
+PREDICTOR_BACKEND = os.getenv("PREDICTOR_BACKEND", "auto")
+PREDICTOR_THREADS = int(os.getenv("PREDICTOR_THREADS", "0"))
+PREDICTOR_BACKENDS = ["cuda_4bit", "cpu_int8", "cpu_bf16", "onnx"]
+
+SYSTEM_MESSAGE = "환경 차이를 반영하여 JSON 출력"
+# create_prompt 결과 중 모든 요청에 공통인 앞부분 (KV 캐시 재사용 대상)
+PROMPT_PREFIX = "실종자 이동 경로 예측 (환경 분석 필수!)\n\n【실종자】\n"
+
+# 예측 모드: llm (LLM, 실패 시 규칙) | rules (규칙만, 모델 미로딩)
+#           | rules_then_llm (규칙이 확실하면 규칙, 아니면 규칙 분포를 사전 확률로 프롬프트에 넣어 LLM 이 보정)
+PREDICTOR_MODE = os.getenv("PREDICTOR_MODE", "llm")
+PREDICTOR_MODES = ["llm", "rules", "rules_then_llm"]
+# rules_then_llm 에서 규칙 결과를 그대로 쓰는 최고 방향 확률 기준 (%)
+PREDICTOR_RULES_CONFIDENCE = float(os.getenv("PREDICTOR_RULES_CONFIDENCE", "45"))
+
+# 디코딩 방식: constrained (JSON 머리 고정 + 그리디 + 닫는 괄호에서 종료) | sample (기존 600토큰 샘플링 + 재시도)
+PREDICT_DECODING = os.getenv("PREDICT_DECODING", "constrained")
+PREDICT_MAX_NEW_TOKENS = int(os.getenv("PREDICT_MAX_NEW_TOKENS", "192"))
+# constrained 모드에서 응답 앞부분을 미리 채워 출력 형식을 고정
+RESPONSE_PREFILL = '{"north":{"prob":'
+
+
+def resolve_backend(backend: str = None) -> str:
+    name = (backend or PREDICTOR_BACKEND).lower()
+    if name == "auto":
+        return "cuda_4bit" if torch.cuda.is_available() else "cpu_int8"
+    if name not in PREDICTOR_BACKENDS:
+        raise ValueError(f"알 수 없는 추론 백엔드: {name} (가능: auto, {', '.join(PREDICTOR_BACKENDS)})")
+    if name == "cuda_4bit" and not torch.cuda.is_available():
+        print("⚠️  cuda_4bit 는 CUDA 필요 → cpu_int8 사용")
+        return "cpu_int8"
+    return name
+
 
 class PredictionRequest(BaseModel):
     person: Dict[str, Any]
@@ -21,15 +65,60 @@ class PredictionRequest(BaseModel):
 class PredictionResponse(BaseModel):
     success: bool
     prediction: Optional[Dict[str, Dict[str, Any]]] = None
+    source: Optional[str] = None
     error: Optional[str] = None
 
 
+class JsonObjectStopper(StoppingCriteria):
+    """
+    생성 중인 JSON 객체의 괄호 깊이를 행마다 추적해서, 최상위 객체가 닫히면 그 행의 생성을 멈춘다.
+    (문자열 안의 괄호는 무시)
+    """
+
+    def __init__(self, tokenizer, batch_size: int, initial_text: str = RESPONSE_PREFILL):
+        self.tokenizer = tokenizer
+        self.states = [self._scan({"depth": 0, "in_string": False, "escape": False}, initial_text)
+                       for _ in range(batch_size)]
+        self.done = [False] * batch_size
+
+    @staticmethod
+    def _scan(state: Dict, text: str) -> Dict:
+        for ch in text:
+            if state["in_string"]:
+                if state["escape"]:
+                    state["escape"] = False
+                elif ch == "\\":
+                    state["escape"] = True
+                elif ch == '"':
+                    state["in_string"] = False
+            elif ch == '"':
+                state["in_string"] = True
+            elif ch == "{":
+                state["depth"] += 1
+            elif ch == "}":
+                state["depth"] -= 1
+        return state
+
+    def __call__(self, input_ids, scores, **kwargs):
+        for row in range(input_ids.shape[0]):
+            if self.done[row]:
+                continue
+            token_text = self.tokenizer.decode(input_ids[row, -1:], skip_special_tokens=True)
+            state = self._scan(self.states[row], token_text)
+            self.done[row] = state["depth"] <= 0
+        return torch.tensor(self.done, dtype=torch.bool, device=input_ids.device)
+
+
 class MovementPredictor:
-    def __init__(self, model_path: str = "./movement_predictor_model_v2"):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"🚀 디바이스: {self.device}")
+    def __init__(self, model_path: str = "./movement_predictor_model_v2", backend: str = None):
+        self.backend = resolve_backend(backend)
+        self.device = "cuda" if self.backend == "cuda_4bit" else "cpu"
+        print(f"🚀 디바이스: {self.device} / 백엔드: {self.backend}")
         self.model = None
         self.tokenizer = None
+        self.prefix_ids = None
+        self.prefix_cache = None
+        self.decoding = PREDICT_DECODING if PREDICT_DECODING in ("constrained", "sample") else "constrained"
         self.load_model()
 
     def load_model(self):
@@ -41,29 +130,137 @@ class MovementPredictor:
             if self.tokenizer.pad_token is None:
                 self.tokenizer.pad_token = self.tokenizer.eos_token
                 self.tokenizer.pad_token_id = self.tokenizer.eos_token_id
-
-            bnb_config = BitsAndBytesConfig(
-                load_in_4bit=True,
-                bnb_4bit_quant_type="nf4",
-                bnb_4bit_compute_dtype=torch.bfloat16,
-                bnb_4bit_use_double_quant=True,
-            )
-
-            self.model = AutoModelForCausalLM.from_pretrained(
-                BASE_MODEL_NAME,
-                quantization_config=bnb_config,
-                trust_remote_code=True,
-                torch_dtype=torch.bfloat16,
-            )
+            
+            # 디코더 전용 모델 배치 생성은 왼쪽 패딩
+            self.tokenizer.padding_side = "left"
+
+            if self.device == "cpu":
+                num_threads = PREDICTOR_THREADS or max(1, (os.cpu_count() or 2) // 2)
+                torch.set_num_threads(num_threads)
+                print(f"   intra-op 스레드 수: {num_threads}")
+
+            if self.backend == "cuda_4bit":
+                self._load_cuda_4bit()
+            elif self.backend == "onnx":
+                self._load_onnx()
+            else:
+                self._load_cpu(quantize=self.backend == "cpu_int8")
             
             self.model.eval()
+            self.build_prefix_cache()
             print("✅ 완료")
             
         except Exception as e:
             print(f"❌ {e}")
             raise
 
-    def create_prompt(self, person: Dict, environment: Dict) -> str:
+    def _load_cuda_4bit(self):
+        bnb_config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_compute_dtype=torch.bfloat16,
+            bnb_4bit_use_double_quant=True,
+        )
+
+        self.model = AutoModelForCausalLM.from_pretrained(
+            BASE_MODEL_NAME,
+            quantization_config=bnb_config,
+            trust_remote_code=True,
+            torch_dtype=torch.bfloat16,
+        )
+
+    def _load_cpu(self, quantize: bool):
+        # 동적 int8 양자화는 fp32 가중치에서 Linear 레이어만 변환
+        self.model = AutoModelForCausalLM.from_pretrained(
+            BASE_MODEL_NAME,
+            trust_remote_code=True,
+            torch_dtype=torch.float32 if quantize else torch.bfloat16,
+            low_cpu_mem_usage=True,
+        )
+
+        if quantize:
+            print("   동적 int8 양자화 (nn.Linear)")
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+    def _load_onnx(self):
+        try:
+            import onnxruntime
+            from optimum.onnxruntime import ORTModelForCausalLM
+        except ImportError:
+            raise RuntimeError("onnx 백엔드는 optimum[onnxruntime] 설치 필요")
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = PREDICTOR_THREADS or max(1, (os.cpu_count() or 2) // 2)
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        onnx_path = os.getenv("PREDICTOR_ONNX_PATH", "./movement_predictor_onnx")
+        if os.path.exists(onnx_path):
+            print(f"   내보낸 ONNX 그래프 사용: {onnx_path}")
+            self.model = ORTModelForCausalLM.from_pretrained(
+                onnx_path, use_cache=True, session_options=session_options
+            )
+        else:
+            print(f"   ONNX 내보내기 (최초 1회): {onnx_path}")
+            self.model = ORTModelForCausalLM.from_pretrained(
+                BASE_MODEL_NAME, export=True, use_cache=True,
+                trust_remote_code=True, session_options=session_options
+            )
+            self.model.save_pretrained(onnx_path)
+
+    def build_prefix_cache(self):
+        """시스템 메시지 + 고정 프롬프트 머리말의 KV 캐시를 1회 계산해서 요청마다 재사용"""
+        if self.backend == "onnx":
+            return
+
+        try:
+            messages = [
+                {"role": "system", "content": SYSTEM_MESSAGE},
+                {"role": "user", "content": PROMPT_PREFIX},
+            ]
+            text = self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=False)
+            # 채팅 템플릿의 user 턴 종료 토큰 이전까지만 공통 구간
+            text = text[:text.index(PROMPT_PREFIX) + len(PROMPT_PREFIX)]
+            prefix_ids = self.tokenizer(text, return_tensors="pt", return_token_type_ids=False)["input_ids"].to(self.device)
+
+            # 마지막 토큰은 다음 토큰과 합쳐 다르게 토큰화될 수 있으므로 제외
+            prefix_ids = prefix_ids[:, :-1]
+
+            with torch.no_grad():
+                outputs = self.model(input_ids=prefix_ids, use_cache=True)
+
+            self.prefix_ids = prefix_ids
+            self.prefix_cache = outputs.past_key_values
+            print(f"   프롬프트 머리말 KV 캐시: {prefix_ids.shape[1]} 토큰")
+        except Exception as e:
+            print(f"⚠️  KV 캐시 준비 실패 (캐시 없이 진행): {e}")
+            self.prefix_ids = None
+            self.prefix_cache = None
+
+    def generate(self, input_ids, attention_mask, **kwargs):
+        """공통 머리말이 일치하면 미리 계산한 KV 캐시를 이어 붙여 생성"""
+        if self.prefix_cache is not None and input_ids.shape[0] == 1:
+            prefix_len = self.prefix_ids.shape[1]
+            if input_ids.shape[1] > prefix_len and torch.equal(input_ids[:, :prefix_len], self.prefix_ids):
+                try:
+                    with torch.no_grad():
+                        return self.model.generate(
+                            input_ids=input_ids,
+                            attention_mask=attention_mask,
+                            past_key_values=copy.deepcopy(self.prefix_cache),
+                            **kwargs
+                        )
+                except Exception as e:
+                    # 모델 구현이 캐시 이어붙이기를 지원하지 않으면 이후로는 사용 안 함
+                    print(f"⚠️  KV 캐시 재사용 실패, 비활성화: {e}")
+                    self.prefix_cache = None
+
+        with torch.no_grad():
+            return self.model.generate(input_ids=input_ids, attention_mask=attention_mask, **kwargs)
+
+    def create_prompt(self, person: Dict, environment: Dict, prior: Optional[Dict] = None) -> str:
+        """prior: 규칙 기반 예측 (rules_then_llm). 있으면 사전 확률로 보여 주고 환경 근거로 보정하게 한다"""
         p_cat = person.get('category', '기타')
         p_age = person.get('age', 30)
         p_sex = person.get('sex', 'M')
@@ -95,6 +292,14 @@ class MovementPredictor:
         
         env_str = "\n".join(env_lines)
         
+        prior_str = ""
+        if prior:
+            prior_lines = [
+                f"• {d.upper()}: {prior[d]['prob']}% ({prior[d]['reason'].replace('[규칙] ', '')})"
+                for d in ["north", "east", "south", "west"]
+            ]
+            prior_str = "\n【규칙 기반 사전 확률 - 환경 근거로 보정할 것】\n" + "\n".join(prior_lines) + "\n"
+        
         prompt = f"""실종자 이동 경로 예측 (환경 분석 필수!)
 
 【실종자】
@@ -108,17 +313,14 @@ class MovementPredictor:
 ✓ 하천/급경사/대형교차로 → 위험 회피
 ✓ 대로/버스/지하철 → 가출 성인 선호
 ✓ 상업지역 → 가출 선호, 주거지역 → 가출 회피
-
+{prior_str}
 반드시 위 환경 차이를 반영하여 JSON 출력:
 {{"north":{{"prob":숫자,"reason":"환경근거"}},"east":{{"prob":숫자,"reason":"환경근거"}},"south":{{"prob":숫자,"reason":"환경근거"}},"west":{{"prob":숫자,"reason":"환경근거"}}}}"""
         
         return prompt
 
-    def predict(self, person: Dict, environment: Dict) -> Dict[str, Dict[str, Any]]:
-        if self.model is None:
-            raise Exception("모델 미로드")
-
-        # 환경 동일성 체크
+    def uniform_prediction(self, environment: Dict) -> Optional[Dict[str, Dict[str, Any]]]:
+        """사방 환경이 모두 같으면 균등 분포 반환 (LLM 호출 불필요)"""
         envs = [environment.get(d, {}) for d in ["north", "east", "south", "west"]]
         
         all_same = all(
@@ -129,54 +331,86 @@ class MovementPredictor:
             for env in envs
         )
         
-        if all_same:
-            print("⚠️  환경 동일 → 균등 분포")
-            return {
-                "north": {"prob": 25.0, "reason": "사방 환경 동일"},
-                "east": {"prob": 25.0, "reason": "사방 환경 동일"},
-                "south": {"prob": 25.0, "reason": "사방 환경 동일"},
-                "west": {"prob": 25.0, "reason": "사방 환경 동일"},
-            }
+        if not all_same:
+            return None
+        
+        print("⚠️  환경 동일 → 균등 분포")
+        return {
+            "north": {"prob": 25.0, "reason": "사방 환경 동일"},
+            "east": {"prob": 25.0, "reason": "사방 환경 동일"},
+            "south": {"prob": 25.0, "reason": "사방 환경 동일"},
+            "west": {"prob": 25.0, "reason": "사방 환경 동일"},
+        }
+
+    def build_chat_text(self, person: Dict, environment: Dict, prior: Optional[Dict] = None) -> str:
+        prompt = self.create_prompt(person, environment, prior)
+        
+        messages = [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt},
+        ]
+
+        text = self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        return text + RESPONSE_PREFILL if self.decoding == "constrained" else text
+
+    def decoding_kwargs(self, batch_size: int) -> Dict[str, Any]:
+        if self.decoding == "sample":
+            return dict(
+                max_new_tokens=600,
+                temperature=0.5,
+                top_p=0.9,
+                do_sample=True,
+                pad_token_id=self.tokenizer.pad_token_id,
+            )
+
+        return dict(
+            max_new_tokens=PREDICT_MAX_NEW_TOKENS,
+            do_sample=False,
+            pad_token_id=self.tokenizer.pad_token_id,
+            stopping_criteria=StoppingCriteriaList([JsonObjectStopper(self.tokenizer, batch_size)]),
+        )
+
+    def decode_response(self, output_ids, prompt_length: int) -> str:
+        text = self.tokenizer.decode(output_ids[prompt_length:], skip_special_tokens=True)
+        return RESPONSE_PREFILL + text if self.decoding == "constrained" else text
+
+    def predict(self, person: Dict, environment: Dict, prior: Optional[Dict] = None) -> Dict[str, Dict[str, Any]]:
+        if self.model is None:
+            raise Exception("모델 미로드")
+
+        # 환경 동일성 체크
+        uniform = self.uniform_prediction(environment)
+        if uniform:
+            return uniform
 
         print("\n=== 환경 입력 (차이 있음) ===")
         for d in ["north", "east", "south", "west"]:
             print(f"{d}: {environment.get(d, {})}")
         print("=" * 50)
 
-        for attempt in range(2):
-            try:
-                prompt = self.create_prompt(person, environment)
-                
-                messages = [
-                    {"role": "system", "content": "환경 차이를 반영하여 JSON 출력"},
-                    {"role": "user", "content": prompt},
-                ]
+        # constrained 모드는 형식이 고정되므로 재시도 없이 1회 생성
+        attempts = 2 if self.decoding == "sample" else 1
+        last_error = None
 
-                text = self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        for attempt in range(attempts):
+            try:
+                text = self.build_chat_text(person, environment, prior)
                 enc = self.tokenizer(text, return_tensors="pt", return_token_type_ids=False)
                 inputs = {
                     "input_ids": enc["input_ids"].to(self.device),
                     "attention_mask": enc["attention_mask"].to(self.device),
                 }
 
-                print(f"🤖 추론 {attempt+1}/2")
-
-                with torch.no_grad():
-                    outputs = self.model.generate(
-                        input_ids=inputs["input_ids"],
-                        attention_mask=inputs["attention_mask"],
-                        max_new_tokens=600,
-                        temperature=0.5,
-                        top_p=0.9,
-                        do_sample=True,
-                        pad_token_id=self.tokenizer.pad_token_id,
-                    )
-
-                response_text = self.tokenizer.decode(
-                    outputs[0][inputs["input_ids"].shape[1]:],
-                    skip_special_tokens=True,
+                print(f"🤖 추론 {attempt+1}/{attempts} ({self.decoding})")
+
+                outputs = self.generate(
+                    input_ids=inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    **self.decoding_kwargs(1)
                 )
 
+                response_text = self.decode_response(outputs[0], inputs["input_ids"].shape[1])
+
                 print(f"📝 응답: {response_text}")
                 
                 prediction = self.parse_response(response_text)
@@ -188,9 +422,58 @@ class MovementPredictor:
                     return prediction
                         
             except Exception as e:
+                last_error = e
                 print(f"❌ {e}")
         
-        raise Exception("2번 실패")
+        raise Exception(f"예측 실패: {last_error}" if last_error else "예측 실패")
+
+    def predict_batch(self, requests: List[Tuple[Dict, Dict, Optional[Dict]]]) -> List[Any]:
+        """
+        여러 요청을 왼쪽 패딩된 배치로 한 번에 생성 (파싱 실패분만 개별 재시도)
+        requests: (person, environment, prior) - prior 는 규칙 사전 확률 또는 None
+        반환: 요청 순서대로 예측 dict 또는 Exception
+        """
+        if self.model is None:
+            return [Exception("모델 미로드") for _ in requests]
+
+        results = [None] * len(requests)
+        pending = []
+        for i, (person, environment, _) in enumerate(requests):
+            uniform = self.uniform_prediction(environment)
+            if uniform:
+                results[i] = uniform
+            else:
+                pending.append(i)
+
+        if len(pending) > 1:
+            try:
+                texts = [self.build_chat_text(*requests[i]) for i in pending]
+                enc = self.tokenizer(texts, return_tensors="pt", padding=True, return_token_type_ids=False)
+                input_ids = enc["input_ids"].to(self.device)
+
+                print(f"🤖 배치 추론 ({len(pending)}건)")
+
+                outputs = self.generate(
+                    input_ids=input_ids,
+                    attention_mask=enc["attention_mask"].to(self.device),
+                    **self.decoding_kwargs(len(pending))
+                )
+
+                for row, i in enumerate(pending):
+                    response_text = self.decode_response(outputs[row], input_ids.shape[1])
+                    results[i] = self.parse_response(response_text)
+
+            except Exception as e:
+                print(f"❌ 배치 추론 실패: {e}")
+
+        for i in pending:
+            if results[i] is None:
+                try:
+                    results[i] = self.predict(*requests[i])
+                except Exception as e:
+                    results[i] = e
+
+        return results
 
     def parse_response(self, text: str) -> Optional[Dict]:
         text = text.strip().replace("'", '"')
@@ -246,17 +529,330 @@ class MovementPredictor:
         return pred
 
 
-app = FastAPI(title="이동 경로 예측 서버")
-app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "2048"))
+PREDICTION_CACHE_TTL = int(os.getenv("PREDICTION_CACHE_TTL", "86400"))
+PREDICTION_CACHE_AGE_BAND = int(os.getenv("PREDICTION_CACHE_AGE_BAND", "10"))
+# 지정하면 SQLite 파일에 캐시를 저장해서 재시작 후에도 재사용 (빈 값이면 메모리만)
+PREDICTION_CACHE_DB = os.getenv("PREDICTION_CACHE_DB", "")
+
+
+class PredictionCache:
+    """
+    예측 결과 캐시 (LRU + TTL)
+    키: 실종자 분류 / 규칙 그룹 / 나이대 / 성별 / 4방향 환경 → 좌표만 다른 반복 요청은 LLM 없이 응답
+    규칙 그룹을 넣어 rules_then_llm 의 사전 확률이 다른 나이(예: 12세 아동 / 13세 청소년)가 같은 키를 쓰지 않게 함
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl: int = PREDICTION_CACHE_TTL,
+                 age_band: int = PREDICTION_CACHE_AGE_BAND, db_path: str = PREDICTION_CACHE_DB):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.age_band = max(1, age_band)
+        self.db_path = db_path
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+        if self.db_path:
+            self._load_persisted()
+
+    @staticmethod
+    def _canonical_environment(environment: Dict) -> Dict:
+        canonical = {}
+        for d in ["north", "east", "south", "west"]:
+            e = environment.get(d, {})
+            canonical[d] = {
+                key: sorted(value) if isinstance(value, list) else value
+                for key, value in sorted(e.items())
+            }
+        return canonical
+
+    def make_key(self, person: Dict, environment: Dict) -> str:
+        try:
+            age_bucket = int(float(person.get("age", 30))) // self.age_band
+        except (TypeError, ValueError):
+            age_bucket = None
+
+        signature = {
+            "category": person.get("category", "기타"),
+            "rule_group": person_group(person),
+            "age_bucket": age_bucket,
+            "sex": person.get("sex", "M"),
+            "environment": self._canonical_environment(environment),
+        }
+        return hashlib.sha1(json.dumps(signature, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, person: Dict, environment: Dict) -> Optional[Dict[str, Dict[str, Any]]]:
+        key = self.make_key(person, environment)
+        now = time.time()
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self.entries[key]
+                self.stats["expired"] += 1
+                entry = None
+
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, person: Dict, environment: Dict, prediction: Dict[str, Dict[str, Any]]):
+        key = self.make_key(person, environment)
+        created_at = time.time()
+
+        with self._lock:
+            self.entries[key] = (created_at, copy.deepcopy(prediction))
+            self.entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats["evicted"] += 1
+
+        if self.db_path:
+            self._persist(key, created_at, prediction)
+
+    # ---------- 영속화 (선택) ----------
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS prediction_cache (
+                cache_key TEXT PRIMARY KEY,
+                prediction TEXT,
+                created_at REAL
+            )
+        ''')
+        return conn
+
+    def _load_persisted(self):
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM prediction_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            conn.commit()
+            cursor.execute(
+                "SELECT cache_key, prediction, created_at FROM prediction_cache ORDER BY created_at DESC LIMIT ?",
+                (self.max_size,)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+
+            for cache_key, prediction, created_at in reversed(rows):
+                self.entries[cache_key] = (created_at, json.loads(prediction))
+            print(f"📦 예측 캐시 복원: {len(rows)}건 ({self.db_path})")
+        except Exception as e:
+            print(f"⚠️  예측 캐시 복원 실패: {e}")
+
+    def _persist(self, key: str, created_at: float, prediction: Dict):
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO prediction_cache (cache_key, prediction, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(prediction, ensure_ascii=False), created_at)
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️  예측 캐시 저장 실패: {e}")
+
+    def get_stats(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return dict(
+            self.stats,
+            size=len(self.entries),
+            max_size=self.max_size,
+            ttl_seconds=self.ttl,
+            persistent=bool(self.db_path),
+            hit_rate=round(self.stats["hits"] / lookups * 100, 1) if lookups else 0.0,
+        )
+
+
+PREDICT_QUEUE_LIMIT = int(os.getenv("PREDICT_QUEUE_LIMIT", "32"))
+PREDICT_MAX_BATCH = int(os.getenv("PREDICT_MAX_BATCH", "4"))
+PREDICT_BATCH_WINDOW_MS = int(os.getenv("PREDICT_BATCH_WINDOW_MS", "20"))
+
+
+class PredictorOverloaded(Exception):
+    pass
+
+
+class PredictionBatcher:
+    """
+    예측 요청 마이크로 배칭 스케줄러
+    요청은 큐에 쌓이고, 짧은 시간 창 안에 모인 요청을 한 배치로 워커 스레드에서 생성한다.
+    큐가 가득 차면 즉시 PredictorOverloaded (→ 503)
+    """
+
+    def __init__(self, predictor: MovementPredictor, queue_limit: int = PREDICT_QUEUE_LIMIT,
+                 max_batch: int = PREDICT_MAX_BATCH, window_ms: int = PREDICT_BATCH_WINDOW_MS):
+        self.predictor = predictor
+        self.queue_limit = queue_limit
+        self.max_batch = max(1, max_batch)
+        self.window = window_ms / 1000
+        self.queue = asyncio.Queue(maxsize=queue_limit)
+        self.worker_task = None
+        self.stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "batches": 0,
+            "batched_requests": 0,
+        }
+
+    def start(self):
+        if self.worker_task is None:
+            self.worker_task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self.worker_task is not None:
+            self.worker_task.cancel()
+            try:
+                await self.worker_task
+            except asyncio.CancelledError:
+                pass
+            self.worker_task = None
+
+        while not self.queue.empty():
+            _, _, _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(PredictorOverloaded("서버 종료 중"))
+
+    async def submit(self, person: Dict, environment: Dict, prior: Optional[Dict] = None) -> Dict[str, Dict[str, Any]]:
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((person, environment, prior, future))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise PredictorOverloaded(f"예측 대기열 초과 ({self.queue_limit}건)")
+
+        self.stats["submitted"] += 1
+        return await future
+
+    async def _collect_batch(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # 대기 중 연결이 끊긴 요청은 제외
+        return [item for item in batch if not item[3].done()]
+
+    async def _worker(self):
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+
+            self.stats["batches"] += 1
+            self.stats["batched_requests"] += len(batch)
+
+            try:
+                results = await asyncio.to_thread(
+                    self.predictor.predict_batch, [(person, environment, prior) for person, environment, prior, _ in batch]
+                )
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (_, _, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    self.stats["failed"] += 1
+                    future.set_exception(result)
+                else:
+                    self.stats["completed"] += 1
+                    future.set_result(result)
+
+    def get_stats(self):
+        return dict(
+            self.stats,
+            queue_depth=self.queue.qsize(),
+            queue_limit=self.queue_limit,
+            max_batch=self.max_batch,
+            window_ms=int(self.window * 1000),
+            avg_batch_size=round(self.stats["batched_requests"] / self.stats["batches"], 2) if self.stats["batches"] else 0.0,
+        )
+
+
+predictor = None
+batcher = None
+prediction_cache = PredictionCache()
+predictor_mode = PREDICTOR_MODE if PREDICTOR_MODE in PREDICTOR_MODES else "llm"
+mode_stats = {"rules": 0, "llm": 0, "cache": 0, "rules_fallback": 0}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global predictor, batcher
+    print(f"🧭 예측 모드: {predictor_mode}")
+    if predictor_mode != "rules":
+        predictor = MovementPredictor()
+        batcher = PredictionBatcher(predictor)
+        batcher.start()
+    yield
+    if batcher:
+        await batcher.stop()
+
+
+async def run_prediction(person: Dict, environment: Dict) -> Tuple[Dict[str, Dict[str, Any]], str]:
+    """
+    예측 모드에 따라 규칙/캐시/LLM 순으로 처리. 반환: (예측, 출처)
+    rules_then_llm: 규칙 최고 확률이 PREDICTOR_RULES_CONFIDENCE 이상이면 규칙 그대로, 아니면 규칙 분포를 LLM 에 넘겨 보정
+    """
+    if predictor_mode == "rules":
+        return rule_scorer.predict(person, environment), "rules"
+
+    rules_prediction = None
+    if predictor_mode == "rules_then_llm":
+        rules_prediction = rule_scorer.predict(person, environment)
+        if max(rules_prediction[d]["prob"] for d in rules_prediction) >= PREDICTOR_RULES_CONFIDENCE:
+            return rules_prediction, "rules"
+
+    prediction = prediction_cache.get(person, environment)
+    if prediction is not None:
+        return prediction, "cache"
+
+    try:
+        prediction = await batcher.submit(person, environment, rules_prediction)
+    except PredictorOverloaded:
+        # 규칙 결과가 이미 있으면 503 대신 규칙으로 응답
+        if rules_prediction is None:
+            raise
+        return rules_prediction, "rules_fallback"
+    except Exception as e:
+        print(f"⚠️  LLM 예측 실패 → 규칙 기반 응답: {e}")
+        return rules_prediction or rule_scorer.predict(person, environment), "rules_fallback"
 
-predictor = MovementPredictor()
+    prediction_cache.put(person, environment, prediction)
+    return prediction, "llm"
+
+
+app = FastAPI(title="이동 경로 예측 서버", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
 
 @app.post("/api/predict_movement", response_model=PredictionResponse)
 async def predict_movement(request: PredictionRequest):
     try:
-        prediction = predictor.predict(request.person, request.environment)
-        return PredictionResponse(success=True, prediction=prediction)
+        prediction, source = await run_prediction(request.person, request.environment)
+        mode_stats[source] += 1
+        return PredictionResponse(success=True, prediction=prediction, source=source)
+    except PredictorOverloaded as e:
+        print(f"과부하: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         print(f"실패: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -264,7 +860,17 @@ async def predict_movement(request: PredictionRequest):
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "model_loaded": predictor.model is not None}
+    return {
+        "status": "healthy",
+        "mode": predictor_mode,
+        "sources": mode_stats,
+        "model_loaded": predictor is not None and predictor.model is not None,
+        "backend": predictor.backend if predictor else None,
+        "prefix_cache": predictor is not None and predictor.prefix_cache is not None,
+        "decoding": predictor.decoding if predictor else None,
+        "queue": batcher.get_stats() if batcher else None,
+        "prediction_cache": prediction_cache.get_stats(),
+    }
 
 
 @app.get("/")
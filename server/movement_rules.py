@@ -0,0 +1,198 @@
+"""
+규칙 기반 이동 방향 점수 계산 (LLM 없이 수 마이크로초)
+
+create_prompt 의 【분석 규칙】을 가중치 행렬로 옮긴 것:
+  ✓ 공원/학교 → 아동·고령자 선호
+  ✓ 하천/대형교차로 → 위험 회피
+  ✓ 대로/버스 → 가출 성인 선호
+  ✓ 상업지역 → 가출 선호, 주거지역 → 가출 회피
+(프롬프트의 급경사/지하철, POI 공원은 환경 분류기가 만들지 않는 값이라 특징에서 뺐다)
+
+4방향 환경을 (방향 × 특징) 0/1 행렬로 만들고, 실종자 그룹별 가중치 벡터와 곱한 점수를
+softmax 로 확률(%)로 바꾼다.
+"""
+import os
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+DIRECTIONS = ["north", "east", "south", "west"]
+
+# (환경 필드, 값) 특징 목록 - environment_analysis 분류기가 만드는 값 기준
+# (ROAD_TYPES / LAND_USES / POI_TYPES / HAZARD_TYPES, 그 밖의 값은 무시)
+FEATURES: List[Tuple[str, str]] = [
+    ("road_type", "대로"),
+    ("road_type", "이차로"),
+    ("road_type", "골목길"),
+    ("land_use", "상업지역"),
+    ("land_use", "주거지역"),
+    ("land_use", "공업지역"),
+    ("land_use", "공원"),
+    ("poi", "학교"),
+    ("poi", "병원"),
+    ("poi", "버스정류장"),
+    ("poi", "편의점"),
+    ("hazard", "하천"),
+    ("hazard", "대형교차로"),
+]
+FEATURE_INDEX = {feature: i for i, feature in enumerate(FEATURES)}
+
+GROUPS = ["child", "teen", "elderly", "runaway", "default"]
+
+CATEGORY_GROUPS = {
+    "미취학아동": "child",
+    "초등저학년": "child",
+    "초등고학년": "child",
+    "중고등학생": "teen",
+    "고령자": "elderly",
+    "치매환자": "elderly",
+    "성인가출": "runaway",
+}
+
+# 그룹별 규칙 가중치 (지정 안 한 특징은 0)
+RULE_WEIGHTS = {
+    "child": {
+        ("land_use", "공원"): 1.0,
+        ("poi", "학교"): 1.0,
+        ("hazard", "하천"): -1.5,
+        ("hazard", "대형교차로"): -1.5,
+    },
+    "teen": {
+        ("land_use", "공원"): 0.5,
+        ("poi", "학교"): 0.5,
+        ("road_type", "대로"): 0.5,
+        ("poi", "버스정류장"): 0.5,
+        ("land_use", "상업지역"): 0.5,
+        ("land_use", "주거지역"): -0.3,
+        ("hazard", "하천"): -1.0,
+        ("hazard", "대형교차로"): -1.0,
+    },
+    "elderly": {
+        ("land_use", "공원"): 1.0,
+        ("poi", "학교"): 0.6,
+        ("hazard", "하천"): -1.5,
+        ("hazard", "대형교차로"): -1.5,
+    },
+    "runaway": {
+        ("road_type", "대로"): 1.0,
+        ("poi", "버스정류장"): 1.0,
+        ("land_use", "상업지역"): 1.0,
+        ("land_use", "주거지역"): -0.7,
+        ("hazard", "하천"): -1.0,
+        ("hazard", "대형교차로"): -1.0,
+    },
+    "default": {
+        ("hazard", "하천"): -1.0,
+        ("hazard", "대형교차로"): -1.0,
+    },
+}
+
+# 점수 → 확률 변환 온도 (작을수록 분포가 뾰족해짐)
+RULES_TEMPERATURE = float(os.getenv("PREDICTOR_RULES_TEMPERATURE", "1.5"))
+
+
+def _build_weight_matrix() -> np.ndarray:
+    weights = np.zeros((len(GROUPS), len(FEATURES)), dtype=np.float32)
+    for g, group in enumerate(GROUPS):
+        for feature, weight in RULE_WEIGHTS[group].items():
+            weights[g, FEATURE_INDEX[feature]] = weight
+    return weights
+
+
+WEIGHT_MATRIX = _build_weight_matrix()
+
+
+def person_group(person: Dict) -> str:
+    group = CATEGORY_GROUPS.get(person.get("category"))
+    if group:
+        return group
+
+    try:
+        age = int(float(person.get("age", 30)))
+    except (TypeError, ValueError):
+        return "default"
+
+    if age <= 12:
+        return "child"
+    if age <= 18:
+        return "teen"
+    if age >= 65:
+        return "elderly"
+    return "default"
+
+
+def encode_environment(environment: Dict) -> np.ndarray:
+    """4방향 환경 → (4, 특징 수) 0/1 행렬"""
+    matrix = np.zeros((len(DIRECTIONS), len(FEATURES)), dtype=np.float32)
+    for d, direction in enumerate(DIRECTIONS):
+        e = environment.get(direction, {})
+        for field in ("road_type", "land_use", "poi", "hazard"):
+            values = e.get(field, [])
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                index = FEATURE_INDEX.get((field, value))
+                if index is not None:
+                    matrix[d, index] = 1.0
+    return matrix
+
+
+class RuleScorer:
+    """분석 규칙 가중치로 4방향 확률 계산"""
+
+    def __init__(self, temperature: float = RULES_TEMPERATURE):
+        self.temperature = max(temperature, 1e-3)
+
+    def score_many(self, persons: List[Dict], environments: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        반환: (확률 % (N, 4), 특징별 기여도 (N, 4, 특징 수))
+        """
+        features = np.stack([encode_environment(environment) for environment in environments])
+        weights = WEIGHT_MATRIX[[GROUPS.index(person_group(person)) for person in persons]]
+
+        contributions = features * weights[:, None, :]
+        scores = contributions.sum(axis=2) / self.temperature
+
+        scores -= scores.max(axis=1, keepdims=True)
+        exp_scores = np.exp(scores)
+        probs = exp_scores / exp_scores.sum(axis=1, keepdims=True) * 100.0
+        return probs, contributions
+
+    @staticmethod
+    def _reason(contribution: np.ndarray) -> str:
+        order = np.argsort(-np.abs(contribution))
+        parts = []
+        for index in order:
+            weight = contribution[index]
+            if weight == 0 or len(parts) >= 3:
+                break
+            part = f"{FEATURES[index][1]} {'선호' if weight > 0 else '회피'}"
+            if part not in parts:
+                parts.append(part)
+        return ", ".join(parts) if parts else "특이 환경 없음"
+
+    def predict_many(self, persons: List[Dict], environments: List[Dict]) -> List[Dict[str, Dict[str, Any]]]:
+        if not persons:
+            return []
+
+        probs, contributions = self.score_many(persons, environments)
+        results = []
+        for n in range(len(persons)):
+            rounded = np.round(probs[n], 1)
+            # 반올림 오차는 최대 방향에 몰아서 합계 100 유지
+            rounded[int(np.argmax(rounded))] += round(100.0 - float(rounded.sum()), 1)
+
+            results.append({
+                direction: {
+                    "prob": round(float(rounded[d]), 1),
+                    "reason": f"[규칙] {self._reason(contributions[n, d])}",
+                }
+                for d, direction in enumerate(DIRECTIONS)
+            })
+        return results
+
+    def predict(self, person: Dict, environment: Dict) -> Dict[str, Dict[str, Any]]:
+        return self.predict_many([person], [environment])[0]
+
+
+rule_scorer = RuleScorer()
@@ -0,0 +1,472 @@
+"""
+대전 오프라인 OSM 특징 저장소
+
+Overpass JSON(osmnx 캐시 파일) 또는 OSM XML 추출본에서 highway/landuse/amenity/natural/building
+특징을 뽑아 numpy 배열 + 격자 인덱스(.npz)로 저장한다. 서버는 이 파일을 메모리에 올려
+네트워크 없이 환경 분석을 한다.
+
+최초 1회 생성:
+    python osm_feature_store.py build                      # server/cache 의 Overpass 응답 전부
+    python osm_feature_store.py build --source daejeon.osm # OSM XML 추출본 (대전 전체)
+    python osm_feature_store.py info
+"""
+import os
+import sys
+import json
+import math
+import glob
+import argparse
+import threading
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Tuple, Optional, Iterable
+
+import numpy as np
+
+OSM_STORE_PATH = os.getenv("OSM_STORE_PATH", "./osm_store.npz")
+OSM_CACHE_DIR = os.getenv("OSM_CACHE_DIR", "./cache")
+# 격자 셀 크기 (도, 약 200m)
+OSM_STORE_CELL_SIZE = float(os.getenv("OSM_STORE_CELL_SIZE", "0.002"))
+
+TAG_KEYS = ["highway", "landuse", "amenity", "natural", "building"]
+
+KIND_POINT = 0
+KIND_LINE = 1
+KIND_AREA = 2
+
+METERS_PER_DEGREE = 111320.0
+
+
+# ---------- 원본 파싱 ----------
+
+def iter_overpass_files(paths: Iterable[str]):
+    """Overpass JSON 파일별 (nodes, ways, relations)"""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        elements = data.get("elements", []) if isinstance(data, dict) else []
+        nodes, ways, relations = {}, {}, {}
+        for element in elements:
+            if element.get("type") == "node":
+                nodes[element["id"]] = element
+            elif element.get("type") == "way":
+                ways[element["id"]] = element
+            elif element.get("type") == "relation":
+                relations[element["id"]] = element
+        yield path, nodes, ways, relations
+
+
+def parse_osm_xml(path: str):
+    """OSM XML 추출본 → (nodes, ways, relations, <bounds> 범위 또는 None) (Overpass JSON 과 같은 형태)"""
+    nodes, ways, relations = {}, {}, {}
+    bounds = None
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == "bounds":
+            bounds = tuple(float(elem.get(name)) for name in ("minlon", "minlat", "maxlon", "maxlat"))
+            continue
+        if elem.tag not in ("node", "way", "relation"):
+            continue
+
+        tags = {tag.get("k"): tag.get("v") for tag in elem.findall("tag")}
+        element_id = int(elem.get("id"))
+        if elem.tag == "node":
+            nodes[element_id] = {"id": element_id, "lat": float(elem.get("lat")), "lon": float(elem.get("lon")), "tags": tags}
+        elif elem.tag == "way":
+            ways[element_id] = {"id": element_id, "nodes": [int(nd.get("ref")) for nd in elem.findall("nd")], "tags": tags}
+        else:
+            relations[element_id] = {
+                "id": element_id,
+                "members": [
+                    {"type": m.get("type"), "ref": int(m.get("ref")), "role": m.get("role", "")}
+                    for m in elem.findall("member")
+                ],
+                "tags": tags,
+            }
+        elem.clear()
+    return nodes, ways, relations, bounds
+
+
+def coverage_region(nodes: Dict, ways: Dict, relations: Dict) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Overpass 응답이 확실히 덮는 범위 (west, south, east, north) - 없으면 None
+    길/관계는 질의 범위 밖까지 이어지므로(노드 전체 범위는 질의보다 수 km 넓어짐) 쓰지 않고,
+    길/관계에 속하지 않은 태그 노드(질의 범위 안에서만 선택됨)의 범위만 쓴다.
+    """
+    referenced = {node_id for way in ways.values() for node_id in way.get("nodes", [])}
+    referenced.update(
+        member["ref"] for relation in relations.values()
+        for member in relation.get("members", []) if member.get("type") == "node"
+    )
+    anchors = [node for node_id, node in nodes.items() if node_id not in referenced and node.get("tags")]
+    if not anchors:
+        return None
+    lats = np.array([node["lat"] for node in anchors])
+    lons = np.array([node["lon"] for node in anchors])
+    return float(lons.min()), float(lats.min()), float(lons.max()), float(lats.max())
+
+
+# ---------- 기하 계산 ----------
+
+def project(coords: np.ndarray) -> np.ndarray:
+    """(lat, lon) 배열 → 지역 평면 좌표 (m, 등장방형 근사)"""
+    lat0 = math.radians(float(coords[:, 0].mean()))
+    return np.column_stack([
+        coords[:, 1] * METERS_PER_DEGREE * math.cos(lat0),
+        coords[:, 0] * METERS_PER_DEGREE,
+    ])
+
+
+def line_length(coords: np.ndarray) -> float:
+    if len(coords) < 2:
+        return 0.0
+    xy = project(coords)
+    return float(np.sqrt((np.diff(xy, axis=0) ** 2).sum(axis=1)).sum())
+
+
+def ring_area(coords: np.ndarray) -> float:
+    if len(coords) < 4:
+        return 0.0
+    xy = project(coords)
+    x, y = xy[:, 0], xy[:, 1]
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+
+def is_area_way(way: Dict, coords: np.ndarray) -> bool:
+    if len(coords) < 4 or way["nodes"][0] != way["nodes"][-1]:
+        return False
+    tags = way.get("tags", {})
+    if tags.get("area") == "no":
+        return False
+    # 닫힌 도로는 area=yes 일 때만 면
+    if "highway" in tags and tags.get("area") != "yes":
+        return any(key in tags for key in ("landuse", "building", "amenity"))
+    return True
+
+
+# ---------- 저장소 ----------
+
+class OSMFeatureStore:
+    """격자 인덱스로 범위 질의하는 메모리 상주 OSM 특징 저장소"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.bounds = arrays["bounds"]              # (N, 4) west, south, east, north
+        self.centroids = arrays["centroids"]        # (N, 2) lat, lon
+        self.kind = arrays["kind"]                  # (N,) 0 점 / 1 선 / 2 면
+        self.length_m = arrays["length_m"]
+        self.area_m2 = arrays["area_m2"]
+        # 꼭짓점 (V, 2) lat/lon - 특징 i 는 vertices[vertex_offsets[i]:vertex_offsets[i + 1]], 관계 구성원 사이는 NaN 행
+        if "vertices" in arrays:
+            self.vertices = arrays["vertices"]
+            self.vertex_offsets = arrays["vertex_offsets"]
+        else:
+            # 꼭짓점 없는 예전 저장소 파일은 중심점 1개로 대신 (build 로 다시 만들면 실제 모양 사용)
+            self.vertices = self.centroids
+            self.vertex_offsets = np.arange(len(self.centroids) + 1, dtype=np.int64)
+        self.codes = {key: arrays[f"code_{key}"] for key in TAG_KEYS}          # (N,) 값 코드, -1 = 태그 없음
+        self.vocab = {key: [str(v) for v in arrays[f"vocab_{key}"]] for key in TAG_KEYS}
+        self.regions = arrays["regions"]            # (R, 4) 원본 데이터가 덮는 범위
+        self.cell_size = float(arrays["cell_size"])
+        self.origin = arrays["origin"]              # (lon, lat)
+        self.grid_shape = arrays["grid_shape"]      # (nx, ny)
+        self.cell_keys = arrays["cell_keys"]
+        self.cell_offsets = arrays["cell_offsets"]
+        self.cell_items = arrays["cell_items"]
+        # 사용하는 쪽이 어휘로 계산해 두는 값 (environment_analysis 분류 조회표 등). 저장소와 수명이 같다
+        self.derived: Dict[str, Dict] = {}
+
+    def __len__(self):
+        return len(self.kind)
+
+    # ----- 생성 -----
+
+    @classmethod
+    def build(cls, sources: List[Tuple[Dict, Dict, Dict]], cell_size: float = OSM_STORE_CELL_SIZE) -> "OSMFeatureStore":
+        """
+        sources: [(nodes, ways, relations[, 덮는 범위]), ...] - 여러 원본의 같은 OSM 요소는 1번만 사용
+        덮는 범위(OSM XML <bounds>)가 없으면 coverage_region 으로 보수적으로 잡는다
+        """
+        all_nodes, all_ways, all_relations = {}, {}, {}
+        regions = []
+        for nodes, ways, relations, *declared in sources:
+            all_nodes.update(nodes)
+            all_ways.update(ways)
+            all_relations.update(relations)
+            region = declared[0] if declared and declared[0] else coverage_region(nodes, ways, relations)
+            if region:
+                regions.append(region)
+
+        def way_coords(way_id) -> Optional[np.ndarray]:
+            way = all_ways.get(way_id)
+            if way is None:
+                return None
+            coords = [(all_nodes[n]["lat"], all_nodes[n]["lon"]) for n in way["nodes"] if n in all_nodes]
+            return np.array(coords) if coords else None
+
+        records = []
+
+        def add(tags: Dict, coords: np.ndarray, kind: int, length: float, area: float):
+            records.append((
+                (float(np.nanmin(coords[:, 1])), float(np.nanmin(coords[:, 0])), float(np.nanmax(coords[:, 1])), float(np.nanmax(coords[:, 0]))),
+                (float(np.nanmean(coords[:, 0])), float(np.nanmean(coords[:, 1]))),
+                kind, length, area,
+                [tags.get(key) for key in TAG_KEYS],
+                coords,
+            ))
+
+        for node in all_nodes.values():
+            tags = node.get("tags", {})
+            if any(key in tags for key in TAG_KEYS):
+                add(tags, np.array([(node["lat"], node["lon"])]), KIND_POINT, 0.0, 0.0)
+
+        for way in all_ways.values():
+            tags = way.get("tags", {})
+            if not any(key in tags for key in TAG_KEYS):
+                continue
+            coords = way_coords(way["id"])
+            if coords is None:
+                continue
+            if is_area_way(way, coords):
+                add(tags, coords, KIND_AREA, line_length(coords), ring_area(coords))
+            else:
+                add(tags, coords, KIND_LINE, line_length(coords), 0.0)
+
+        for relation in all_relations.values():
+            tags = relation.get("tags", {})
+            if not any(key in tags for key in TAG_KEYS):
+                continue
+            member_coords, area = [], 0.0
+            for member in relation.get("members", []):
+                if member.get("type") != "way":
+                    continue
+                coords = way_coords(member["ref"])
+                if coords is None:
+                    continue
+                member_coords.append(coords)
+                # 닫힌 외곽/내곽 링만 면적 계산 (조각난 링은 범위 상자로 대체)
+                if len(coords) >= 4 and np.allclose(coords[0], coords[-1]):
+                    area += ring_area(coords) * (-1 if member.get("role") == "inner" else 1)
+            if not member_coords:
+                continue
+            # 구성원 사이에 NaN 행을 넣어 서로 다른 길을 선분으로 잇지 않음
+            gap = np.full((1, 2), np.nan)
+            coords = np.vstack([part for member in member_coords for part in (member, gap)][:-1])
+            if area <= 0:
+                west, south = np.nanmin(coords[:, 1]), np.nanmin(coords[:, 0])
+                east, north = np.nanmax(coords[:, 1]), np.nanmax(coords[:, 0])
+                area = ring_area(np.array([(south, west), (south, east), (north, east), (north, west), (south, west)]))
+            add(tags, coords, KIND_AREA, 0.0, area)
+
+        arrays = cls._pack(records, regions, cell_size)
+        return cls(arrays)
+
+    @staticmethod
+    def _pack(records, regions, cell_size: float) -> Dict[str, np.ndarray]:
+        bounds = np.array([r[0] for r in records], dtype=np.float64).reshape(-1, 4)
+        arrays = {
+            "bounds": bounds,
+            "centroids": np.array([r[1] for r in records], dtype=np.float64).reshape(-1, 2),
+            "kind": np.array([r[2] for r in records], dtype=np.int8),
+            "length_m": np.array([r[3] for r in records], dtype=np.float32),
+            "area_m2": np.array([r[4] for r in records], dtype=np.float32),
+            "regions": np.array(regions, dtype=np.float64).reshape(-1, 4),
+            "cell_size": np.array(cell_size),
+            "vertices": np.vstack([r[6] for r in records]) if records else np.zeros((0, 2)),
+            "vertex_offsets": np.concatenate([[0], np.cumsum([len(r[6]) for r in records])]).astype(np.int64),
+        }
+
+        for k, key in enumerate(TAG_KEYS):
+            values = [r[5][k] for r in records]
+            vocab = sorted({v for v in values if v is not None})
+            index = {v: i for i, v in enumerate(vocab)}
+            arrays[f"code_{key}"] = np.array([index[v] if v is not None else -1 for v in values], dtype=np.int32)
+            arrays[f"vocab_{key}"] = np.array(vocab, dtype=str)
+
+        # 격자 인덱스: 특징 범위 상자가 걸치는 셀마다 등록 (CSR 형태)
+        if len(bounds):
+            origin = np.array([bounds[:, 0].min(), bounds[:, 1].min()])
+            nx = int((bounds[:, 2].max() - origin[0]) // cell_size) + 1
+            ny = int((bounds[:, 3].max() - origin[1]) // cell_size) + 1
+        else:
+            origin, nx, ny = np.zeros(2), 1, 1
+
+        ix0 = ((bounds[:, 0] - origin[0]) // cell_size).astype(np.int64)
+        iy0 = ((bounds[:, 1] - origin[1]) // cell_size).astype(np.int64)
+        ix1 = ((bounds[:, 2] - origin[0]) // cell_size).astype(np.int64)
+        iy1 = ((bounds[:, 3] - origin[1]) // cell_size).astype(np.int64)
+
+        keys, items = [], []
+        for i in range(len(bounds)):
+            for ix in range(ix0[i], ix1[i] + 1):
+                for iy in range(iy0[i], iy1[i] + 1):
+                    keys.append(ix * ny + iy)
+                    items.append(i)
+
+        keys = np.array(keys, dtype=np.int64)
+        items = np.array(items, dtype=np.int32)
+        order = np.argsort(keys, kind="stable")
+        keys, items = keys[order], items[order]
+        cell_keys, offsets = np.unique(keys, return_index=True)
+
+        arrays.update({
+            "origin": origin,
+            "grid_shape": np.array([nx, ny], dtype=np.int64),
+            "cell_keys": cell_keys,
+            "cell_offsets": np.append(offsets, len(keys)).astype(np.int64),
+            "cell_items": items,
+        })
+        return arrays
+
+    def save(self, path: str = OSM_STORE_PATH):
+        arrays = {
+            "bounds": self.bounds, "centroids": self.centroids, "kind": self.kind,
+            "length_m": self.length_m, "area_m2": self.area_m2, "regions": self.regions,
+            "cell_size": np.array(self.cell_size), "origin": self.origin, "grid_shape": self.grid_shape,
+            "cell_keys": self.cell_keys, "cell_offsets": self.cell_offsets, "cell_items": self.cell_items,
+            "vertices": self.vertices, "vertex_offsets": self.vertex_offsets,
+        }
+        for key in TAG_KEYS:
+            arrays[f"code_{key}"] = self.codes[key]
+            arrays[f"vocab_{key}"] = np.array(self.vocab[key], dtype=str)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str = OSM_STORE_PATH) -> "OSMFeatureStore":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    # ----- 질의 -----
+
+    def covers(self, west: float, south: float, east: float, north: float) -> bool:
+        """질의 범위가 원본 데이터 범위 중 하나에 완전히 포함되는지"""
+        if not len(self.regions):
+            return False
+        r = self.regions
+        return bool(np.any((r[:, 0] <= west) & (r[:, 1] <= south) & (r[:, 2] >= east) & (r[:, 3] >= north)))
+
+    def query_indices(self, west: float, south: float, east: float, north: float) -> np.ndarray:
+        """범위 상자와 겹치는 특징 인덱스"""
+        if not len(self):
+            return np.empty(0, dtype=np.int32)
+
+        nx, ny = int(self.grid_shape[0]), int(self.grid_shape[1])
+        ix0 = max(0, int((west - self.origin[0]) // self.cell_size))
+        iy0 = max(0, int((south - self.origin[1]) // self.cell_size))
+        ix1 = min(nx - 1, int((east - self.origin[0]) // self.cell_size))
+        iy1 = min(ny - 1, int((north - self.origin[1]) // self.cell_size))
+        if ix0 > ix1 or iy0 > iy1:
+            return np.empty(0, dtype=np.int32)
+
+        wanted = (np.arange(ix0, ix1 + 1)[:, None] * ny + np.arange(iy0, iy1 + 1)[None, :]).ravel()
+        positions = np.searchsorted(self.cell_keys, wanted)
+        valid = positions < len(self.cell_keys)
+        positions, wanted = positions[valid], wanted[valid]
+        positions = positions[self.cell_keys[positions] == wanted]
+        if not len(positions):
+            return np.empty(0, dtype=np.int32)
+
+        candidates = np.unique(np.concatenate([
+            self.cell_items[self.cell_offsets[p]:self.cell_offsets[p + 1]] for p in positions
+        ]))
+        b = self.bounds[candidates]
+        hit = (b[:, 0] <= east) & (b[:, 2] >= west) & (b[:, 1] <= north) & (b[:, 3] >= south)
+        return candidates[hit]
+
+    def geometry(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """선택한 특징의 (꼭짓점 (V, 2), 오프셋 (n + 1,), 종류 (n,)) - 원래 순서대로 이어 붙임"""
+        starts = self.vertex_offsets[indices]
+        counts = self.vertex_offsets[indices + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        gather = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return self.vertices[gather], offsets, self.kind[indices]
+
+    def tag_values(self, key: str, indices: np.ndarray) -> List[Optional[str]]:
+        vocab = self.vocab[key]
+        return [vocab[c] if c >= 0 else None for c in self.codes[key][indices]]
+
+    def features_in_bbox(self, west: float, south: float, east: float, north: float):
+        """범위 안 특징을 DataFrame 으로 (osmnx GeoDataFrame 과 같은 태그 열)"""
+        import pandas as pd
+
+        indices = self.query_indices(west, south, east, north)
+        frame = {key: self.tag_values(key, indices) for key in TAG_KEYS}
+        frame.update({
+            "kind": self.kind[indices],
+            "length_m": self.length_m[indices],
+            "area_m2": self.area_m2[indices],
+        })
+        return pd.DataFrame(frame)
+
+    def get_stats(self):
+        return {
+            "features": len(self),
+            "regions": len(self.regions),
+            "cells": len(self.cell_keys),
+            "cell_size": self.cell_size,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(path: str = OSM_STORE_PATH) -> Optional[OSMFeatureStore]:
+    """저장소 파일이 있으면 1회 로딩해서 공유 (없으면 None)"""
+    global _store
+    if _store is not None:
+        return _store
+
+    with _store_lock:
+        if _store is None and os.path.exists(path):
+            _store = OSMFeatureStore.load(path)
+            print(f"🗺️  오프라인 OSM 저장소 로딩: {len(_store)}개 특징 ({path})")
+    return _store
+
+
+def build_from_paths(paths: List[str], cell_size: float = OSM_STORE_CELL_SIZE) -> OSMFeatureStore:
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(glob.glob(os.path.join(path, "*.json")))
+            for _, nodes, ways, relations in iter_overpass_files(files):
+                sources.append((nodes, ways, relations))
+            print(f"   Overpass 캐시 {len(files)}개: {path}")
+        elif path.endswith(".json"):
+            for _, nodes, ways, relations in iter_overpass_files([path]):
+                sources.append((nodes, ways, relations))
+        elif path.endswith(".osm") or path.endswith(".xml"):
+            sources.append(parse_osm_xml(path))
+            print(f"   OSM XML 추출본: {path}")
+        else:
+            raise ValueError(f"지원하지 않는 원본 형식: {path} (Overpass JSON / .osm XML)")
+
+    return OSMFeatureStore.build(sources, cell_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 OSM 특징 저장소")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = sub.add_parser("build", help="원본 데이터에서 저장소 생성")
+    build_parser.add_argument("--source", nargs="+", default=[OSM_CACHE_DIR], help="Overpass 캐시 폴더/JSON 또는 .osm XML")
+    build_parser.add_argument("--output", default=OSM_STORE_PATH)
+    build_parser.add_argument("--cell-size", type=float, default=OSM_STORE_CELL_SIZE)
+
+    info_parser = sub.add_parser("info", help="저장소 정보")
+    info_parser.add_argument("--path", default=OSM_STORE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print("=== 오프라인 OSM 저장소 생성 ===")
+        store = build_from_paths(args.source, args.cell_size)
+        store.save(args.output)
+        print(f"✅ {len(store)}개 특징, 격자 셀 {len(store.cell_keys)}개 → {args.output} "
+              f"({os.path.getsize(args.output) / 1024:.0f}KB)")
+    else:
+        if not os.path.exists(args.path):
+            print(f"저장소 없음: {args.path}")
+            sys.exit(1)
+        store = OSMFeatureStore.load(args.path)
+        print(json.dumps(store.get_stats(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
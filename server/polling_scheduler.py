@@ -0,0 +1,190 @@
+import os
+import time
+import random
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+POLL_BASE_SECONDS = float(os.getenv("POLL_BASE_SECONDS", "300"))
+POLL_MIN_SECONDS = float(os.getenv("POLL_MIN_SECONDS", "60"))
+POLL_MAX_SECONDS = float(os.getenv("POLL_MAX_SECONDS", "1800"))
+POLL_ERROR_SECONDS = float(os.getenv("POLL_ERROR_SECONDS", "60"))
+# 신규 건이 들어온 뒤 POLL_HOT_MINUTES 동안은 POLL_HOT_SECONDS 간격으로
+POLL_HOT_SECONDS = float(os.getenv("POLL_HOT_SECONDS", "120"))
+POLL_HOT_MINUTES = float(os.getenv("POLL_HOT_MINUTES", "60"))
+# 실종 신고가 몰리는 시간대 (시작-끝 시, 끝은 포함하지 않음)
+POLL_PEAK_HOURS = os.getenv("POLL_PEAK_HOURS", "7-10,17-23")
+POLL_PEAK_FACTOR = float(os.getenv("POLL_PEAK_FACTOR", "0.5"))
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.1"))
+
+OUTCOMES = ("changed", "unchanged", "empty", "error")
+
+
+def parse_hours(spec: str) -> set:
+    """"7-10,17-23" → {7, 8, 9, 17, ..., 22} (22-2 처럼 자정을 넘겨도 됨)"""
+    hours = set()
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        start = int(start) % 24
+        end = int(end) % 24 if end else (start + 1) % 24
+        hour = start
+        while True:
+            hours.add(hour)
+            hour = (hour + 1) % 24
+            if hour == end:
+                break
+    return hours
+
+
+class AdaptiveScheduler:
+    """
+    적응형 폴링 스케줄러
+    주기 작업(cycle)의 결과(changed / unchanged / empty / error)로 다음 간격을 정한다.
+    - 오류: POLL_ERROR_SECONDS 부터 2배씩 (최대 POLL_MAX_SECONDS)
+    - 빈 응답 / 변경 없음: 기본 간격에서 연속 횟수만큼 2배 / 1.5배씩 늘림
+    - 피크 시간대는 POLL_PEAK_FACTOR 배, 최근 신규 건이 있으면 POLL_HOT_SECONDS 이하
+    - 여러 인스턴스가 같은 순간에 몰리지 않도록 ±POLL_JITTER 지터
+    request_cycle 로 수동 갱신을 요청하면 대기 중인 루프를 깨워 같은 경로로 바로 한 번 돈다.
+    """
+
+    def __init__(self, name: str, base: float = POLL_BASE_SECONDS, minimum: float = POLL_MIN_SECONDS,
+                 maximum: float = POLL_MAX_SECONDS, error_base: float = POLL_ERROR_SECONDS,
+                 hot_seconds: float = POLL_HOT_SECONDS, hot_minutes: float = POLL_HOT_MINUTES,
+                 peak_hours: str = POLL_PEAK_HOURS, peak_factor: float = POLL_PEAK_FACTOR, jitter: float = POLL_JITTER):
+        self.name = name
+        self.base = base
+        self.minimum = minimum
+        self.maximum = maximum
+        self.error_base = error_base
+        self.hot_seconds = hot_seconds
+        self.hot_window = timedelta(minutes=hot_minutes)
+        self.peak_hours = parse_hours(peak_hours)
+        self.peak_factor = peak_factor
+        self.jitter = jitter
+
+        self.state = "stopped"
+        self.running = False
+        self.streaks = {"error": 0, "empty": 0, "unchanged": 0}
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self.triggers = {"scheduled": 0, "manual": 0}
+        self.last_result: Dict = {}
+        self.last_run_at: Optional[datetime] = None
+        self.last_new_at: Optional[datetime] = None
+        self.next_run_at: Optional[datetime] = None
+        self.next_delay: Optional[float] = None
+        self.next_reason: Optional[str] = None
+        self._waiters = []
+        self._wake = asyncio.Event()
+        self._trigger_reason = "manual"
+        self._lock = asyncio.Lock()
+
+    # ---------- 간격 계산 ----------
+
+    def compute_delay(self, now: Optional[datetime] = None) -> Tuple[float, str]:
+        """(지터 적용 전 간격, 이유)"""
+        now = now or datetime.now()
+        if self.streaks["error"]:
+            return min(self.error_base * 2 ** (self.streaks["error"] - 1), self.maximum), f"error x{self.streaks['error']}"
+        delay, reason = self.base, "base"
+        if self.streaks["empty"]:
+            delay, reason = self.base * 2 ** min(self.streaks["empty"], 8), f"empty x{self.streaks['empty']}"
+        elif self.streaks["unchanged"]:
+            delay, reason = self.base * 1.5 ** min(self.streaks["unchanged"], 8), f"unchanged x{self.streaks['unchanged']}"
+        if now.hour in self.peak_hours:
+            delay, reason = delay * self.peak_factor, f"{reason}, peak"
+        if self.last_new_at and now - self.last_new_at < self.hot_window and delay > self.hot_seconds:
+            delay, reason = self.hot_seconds, "recent new cases"
+        return min(max(delay, self.minimum), self.maximum), reason
+
+    def record(self, outcome: str, new_count: int = 0, now: Optional[datetime] = None):
+        now = now or datetime.now()
+        outcome = outcome if outcome in OUTCOMES else "error"
+        self.counts[outcome] += 1
+        self.last_run_at = now
+        if new_count:
+            self.last_new_at = now
+        # 연속 횟수는 해당 결과가 이어질 때만 늘고, 다른 결과가 나오면 초기화
+        for key in self.streaks:
+            self.streaks[key] = self.streaks[key] + 1 if key == outcome else 0
+
+    # ---------- 실행 ----------
+
+    async def _run_cycle(self, cycle: Callable[[str], Awaitable[Dict]], reason: str) -> Dict:
+        async with self._lock:
+            waiters, self._waiters = self._waiters, []
+            self._wake.clear()
+            self.state = "running"
+            self.triggers["manual" if reason != "scheduled" else "scheduled"] += 1
+            start_time = time.perf_counter()
+            try:
+                result = await cycle(reason)
+            except Exception as e:
+                result = {"outcome": "error", "error": str(e)}
+            result = dict(result, reason=reason, seconds=round(time.perf_counter() - start_time, 3))
+            self.record(result.get("outcome", "error"), result.get("new", 0))
+            self.last_result = result
+            self.state = "idle" if self.running else "stopped"
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(result)
+            return result
+
+    async def run(self, cycle: Callable[[str], Awaitable[Dict]]):
+        """백그라운드 루프 (취소될 때까지). 첫 회는 바로 실행"""
+        self.running = True
+        reason = "scheduled"
+        try:
+            while True:
+                await self._run_cycle(cycle, reason)
+                delay, self.next_reason = self.compute_delay()
+                delay *= 1 + random.uniform(-self.jitter, self.jitter)
+                self.next_delay = round(delay, 1)
+                self.next_run_at = datetime.now() + timedelta(seconds=delay)
+                self.state = "sleeping"
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                    reason = self._trigger_reason
+                except asyncio.TimeoutError:
+                    reason = "scheduled"
+        finally:
+            self.running = False
+            self.state = "stopped"
+            self.next_run_at = None
+            for waiter in self._waiters:
+                if not waiter.done():
+                    waiter.set_exception(RuntimeError(f"{self.name} 폴링이 중지되었습니다"))
+            self._waiters = []
+
+    async def request_cycle(self, cycle: Callable[[str], Awaitable[Dict]], reason: str = "manual") -> Dict:
+        """
+        지금 바로 한 번 실행하고 결과를 기다린다.
+        루프가 돌고 있으면 대기를 깨워 루프 안에서 실행하고(실행 중이면 끝난 직후 한 번 더), 아니면 직접 실행한다.
+        """
+        if not self.running:
+            return await self._run_cycle(cycle, reason)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._trigger_reason = reason
+        self._wake.set()
+        return await waiter
+
+    def get_stats(self):
+        return {
+            "state": self.state,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_result": self.last_result,
+            "last_new_at": self.last_new_at.isoformat() if self.last_new_at else None,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "next_delay_seconds": self.next_delay,
+            "next_delay_reason": self.next_reason,
+            "streaks": dict(self.streaks),
+            "outcomes": dict(self.counts),
+            "triggers": dict(self.triggers),
+            "pending_requests": len(self._waiters),
+        }
+
+
+safe182_scheduler = AdaptiveScheduler("safe182")
@@ -0,0 +1,224 @@
+import os
+import sys
+import time
+import random
+import itertools
+import threading
+from datetime import datetime
+from collections import deque, Counter
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_CAPTURES = int(os.getenv("PROFILE_CAPTURES", "50"))
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "profile"
+
+IDLE_FRAME = "<idle: awaiting I/O>"
+OTHER_FRAME = "<other task>"
+# 이벤트 루프가 할 일 없이 select 에서 기다리는 중인지 판별
+IDLE_FUNCTIONS = {"select", "poll", "epoll", "_poll", "control"}
+# Starlette 라우팅에서 ASGI scope 를 인자로 받는 함수
+SCOPE_FUNCTIONS = {"handle", "app", "__call__"}
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class ProfileSession:
+    """
+    요청 1건의 통계적 프로파일
+    샘플링 스레드가 interval 마다 이벤트 루프 스레드의 스택을 찍는다.
+    같은 루프에서 다른 요청이 돌고 있던 샘플은 <other task>, select 대기 중이던 샘플은 <idle> 로 따로 센다.
+    """
+
+    def __init__(self, scope: dict, trigger: str, interval: float):
+        self.scope = scope
+        self.trigger = trigger
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = datetime.now()
+        self._start_time = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+                self.samples += 1
+
+    def _collapse(self, frame) -> str:
+        if frame.f_code.co_name in IDLE_FUNCTIONS and "selectors" in frame.f_code.co_filename:
+            return IDLE_FRAME
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            # 요청 scope 를 들고 있는 라우팅 프레임까지가 이 요청의 스택 (f_locals 는 라우팅 프레임에서만 읽음)
+            if frame.f_code.co_name in SCOPE_FUNCTIONS and frame.f_locals.get("scope") is self.scope:
+                frames.reverse()
+                return ";".join(frame_label(f) for f in frames)
+            frame = frame.f_back
+        return OTHER_FRAME
+
+    def finish(self, route: str, status: int) -> dict:
+        self._stop.set()
+        self._thread.join(1.0)
+        duration = time.perf_counter() - self._start_time
+        own = sum(count for stack, count in self.stacks.items() if stack not in (IDLE_FRAME, OTHER_FRAME))
+        return {
+            "method": self.scope.get("method"),
+            "path": self.scope.get("path"),
+            "route": route,
+            "status": status,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(duration * 1000, 1),
+            "interval_ms": round(self.interval * 1000, 2),
+            "samples": self.samples,
+            "own_samples": own,
+            "idle_samples": self.stacks.get(IDLE_FRAME, 0),
+            "other_samples": self.stacks.get(OTHER_FRAME, 0),
+            "stacks": dict(self.stacks),
+        }
+
+
+class RequestProfiler:
+    """
+    라우트 단위 샘플링 프로파일러
+    X-Profile: 1 헤더, ?profile=1, 전체 비율(sample_rate) 또는 라우트별 비율(route_rates)로 켜진다.
+    최근 캡처 N건을 메모리에 두고 collapsed-stack(flamegraph.pl / speedscope 입력) 텍스트로 내보낸다.
+    프로파일하지 않는 요청은 헤더/쿼리 확인과 난수 1회만 한다.
+    """
+
+    def __init__(self, sample_rate: float = PROFILE_SAMPLE_RATE, interval_ms: float = PROFILE_INTERVAL_MS,
+                 max_captures: int = PROFILE_CAPTURES, max_concurrent: int = PROFILE_MAX_CONCURRENT):
+        self.enabled = True
+        self.sample_rate = sample_rate
+        self.route_rates: Dict[str, float] = {}
+        self.interval = interval_ms / 1000
+        self.max_concurrent = max_concurrent
+        self.captures = deque(maxlen=max_captures)
+        self.ids = itertools.count(1)
+        self.active = 0
+        self._switch_interval = sys.getswitchinterval()
+        self.stats = {"profiled": 0, "skipped_busy": 0}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None,
+                  route_rates: Optional[Dict[str, float]] = None, interval_ms: Optional[float] = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        if route_rates is not None:
+            self.route_rates = {route: min(max(rate, 0.0), 1.0) for route, rate in route_rates.items()}
+        if interval_ms is not None:
+            self.interval = max(interval_ms, 0.5) / 1000
+
+    # ---------- 요청 단위 ----------
+
+    def _trigger(self, scope: dict, match_route) -> Optional[str]:
+        headers = scope.get("headers") or []
+        if any(name == PROFILE_HEADER.encode() and value not in (b"", b"0") for name, value in headers):
+            return "header"
+        query = parse_qs((scope.get("query_string") or b"").decode("latin-1"))
+        if "1" in query.get(PROFILE_QUERY, []):
+            return "query"
+        if self.route_rates:
+            rate = self.route_rates.get(match_route(scope))
+            if rate and random.random() < rate:
+                return "route_rate"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample_rate"
+        return None
+
+    def begin(self, scope: dict, match_route) -> Optional[ProfileSession]:
+        """프로파일 대상이면 세션 시작, 아니면 None (match_route: scope → 라우트 템플릿, 라우트별 비율이 있을 때만 호출)"""
+        if not self.enabled:
+            return None
+        trigger = self._trigger(scope, match_route)
+        if trigger is None:
+            return None
+        with self._lock:
+            if self.active >= self.max_concurrent:
+                self.stats["skipped_busy"] += 1
+                return None
+            if self.active == 0:
+                # 샘플링 스레드는 GIL 을 얻어야 스택을 볼 수 있다. 기본 전환 주기(5ms)면 짧은 CPU 구간이 끝나고
+                # select 로 GIL 을 놓을 때만 찍혀서 전부 idle 로 보이므로, 프로파일 중에만 전환 주기를 줄인다
+                self._switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self._switch_interval, self.interval / 4))
+            self.active += 1
+        return ProfileSession(scope, trigger, self.interval).start()
+
+    def end(self, session: ProfileSession, route: str, status: int) -> int:
+        capture = session.finish(route, status)
+        with self._lock:
+            self.active -= 1
+            if self.active == 0:
+                sys.setswitchinterval(self._switch_interval)
+            capture["id"] = next(self.ids)
+            self.captures.append(capture)
+            self.stats["profiled"] += 1
+        return capture["id"]
+
+    # ---------- 조회 ----------
+
+    def list_captures(self, route: Optional[str] = None):
+        with self._lock:
+            captures = list(self.captures)
+        captures.reverse()
+        return [
+            {key: value for key, value in capture.items() if key != "stacks"}
+            for capture in captures if route is None or capture["route"] == route
+        ]
+
+    def get_capture(self, capture_id: int) -> Optional[dict]:
+        with self._lock:
+            return next((capture for capture in self.captures if capture["id"] == capture_id), None)
+
+    @staticmethod
+    def collapsed(stacks: Dict[str, int], include_idle: bool = True) -> str:
+        """flamegraph.pl 형식: "프레임;프레임;... 샘플수" 줄 목록"""
+        lines = [
+            f"{stack} {count}"
+            for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+            if include_idle or stack not in (IDLE_FRAME, OTHER_FRAME)
+        ]
+        return "\n".join(lines) + "\n"
+
+    def merged_stacks(self, route: str) -> Optional[Counter]:
+        """같은 라우트의 캡처를 합친 스택 (느린 라우트의 평균적인 모양). 캡처가 없으면 None"""
+        merged = None
+        with self._lock:
+            for capture in self.captures:
+                if capture["route"] == route:
+                    merged = merged or Counter()
+                    merged.update(capture["stacks"])
+        return merged
+
+    def get_stats(self):
+        return dict(
+            self.stats,
+            enabled=self.enabled,
+            sample_rate=self.sample_rate,
+            route_rates=self.route_rates,
+            interval_ms=round(self.interval * 1000, 2),
+            active=self.active,
+            captures=len(self.captures),
+        )
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,272 @@
+import os
+import sys
+import json
+import random
+import sqlite3
+import asyncio
+import logging
+import threading
+import itertools
+from datetime import datetime
+from collections import deque
+from typing import Dict, Optional
+
+SYSTEM_LOG_DB = os.getenv("SYSTEM_LOG_DB", "missing_persons.db")
+SYSTEM_LOG_BUFFER_SIZE = int(os.getenv("SYSTEM_LOG_BUFFER_SIZE", "5000"))
+SYSTEM_LOG_FLUSH_INTERVAL = float(os.getenv("SYSTEM_LOG_FLUSH_INTERVAL", "2.0"))
+SYSTEM_LOG_MIN_LEVEL = os.getenv("SYSTEM_LOG_MIN_LEVEL", "DEBUG").upper()
+# 레벨별 저장 비율 (예: "DEBUG=0.1,INFO=1.0")
+SYSTEM_LOG_SAMPLE_RATES = os.getenv("SYSTEM_LOG_SAMPLE_RATES", "DEBUG=1.0,INFO=1.0")
+# print() 출력을 INFO/STDOUT 로그로도 남길지
+SYSTEM_LOG_CAPTURE_PRINT = os.getenv("SYSTEM_LOG_CAPTURE_PRINT", "false").lower() == "true"
+
+# 버퍼가 가득 차면 낮은 순위부터 버린다 (UPDATE/DELETE 등 기존 호출부의 레벨은 INFO 취급)
+LEVEL_PRIORITY = {"DEBUG": 0, "INFO": 1, "WARNING": 2, "ERROR": 3, "CRITICAL": 3}
+DEFAULT_PRIORITY = LEVEL_PRIORITY["INFO"]
+
+
+def level_priority(level: str) -> int:
+    return LEVEL_PRIORITY.get(level, DEFAULT_PRIORITY)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        level, rate = item.split("=", 1)
+        try:
+            rates[level.strip().upper()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class SystemLogger:
+    """
+    system_logs 버퍼링 저장기
+    log() 는 메모리 버퍼에 넣기만 하고, 백그라운드 플러셔가 주기마다 한 트랜잭션으로 일괄 INSERT 한다.
+    버퍼가 가득 차면 DEBUG → INFO → WARNING 순으로 가장 오래된 항목을 버린다 (새 로그보다 높은 순위는 버리지 않음).
+    """
+
+    def __init__(self, db_path: str = SYSTEM_LOG_DB, buffer_size: int = SYSTEM_LOG_BUFFER_SIZE,
+                 flush_interval: float = SYSTEM_LOG_FLUSH_INTERVAL, sample_rates: Optional[Dict[str, float]] = None,
+                 min_level: str = SYSTEM_LOG_MIN_LEVEL):
+        self.db_path = db_path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.sample_rates = parse_sample_rates(SYSTEM_LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+        self.min_priority = level_priority(min_level)
+        # 순위별 버퍼: 버릴 때 O(1), 플러시 때 순번으로 다시 합친다
+        self.buffers = {priority: deque() for priority in sorted(set(LEVEL_PRIORITY.values()))}
+        self.buffered = 0
+        self.sequence = itertools.count()
+        self.stats = {
+            "logged": 0,
+            "sampled_out": 0,
+            "below_min_level": 0,
+            "dropped": {level: 0 for level in ("DEBUG", "INFO", "WARNING", "ERROR")},
+            "flushed": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "last_flush_rows": 0,
+            "last_flush_ms": 0.0,
+        }
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task = None
+
+    # ---------- 적재 ----------
+
+    def log(self, level: str, category: str, message: str, component: Optional[str] = None, data: Optional[dict] = None):
+        """
+        로그 한 건을 버퍼에 넣는다 (스레드 안전, 블로킹 없음)
+        category 는 system_logs.component 컬럼에 저장되어 /api/system_logs?component= 로 조회된다.
+        세부 컴포넌트명과 추가 데이터는 data(JSON) 컬럼에 들어간다.
+        """
+        level = (level or "INFO").upper()
+        priority = level_priority(level)
+        if priority < self.min_priority:
+            self.stats["below_min_level"] += 1
+            return
+        rate = self.sample_rates.get(level, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            self.stats["sampled_out"] += 1
+            return
+
+        extra = dict(data or {})
+        if component:
+            extra["component"] = component
+        row = (
+            datetime.now().isoformat(),
+            level,
+            category or "SYSTEM",
+            str(message),
+            json.dumps(extra, ensure_ascii=False, default=str) if extra else None,
+        )
+
+        with self._lock:
+            if self.buffered >= self.buffer_size and not self._evict_below(priority, level):
+                return
+            self.buffers[priority].append((next(self.sequence), row))
+            self.buffered += 1
+            self.stats["logged"] += 1
+
+    def _evict_below(self, priority: int, level: str) -> bool:
+        """버퍼가 가득 찼을 때 자리 확보. 새 항목 이하 순위 중 가장 낮은 순위의 가장 오래된 항목을 버린다."""
+        for candidate, buffer in self.buffers.items():
+            if candidate > priority:
+                break
+            if buffer:
+                _, dropped = buffer.popleft()
+                self.buffered -= 1
+                self._count_drop(dropped[1])
+                return True
+        self._count_drop(level)
+        return False
+
+    def _count_drop(self, level: str):
+        key = level if level in self.stats["dropped"] else ("ERROR" if level == "CRITICAL" else "INFO")
+        self.stats["dropped"][key] += 1
+
+    def _drain(self):
+        with self._lock:
+            entries = [entry for buffer in self.buffers.values() for entry in buffer]
+            for buffer in self.buffers.values():
+                buffer.clear()
+            self.buffered = 0
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    # ---------- 저장 ----------
+
+    def flush(self) -> int:
+        """버퍼 전체를 한 트랜잭션으로 저장 (블로킹, to_thread 로 호출)"""
+        with self._flush_lock:
+            entries = self._drain()
+            if not entries:
+                return 0
+            rows = [row for _, row in entries]
+            start_time = datetime.now()
+            try:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    with conn:
+                        conn.executemany('''
+                            INSERT INTO system_logs (timestamp, level, component, message, data)
+                            VALUES (?, ?, ?, ?, ?)
+                        ''', rows)
+                finally:
+                    conn.close()
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                self._requeue(entries)
+                print(f"시스템 로그 저장 실패 ({len(rows)}건): {e}", file=sys.__stdout__)
+                return 0
+
+            self.stats["flushed"] += len(rows)
+            self.stats["flushes"] += 1
+            self.stats["last_flush_rows"] = len(rows)
+            self.stats["last_flush_ms"] = round((datetime.now() - start_time).total_seconds() * 1000, 2)
+            return len(rows)
+
+    def _requeue(self, entries):
+        """저장 실패분을 다음 주기에 다시 시도 (버퍼 한도 안에서 높은 순위 우선, 새 로그보다 앞에)"""
+        with self._lock:
+            space = max(self.buffer_size - self.buffered, 0)
+            ranked = sorted(entries, key=lambda entry: level_priority(entry[1][1]), reverse=True)
+            for _, row in ranked[space:]:
+                self._count_drop(row[1])
+            for sequence, row in sorted(ranked[:space], key=lambda entry: entry[0], reverse=True):
+                self.buffers[level_priority(row[1])].appendleft((sequence, row))
+                self.buffered += 1
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self.buffered:
+                await asyncio.to_thread(self.flush)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+            print(f"시스템 로그 플러셔 시작 ({self.flush_interval}초 주기, 버퍼 {self.buffer_size}건)")
+
+    async def stop(self):
+        """플러셔 종료 후 남은 로그 저장"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    def get_stats(self):
+        return dict(
+            self.stats,
+            dropped=dict(self.stats["dropped"]),
+            buffered=self.buffered,
+            buffer_size=self.buffer_size,
+            flush_interval=self.flush_interval,
+            sample_rates=self.sample_rates,
+            running=self._task is not None,
+        )
+
+
+class SystemLogHandler(logging.Handler):
+    """표준 logging → system_logger 연결 (logger 이름이 category)"""
+
+    def __init__(self, logger: SystemLogger, level=logging.NOTSET):
+        super().__init__(level)
+        self.system_logger = logger
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            data = {"location": f"{record.module}:{record.lineno}"}
+            if record.exc_info:
+                data["exception"] = logging.Formatter().formatException(record.exc_info)
+            self.system_logger.log(record.levelname, record.name.upper(), record.getMessage(), data=data)
+        except Exception:
+            self.handleError(record)
+
+
+class PrintCapture:
+    """sys.stdout 대체: 원래 출력은 그대로 두고 줄 단위로 INFO/STDOUT 로그에도 남긴다"""
+
+    def __init__(self, stream, logger: SystemLogger, category: str = "STDOUT"):
+        self.stream = stream
+        self.system_logger = logger
+        self.category = category
+        self.pending = ""
+
+    def write(self, text: str):
+        written = self.stream.write(text)
+        self.pending += text
+        while "\n" in self.pending:
+            line, self.pending = self.pending.split("\n", 1)
+            if line.strip():
+                self.system_logger.log("INFO", self.category, line)
+        return written
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def install_logging(logger: "SystemLogger" = None, level: int = logging.INFO, capture_print: bool = SYSTEM_LOG_CAPTURE_PRINT):
+    """루트 logger 에 핸들러를 달고, 설정 시 print() 출력도 가로챈다 (중복 설치 안 함)"""
+    logger = logger or system_logger
+    root = logging.getLogger()
+    if not any(isinstance(handler, SystemLogHandler) for handler in root.handlers):
+        root.addHandler(SystemLogHandler(logger, level))
+        if root.level > level or root.level == logging.NOTSET:
+            root.setLevel(level)
+    if capture_print and not isinstance(sys.stdout, PrintCapture):
+        sys.stdout = PrintCapture(sys.stdout, logger)
+
+
+system_logger = SystemLogger()
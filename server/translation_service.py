@@ -0,0 +1,312 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from typing import List, Dict, Optional
+
+import httpx
+
+from api_telemetry import api_telemetry
+
+DEEPL_DEFAULT_URL = "https://api-free.deepl.com/v2/translate"
+TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", "missing_persons.db")
+TRANSLATION_MEMORY_SIZE = int(os.getenv("TRANSLATION_MEMORY_SIZE", "1024"))
+
+# 자주 나오는 옷차림/인상착의 용어 (네트워크 없이 번역)
+CLOTHING_GLOSSARY = {
+    "후드티": "hoodie",
+    "후드": "hoodie",
+    "맨투맨": "sweatshirt",
+    "티셔츠": "T-shirt",
+    "반팔티": "short-sleeved T-shirt",
+    "긴팔티": "long-sleeved T-shirt",
+    "셔츠": "shirt",
+    "와이셔츠": "dress shirt",
+    "블라우스": "blouse",
+    "니트": "knit sweater",
+    "스웨터": "sweater",
+    "가디건": "cardigan",
+    "조끼": "vest",
+    "패딩": "padded jacket",
+    "롱패딩": "long padded coat",
+    "점퍼": "jumper jacket",
+    "잠바": "jumper jacket",
+    "자켓": "jacket",
+    "재킷": "jacket",
+    "코트": "coat",
+    "바람막이": "windbreaker",
+    "청바지": "jeans",
+    "바지": "pants",
+    "반바지": "shorts",
+    "트레이닝복": "tracksuit",
+    "츄리닝": "tracksuit",
+    "치마": "skirt",
+    "원피스": "dress",
+    "교복": "school uniform",
+    "잠옷": "pajamas",
+    "운동화": "sneakers",
+    "구두": "dress shoes",
+    "슬리퍼": "slippers",
+    "샌들": "sandals",
+    "장화": "rain boots",
+    "부츠": "boots",
+    "등산화": "hiking boots",
+    "모자": "hat",
+    "야구모자": "baseball cap",
+    "캡모자": "baseball cap",
+    "비니": "beanie",
+    "안경": "glasses",
+    "마스크": "face mask",
+    "가방": "bag",
+    "백팩": "backpack",
+    "책가방": "school backpack",
+    "우산": "umbrella",
+    "목도리": "scarf",
+    "장갑": "gloves",
+    "검정": "black",
+    "검정색": "black",
+    "검은색": "black",
+    "흰색": "white",
+    "하얀색": "white",
+    "흰": "white",
+    "회색": "gray",
+    "빨간색": "red",
+    "빨강": "red",
+    "파란색": "blue",
+    "파랑": "blue",
+    "남색": "navy",
+    "하늘색": "sky blue",
+    "초록색": "green",
+    "녹색": "green",
+    "노란색": "yellow",
+    "노랑": "yellow",
+    "주황색": "orange",
+    "분홍색": "pink",
+    "핑크색": "pink",
+    "보라색": "purple",
+    "갈색": "brown",
+    "베이지색": "beige",
+    "베이지": "beige",
+    "카키색": "khaki",
+}
+
+
+class TranslationService:
+    """
+    DeepL 번역 공용 서비스 (main.py / image_generator.py 공용)
+    용어집 → 메모리 LRU → SQLite 캐시 → DeepL(여러 문구를 한 번에 요청) 순으로 조회
+    """
+
+    def __init__(self, db_path: str = TRANSLATION_CACHE_DB, memory_size: int = TRANSLATION_MEMORY_SIZE):
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.stats = {
+            "requests": 0,
+            "glossary_hits": 0,
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "api_calls": 0,
+            "api_errors": 0,
+        }
+        self._lock = threading.Lock()
+        self._db_ready = False
+
+    # ---------- 캐시 ----------
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        if not self._db_ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS translation_cache (
+                    source_text TEXT PRIMARY KEY,
+                    translated_text TEXT,
+                    created_at TEXT,
+                    hit_count INTEGER DEFAULT 0
+                )
+            ''')
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _remember(self, phrase: str, translated: str):
+        with self._lock:
+            self.memory[phrase] = translated
+            self.memory.move_to_end(phrase)
+            while len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+
+    def _lookup_cached(self, phrases: List[str]) -> Dict[str, str]:
+        """용어집/메모리/SQLite 에서 찾은 번역 (못 찾은 문구는 결과에 없음)"""
+        found = {}
+        remaining = []
+
+        for phrase in phrases:
+            glossary_result = self._translate_with_glossary(phrase)
+            if glossary_result is not None:
+                found[phrase] = glossary_result
+                self.stats["glossary_hits"] += 1
+                continue
+
+            with self._lock:
+                cached = self.memory.get(phrase)
+                if cached is not None:
+                    self.memory.move_to_end(phrase)
+            if cached is not None:
+                found[phrase] = cached
+                self.stats["memory_hits"] += 1
+            else:
+                remaining.append(phrase)
+
+        if remaining:
+            try:
+                conn = self._connect()
+                cursor = conn.cursor()
+                placeholders = ",".join("?" * len(remaining))
+                cursor.execute(
+                    f"SELECT source_text, translated_text FROM translation_cache WHERE source_text IN ({placeholders})",
+                    remaining
+                )
+                rows = cursor.fetchall()
+                if rows:
+                    cursor.executemany(
+                        "UPDATE translation_cache SET hit_count = hit_count + 1 WHERE source_text = ?",
+                        [(row[0],) for row in rows]
+                    )
+                    conn.commit()
+                conn.close()
+
+                for source_text, translated_text in rows:
+                    found[source_text] = translated_text
+                    self._remember(source_text, translated_text)
+                    self.stats["db_hits"] += 1
+            except Exception as e:
+                print(f"[번역 캐시] 조회 실패: {e}")
+
+        return found
+
+    def _store(self, translations: Dict[str, str]):
+        for phrase, translated in translations.items():
+            self._remember(phrase, translated)
+
+        try:
+            conn = self._connect()
+            now = datetime.now().isoformat()
+            conn.executemany(
+                "INSERT OR REPLACE INTO translation_cache (source_text, translated_text, created_at, hit_count) VALUES (?, ?, ?, 0)",
+                [(phrase, translated, now) for phrase, translated in translations.items()]
+            )
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            print(f"[번역 캐시] 저장 실패: {e}")
+
+    # ---------- 문구 분리 / 용어집 ----------
+
+    @staticmethod
+    def is_english(text: str) -> bool:
+        return all(ord(c) < 128 for c in text if c.isalpha())
+
+    @staticmethod
+    def split_phrases(text: str) -> List[str]:
+        """쉼표 단위 문구로 분리 ("검정 후드티, 청바지" → ["검정 후드티", "청바지"])"""
+        return [phrase.strip() for phrase in re.split(r"[,，/]", text) if phrase.strip()]
+
+    def _translate_with_glossary(self, phrase: str) -> Optional[str]:
+        if phrase in CLOTHING_GLOSSARY:
+            return CLOTHING_GLOSSARY[phrase]
+
+        words = phrase.split()
+        if words and all(word in CLOTHING_GLOSSARY or self.is_english(word) for word in words):
+            return " ".join(CLOTHING_GLOSSARY.get(word, word) for word in words)
+        return None
+
+    def _prepare(self, text: str):
+        self.stats["requests"] += 1
+        phrases = self.split_phrases(text)
+        korean_phrases = [phrase for phrase in phrases if not self.is_english(phrase)]
+        unique_phrases = list(dict.fromkeys(korean_phrases))
+        return phrases, unique_phrases
+
+    @staticmethod
+    def _join(phrases: List[str], translations: Dict[str, str]) -> str:
+        return ", ".join(translations.get(phrase, phrase) for phrase in phrases)
+
+    # ---------- DeepL ----------
+
+    @staticmethod
+    def _deepl_config():
+        # .env 는 main.py 에서 import 이후에 로드되므로 호출 시점에 읽음
+        return os.getenv("DEEPL_API_KEY", ""), os.getenv("DEEPL_API_URL", DEEPL_DEFAULT_URL)
+
+    def _deepl_payload(self, api_key: str, phrases: List[str]):
+        payload = [("auth_key", api_key), ("source_lang", "KO"), ("target_lang", "EN-US")]
+        payload.extend(("text", phrase) for phrase in phrases)
+        return payload
+
+    def _parse_deepl(self, phrases: List[str], response, seconds: float) -> Dict[str, str]:
+        if response.status_code != 200:
+            self.stats["api_errors"] += 1
+            api_telemetry.record("DEEPL", False, seconds, method="POST", error=f"HTTP {response.status_code}")
+            print(f"[DeepL] 오류: {response.status_code}")
+            return {}
+
+        translated = [item["text"] for item in response.json()["translations"]]
+        result = dict(zip(phrases, translated))
+        api_telemetry.record("DEEPL", True, seconds, count=len(result), method="POST")
+        print(f"[DeepL] 번역 완료 ({len(result)}건): {result}")
+        return result
+
+    def _request_sync(self, phrases: List[str]) -> Dict[str, str]:
+        api_key, api_url = self._deepl_config()
+        if not api_key:
+            return {}
+        start_time = time.perf_counter()
+        try:
+            self.stats["api_calls"] += 1
+            print(f"[DeepL] 번역 시도: {phrases}")
+            response = httpx.post(api_url, data=self._deepl_payload(api_key, phrases), timeout=10.0)
+            return self._parse_deepl(phrases, response, time.perf_counter() - start_time)
+        except Exception as e:
+            self.stats["api_errors"] += 1
+            api_telemetry.record("DEEPL", False, time.perf_counter() - start_time, method="POST", error=str(e))
+            print(f"[DeepL] 실패: {e}")
+            return {}
+
+    # ---------- 공개 API ----------
+
+    def translate(self, text: str) -> str:
+        """동기 번역 (스레드에서 실행되는 이미지 생성기용). 실패 시 원문 반환"""
+        return self.translate_many([text])[0]
+
+    def translate_many(self, texts: List[str]) -> List[str]:
+        """여러 텍스트를 문구 단위로 모아 DeepL 요청 1회로 번역 (배치 이미지 생성용)"""
+        prepared = [self._prepare(text) if text and text.strip() else ([], []) for text in texts]
+        needed = list(dict.fromkeys(phrase for _, unique in prepared for phrase in unique))
+
+        translations = self._lookup_cached(needed)
+        missing = [phrase for phrase in needed if phrase not in translations]
+        if missing:
+            self.stats["misses"] += len(missing)
+            fetched = self._request_sync(missing)
+            if fetched:
+                self._store(fetched)
+                translations.update(fetched)
+
+        return [self._join(phrases, translations) if unique else (text or "") for text, (phrases, unique) in zip(texts, prepared)]
+
+    def get_stats(self):
+        hits = self.stats["glossary_hits"] + self.stats["memory_hits"] + self.stats["db_hits"]
+        lookups = hits + self.stats["misses"]
+        return dict(
+            self.stats,
+            memory_size=len(self.memory),
+            hit_rate=round(hits / lookups * 100, 1) if lookups else 0.0,
+        )
+
+
+translation_service = TranslationService()